@@ -0,0 +1,134 @@
+"""Persistent on-disk and resident in-memory caches for parsed graphs"""
+
+import json
+import os
+import pickle
+import stat
+from collections import OrderedDict
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile, gettempdir
+from threading import Lock
+
+from rdflib import Graph, Literal
+from rdflib.term import Node
+
+# the cache unpickles its files, so other users must not be able to write to the directory
+CACHE_DIR = Path(gettempdir()) / (
+    f"cmem-plugin-pyshacl-{os.getuid()}" if os.name == "posix" else "cmem-plugin-pyshacl"
+)
+SUFFIX = ".pickle"
+MAX_GRAPHS = 16
+
+
+def cache_key(*parts: object) -> str:
+    """Create cache key from JSON serializable parts"""
+    return sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def private_directory(path: Path) -> bool:
+    """Create directory accessible by the current user only, False if others can access it"""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if os.name != "posix":
+        return True
+    status = path.lstat()
+    return (
+        stat.S_ISDIR(status.st_mode)
+        and status.st_uid == os.getuid()
+        and not status.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    )
+
+
+class GraphCache:
+    """LRU cache of pickled rdflib stores, capped in size on disk"""
+
+    def __init__(self, directory: Path = CACHE_DIR, max_size: int = 1024 * 1024**2) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self._private: bool | None = None
+
+    def available(self) -> bool:
+        """Check the cache directory is private to the current user, create it if missing"""
+        if self._private is None:
+            try:
+                self._private = private_directory(self.directory)
+            except OSError:
+                self._private = False
+        return self._private
+
+    def path(self, key: str) -> Path:
+        """Get the cache file path of a key"""
+        return self.directory / f"{key}{SUFFIX}"
+
+    def get(self, key: str) -> Graph | None:
+        """Get graph from cache, None if not cached"""
+        if not self.available():
+            return None
+        path = self.path(key)
+        try:
+            with path.open("rb") as file:
+                # files of the private directory are only written by this user
+                store, identifier = pickle.load(file)  # noqa: S301
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        path.touch()
+        return Graph(store=store, identifier=identifier)
+
+    def put(self, key: str, graph: Graph) -> None:
+        """Add graph to cache and evict least recently used entries"""
+        if not self.available():
+            return
+        with NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as temp:
+            pickle.dump((graph.store, graph.identifier), temp, protocol=pickle.HIGHEST_PROTOCOL)
+        Path(temp.name).replace(self.path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_size"""
+        entries = []
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+
+class MemoryGraphCache:
+    """Parsed graphs with their memoized labels by cache key, least recently used first"""
+
+    def __init__(self, max_size: int = MAX_GRAPHS) -> None:
+        self.max_size = max_size
+        self.graphs: OrderedDict[str, tuple[Graph, dict[Node, Literal | None]]] = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key: str) -> tuple[Graph, dict[Node, Literal | None]] | None:
+        """Get graph and its labels, None if not cached"""
+        with self.lock:
+            entry = self.graphs.get(key)
+            if entry is not None:
+                self.graphs.move_to_end(key)
+            return entry
+
+    def put(self, key: str, graph: Graph) -> dict[Node, Literal | None]:
+        """Add graph, evict least recently used graphs, get the dictionary of its labels"""
+        with self.lock:
+            labels: dict[Node, Literal | None] = {}
+            self.graphs[key] = (graph, labels)
+            while len(self.graphs) > self.max_size:
+                self.graphs.popitem(last=False)
+            return labels
+
+    def evict(self) -> bool:
+        """Remove the least recently used graph, return if there was one"""
+        with self.lock:
+            if not self.graphs:
+                return False
+            self.graphs.popitem(last=False)
+            return True
@@ -0,0 +1,57 @@
+"""Client of the resident validation service"""
+
+import os
+from inspect import signature
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+SERVICE_KEY = "PYSHACL_SERVICE_KEY"
+# variables configuring the cmempy connection and credentials of a job
+ENVIRONMENT_PREFIXES = ("CMEM_", "OAUTH_", "DEPLOY_", "DI_", "DP_", "SSL_", "REQUESTS_")
+
+
+class ServiceUnavailableError(RuntimeError):
+    """The validation service is not reachable or did not answer"""
+
+
+def service_key() -> bytes:
+    """Get the key shared by the validation service and its clients"""
+    key = os.environ.get(SERVICE_KEY, "")
+    if not key:
+        raise ValueError(f"The validation service requires the {SERVICE_KEY} variable")
+    return key.encode()
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Parse service address host:port"""
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid validation service address {address}")
+    return host, int(port)
+
+
+def job_environment() -> dict[str, str]:
+    """Get the cmempy connection and credentials of this process"""
+    return {
+        name: value for name, value in os.environ.items() if name.startswith(ENVIRONMENT_PREFIXES)
+    }
+
+
+def job_parameters(plugin: object) -> dict[str, object]:
+    """Get the parameters of a plugin instance from its constructor arguments"""
+    names = list(signature(type(plugin).__init__).parameters)[1:]
+    return {name: getattr(plugin, name) for name in names}
+
+
+def submit(address: str, job: dict) -> dict:
+    """Run job in the validation service and wait for the result"""
+    try:
+        authkey = service_key()
+    except ValueError as error:
+        raise ServiceUnavailableError(str(error)) from error
+    try:
+        with Client(parse_address(address), authkey=authkey) as connection:
+            connection.send(job)
+            return connection.recv()  # type: ignore[no-any-return]
+    except (OSError, EOFError, AuthenticationError) as error:
+        raise ServiceUnavailableError(str(error) or type(error).__name__) from error
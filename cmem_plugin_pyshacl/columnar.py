@@ -0,0 +1,73 @@
+"""Validation results written to compressed columnar files in batches"""
+
+from importlib.util import find_spec
+from pathlib import Path
+from types import TracebackType
+
+COLUMN_BATCH_SIZE = 10000
+# file suffixes of the supported formats, the Arrow IPC file format (.arrow) cannot
+# replace the dictionaries of earlier batches
+FORMATS = {".parquet": "parquet", ".arrows": "arrow"}
+has_pyarrow = find_spec("pyarrow") is not None
+
+
+class ResultFileWriter:
+    """Result rows written as Parquet or Arrow IPC stream batches with dictionary-encoded values"""
+
+    def __init__(self, path: Path, columns: list[str], batch_size: int = COLUMN_BATCH_SIZE) -> None:
+        import pyarrow as pa  # noqa: PLC0415
+
+        self.path = path
+        self.batch_size = batch_size
+        self.schema = pa.schema(
+            [pa.field("uri", pa.string())]
+            + [pa.field(column, pa.dictionary(pa.int32(), pa.string())) for column in columns]
+        )
+        self.rows: list[list[str | None]] = [[] for _ in self.schema]
+        self.count = 0
+        self.batches = 0
+        if FORMATS[path.suffix] == "parquet":
+            import pyarrow.parquet as pq  # noqa: PLC0415
+
+            self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            # the stream format allows a new dictionary in every batch
+            options = pa.ipc.IpcWriteOptions(compression="zstd")
+            self.writer = pa.ipc.new_stream(path, self.schema, options=options)
+
+    def __enter__(self) -> "ResultFileWriter":
+        """Start writing"""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Write the last batch and close the file"""
+        if exc_type is None:
+            self.flush()
+        self.writer.close()
+
+    def add(self, uri: str, values: list[str | None]) -> None:
+        """Add a row, write the batch when it is full"""
+        self.rows[0].append(uri)
+        for column, value in zip(self.rows[1:], values, strict=True):
+            column.append(value)
+        if len(self.rows[0]) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the current rows as a record batch with a dictionary per column"""
+        import pyarrow as pa  # noqa: PLC0415
+
+        if not self.rows[0] and self.batches:
+            return
+        arrays = [pa.array(self.rows[0], pa.string())] + [
+            pa.array(column, pa.string()).dictionary_encode() for column in self.rows[1:]
+        ]
+        self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.count += len(self.rows[0])
+        self.batches += 1
+        self.rows = [[] for _ in self.schema]
@@ -0,0 +1,101 @@
+"""Compiled shapes graphs shared by the validations of a process"""
+
+from collections import OrderedDict
+from threading import Lock
+
+from rdflib import Graph
+
+from cmem_plugin_pyshacl.limits import ResultLimit, run_limited
+
+MAX_COMPILED = 8
+
+
+class CompiledShapes:
+    """Shapes graph with harvested pySHACL shapes and memoized Meta-SHACL results"""
+
+    def __init__(self, shacl_graph: Graph) -> None:
+        from pyshacl import ShapesGraph  # noqa: PLC0415
+
+        self.shapes_graph = ShapesGraph(shacl_graph)
+        self.shapes = list(self.shapes_graph.shapes)
+        self.meta_results: dict[str, tuple[bool, str]] = {}
+        # pySHACL keeps state in the shapes, validations sharing them are serialized
+        self.lock = Lock()
+
+    @property
+    def graph(self) -> Graph:
+        """Get the shapes graph"""
+        return self.shapes_graph.graph  # type: ignore[no-any-return]
+
+    def meta_validate(self, inference: str) -> None:
+        """Validate the shapes graph against the SHACL shapes once per inference type"""
+        from pyshacl.entrypoints import meta_validate  # noqa: PLC0415
+        from pyshacl.errors import ReportableRuntimeError  # noqa: PLC0415
+
+        with self.lock:
+            if inference not in self.meta_results:
+                conforms, _, text = meta_validate(self.graph, inference=inference)
+                self.meta_results[inference] = (conforms, text)
+            conforms, text = self.meta_results[inference]
+        if not conforms:
+            raise ReportableRuntimeError(
+                "SHACL File does not validate against the SHACL Shapes SHACL (MetaSHACL) "
+                f"file.\n{text}"
+            )
+
+    def validate(
+        self,
+        data_graph: Graph,
+        ont_graph: Graph | None = None,
+        limit: ResultLimit | None = None,
+        **options: object,
+    ) -> tuple[bool, Graph, str]:
+        """Validate data graph with the compiled shapes like pyshacl.validate, within limit"""
+        from pyshacl import Validator  # noqa: PLC0415
+        from pyshacl.monkey import apply_patches  # noqa: PLC0415
+        from pyshacl.validator import assign_baked_in  # noqa: PLC0415
+
+        apply_patches()
+        assign_baked_in()
+        validator = Validator(
+            data_graph, shacl_graph=self.graph, ont_graph=ont_graph, options=dict(options)
+        )
+        validator.shacl_graph = self.shapes_graph
+        return run_limited(validator, limit)
+
+
+class ShapesRegistry:
+    """Least recently used compiled shapes graphs by key, shared by plugin instances"""
+
+    def __init__(self, max_size: int = MAX_COMPILED) -> None:
+        self.max_size = max_size
+        self.compiled: OrderedDict[str, CompiledShapes] = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key: str, shacl_graph: Graph) -> tuple[CompiledShapes, bool]:
+        """Get compiled shapes of key, compile shacl_graph if missing, return if it was reused"""
+        with self.lock:
+            compiled = self.compiled.get(key)
+            if compiled is not None:
+                self.compiled.move_to_end(key)
+                return compiled, True
+            compiled = self.compiled[key] = CompiledShapes(shacl_graph)
+            while len(self.compiled) > self.max_size:
+                self.compiled.popitem(last=False)
+            return compiled, False
+
+    def evict(self) -> bool:
+        """Remove the least recently used compiled shapes, return if there were any"""
+        with self.lock:
+            if not self.compiled:
+                return False
+            self.compiled.popitem(last=False)
+            return True
+
+    def clear(self) -> None:
+        """Remove all compiled shapes"""
+        with self.lock:
+            self.compiled.clear()
+
+
+REGISTRY = ShapesRegistry()
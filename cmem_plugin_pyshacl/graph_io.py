@@ -0,0 +1,254 @@
+"""Streaming transfer of graphs between CMEM and rdflib"""
+
+from collections import deque
+from collections.abc import Callable, Collection, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from hashlib import sha256
+from io import BufferedReader, RawIOBase, TextIOWrapper
+from itertools import batched
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from types import TracebackType
+from typing import IO, Protocol
+
+from cmem.cmempy.dp.proxy.graph import post_streamed
+from rdflib import Graph
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from rdflib.plugins.serializers.nt import _nt_row
+from rdflib.term import Node
+
+CHUNK_SIZE = 1024 * 1024
+UPDATE_BATCH_SIZE = 10000
+UPLOAD_BATCH_SIZE = 100000
+MAX_PENDING_UPLOADS = 2
+
+
+class StreamedResponse(Protocol):
+    """Minimal interface of a streamed HTTP response"""
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        """Iterate over the response body in chunks"""
+
+
+class FileResponse:
+    """Streamed response replayed from the start of a file"""
+
+    def __init__(self, file: IO[bytes]) -> None:
+        self.file = file
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        """Iterate over the file in chunks"""
+        self.file.seek(0)
+        return iter(partial(self.file.read, chunk_size), b"")
+
+
+def spool_stream(response: StreamedResponse, file: IO[bytes], chunk_size: int = CHUNK_SIZE) -> str:
+    """Write a streamed response to file, get the SHA-256 digest of its content"""
+    digest = sha256()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        digest.update(chunk)
+        file.write(chunk)
+    return digest.hexdigest()
+
+
+class ChunkReader(RawIOBase):
+    """Raw binary stream over an iterator of byte chunks, counting bytes read and wait time"""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._pending = memoryview(b"")
+        self.bytes_read = 0
+        self.wait_seconds = 0.0
+        self.digest = sha256()
+
+    def readable(self) -> bool:
+        """Stream is readable"""
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        """Copy the next bytes of the current chunk into buffer"""
+        while not self._pending:
+            start = perf_counter()
+            chunk = next(self._chunks, None)
+            self.wait_seconds += perf_counter() - start
+            if chunk is None:
+                return 0
+            self.bytes_read += len(chunk)
+            self.digest.update(chunk)
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class GraphSink:
+    """N-Triples parser sink adding triples to a graph, skipping excluded triples"""
+
+    __slots__ = ("count", "exclude", "graph", "skipped")
+
+    def __init__(self, graph: Graph, exclude: Collection[tuple[Node, Node, Node]] = ()) -> None:
+        self.graph = graph
+        self.exclude = exclude
+        self.count = 0
+        self.skipped = 0
+
+    def triple(self, s: Node, p: Node, o: Node) -> None:
+        """Add parsed triple unless it is excluded"""
+        if self.exclude and (s, p, o) in self.exclude:
+            self.skipped += 1
+            return
+        self.graph.add((s, p, o))  # type: ignore[arg-type]
+        self.count += 1
+
+
+@dataclass
+class StreamStats:
+    """Triples, bytes, time waited for chunks, SHA-256 digest and skipped triples of a stream"""
+
+    triples: int
+    size: int
+    wait_seconds: float
+    digest: str
+    skipped: int
+
+
+def parse_ntriples_stream(
+    response: StreamedResponse,
+    graph: Graph,
+    chunk_size: int = CHUNK_SIZE,
+    exclude: Collection[tuple[Node, Node, Node]] = (),
+) -> StreamStats:
+    """Parse a streamed N-Triples response into graph without the excluded triples"""
+    raw = ChunkReader(response.iter_content(chunk_size=chunk_size))
+    text = TextIOWrapper(BufferedReader(raw, buffer_size=chunk_size), encoding="utf-8")
+    sink = GraphSink(graph, exclude)
+    W3CNTriplesParser(sink=sink).parse(text)  # type: ignore[arg-type]
+    return StreamStats(
+        sink.count, raw.bytes_read, raw.wait_seconds, raw.digest.hexdigest(), sink.skipped
+    )
+
+
+def update_queries(
+    graph_uri: str,
+    removed: Iterable[tuple[Node, Node, Node]],
+    added: Iterable[tuple[Node, Node, Node]],
+    batch_size: int = UPDATE_BATCH_SIZE,
+) -> Iterator[str]:
+    """Create SPARQL DELETE DATA and INSERT DATA updates of graph in batches"""
+    for operation, triples in (("DELETE", removed), ("INSERT", added)):
+        for batch in batched(triples, batch_size):
+            lines = "\n".join(f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in batch)  # type: ignore[attr-defined]
+            yield f"{operation} DATA {{ GRAPH <{graph_uri}> {{\n{lines}\n}} }}"
+
+
+class BatchedGraphWriter:
+    """Post triples to a CMEM graph as N-Triples files in batches, uploaded in the background"""
+
+    def __init__(
+        self,
+        graph_uri: str,
+        replace: bool,
+        batch_size: int | None = UPLOAD_BATCH_SIZE,
+        post: Callable | None = None,
+    ) -> None:
+        self.graph_uri = graph_uri
+        self.replace = replace
+        self.batch_size = batch_size
+        self.post = post or post_streamed
+        # batches are spooled to disk, without batch_size all triples are posted in one batch
+        self.file = self._spool()
+        self.size = 0
+        self.count = 0
+        self.batches = 0
+        self.serialize_seconds = 0.0
+        self.upload_seconds = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # queued uploads with the files of their batches
+        self._pending: deque[tuple[Future, str]] = deque()
+
+    def __enter__(self) -> "BatchedGraphWriter":
+        """Start writing"""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Upload the last batch and wait for all uploads, cancel them on errors"""
+        if exc_type is None:
+            self.close()
+        else:
+            self._shutdown()
+
+    def add(self, triple: tuple[Node, Node, Node]) -> None:
+        """Add triple, upload the batch when it is full"""
+        self.file.write(_nt_row(triple).encode())
+        self.size += 1
+        if self.batch_size is not None and self.size >= self.batch_size:
+            self.flush()
+
+    def write(self, triples: Iterable[tuple[Node, Node, Node]]) -> None:
+        """Add triples"""
+        start = perf_counter()
+        for triple in triples:
+            self.add(triple)
+        self.serialize_seconds += perf_counter() - start
+
+    def flush(self) -> None:
+        """Queue the current batch for upload"""
+        # the first upload replaces the graph, even if empty
+        if not self.size and self.batches:
+            return
+        replace = self.replace and not self.batches
+        self.file.close()
+        path = self.file.name
+        self._pending.append((self._executor.submit(self._upload, path, replace), path))
+        self.count += self.size
+        self.batches += 1
+        # the file of the queued batch is removed by its upload
+        self.file = self._spool()
+        self.size = 0
+        while len(self._pending) > MAX_PENDING_UPLOADS:
+            self._pending.popleft()[0].result()
+
+    def close(self) -> None:
+        """Upload the last batch and wait for all uploads"""
+        try:
+            self.flush()
+            while self._pending:
+                self._pending[0][0].result()
+                self._pending.popleft()
+        finally:
+            self._shutdown()
+
+    def _spool(self) -> IO[bytes]:
+        """Create the file of the next batch"""
+        # cmempy posts files by path, so the file outlives its handle
+        return NamedTemporaryFile(suffix=".nt", delete=False)
+
+    def _shutdown(self) -> None:
+        """Cancel queued uploads and remove the files not uploaded"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.file.close()
+        for path in [self.file.name, *(path for _, path in self._pending)]:
+            Path(path).unlink(missing_ok=True)
+        self._pending.clear()
+
+    def _upload(self, path: str, replace: bool) -> None:
+        """Post one batch and remove its file"""
+        start = perf_counter()
+        try:
+            res = self.post(
+                self.graph_uri, path, replace=replace, content_type="application/n-triples"
+            )
+        finally:
+            Path(path).unlink(missing_ok=True)
+        self.upload_seconds += perf_counter() - start
+        if res.status_code != 204:  # noqa: PLR2004
+            raise OSError(f"Error posting SHACL validation graph (status code {res.status_code}).")
@@ -0,0 +1,71 @@
+"""Incremental validation of changed resources"""
+
+from collections.abc import Iterable
+
+from rdflib import RDF, RDFS, SH, Graph, Literal, URIRef
+from rdflib.term import Node
+
+SHUI_CONFORMS = URIRef("https://vocab.eccenca.com/shui/conforms")
+
+
+def changed_resources(changeset_graph: Graph) -> tuple[set[Node], set[Node]]:
+    """Get subjects and objects of the triples in a changeset graph"""
+    return set(changeset_graph.subjects()), set(changeset_graph.objects())
+
+
+def skolem_nodes(graph: Graph, roots: Iterable[Node], basepath: str) -> set[Node]:
+    """Get skolemized nodes reachable from roots"""
+    reached: set[Node] = set()
+    pending = list(roots)
+    while pending:
+        for obj in graph.objects(pending.pop(), None):  # type: ignore[arg-type]
+            if isinstance(obj, URIRef) and obj.startswith(basepath) and obj not in reached:
+                reached.add(obj)
+                pending.append(obj)
+    return reached
+
+
+def stale_triples(previous_graph: Graph, affected: set[Node], basepath: str) -> Graph:
+    """Get the report and result triples of a skolemized report outdated by affected nodes"""
+    report = previous_graph.value(predicate=RDF.type, object=SH.ValidationReport)
+    results = set(previous_graph.objects(report, SH.result))
+    stale = {r for r in results if previous_graph.value(r, SH.focusNode) in affected}
+    # nested nodes (paths, values, details) may be shared with results which are kept
+    orphans = skolem_nodes(previous_graph, stale, basepath)
+    orphans -= skolem_nodes(previous_graph, results - stale, basepath)
+    graph = Graph()
+    for node in stale | orphans:
+        for triple in previous_graph.triples((node, None, None)):  # type: ignore[arg-type]
+            graph.add(triple)
+    for p, o in previous_graph.predicate_objects(report):  # type: ignore[arg-type]
+        if p != SH.result or o in stale:
+            graph.add((report, p, o))  # type: ignore[arg-type]
+    for node in affected:
+        for triple in previous_graph.triples((node, SHUI_CONFORMS, None)):  # type: ignore[arg-type]
+            graph.add(triple)
+    return graph
+
+
+def patch_report(
+    previous_graph: Graph, validation_graph: Graph, affected: set[Node], basepath: str
+) -> tuple[Graph, Graph]:
+    """Get triples to remove from and add to a skolemized report for re-validated focus nodes"""
+    removed = stale_triples(previous_graph, affected, basepath)
+    previous_report = previous_graph.value(predicate=RDF.type, object=SH.ValidationReport)
+    report = validation_graph.value(predicate=RDF.type, object=SH.ValidationReport)
+    kept = set(previous_graph.objects(previous_report, SH.result)) - set(
+        removed.objects(previous_report, SH.result)
+    )
+    conforms = Literal(not kept and validation_graph.value(report, SH.conforms) == Literal(True))
+    added = Graph()
+    for s, p, o in validation_graph:
+        if s != report:
+            added.add((s, p, o))
+        elif p == SH.conforms:
+            added.add((previous_report, p, conforms))  # type: ignore[arg-type]
+        elif p == RDFS.label:
+            label = Literal(f"SHACL validation report, conforms={conforms!s}")
+            added.add((previous_report, p, label))  # type: ignore[arg-type]
+        else:
+            added.add((previous_report, p, o))  # type: ignore[arg-type]
+    return removed - added, added - previous_graph
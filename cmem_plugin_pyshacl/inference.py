@@ -0,0 +1,65 @@
+"""Materialized inference closures of data graphs, cached across runs"""
+
+from rdflib import Graph, URIRef
+
+from cmem_plugin_pyshacl.cache import GraphCache, cache_key
+
+DIGEST_PREFIX = "urn:sha256:"
+
+
+def expand_graph(data_graph: Graph, ontology_graph: Graph | None, inference: str) -> None:
+    """Mix the ontology into the data graph and add the inference closure in place like pySHACL"""
+    from pyshacl.rdfutil import inoculate, mix_graphs  # noqa: PLC0415
+    from pyshacl.run_type import PySHACLRunType  # noqa: PLC0415
+    from pyshacl.validator import USE_FULL_MIXIN  # noqa: PLC0415
+
+    if ontology_graph is not None:
+        if USE_FULL_MIXIN:
+            mix_graphs(data_graph, ontology_graph, "inplace")
+        else:
+            inoculate(data_graph, ontology_graph)
+    if inference != "none":
+        PySHACLRunType._run_pre_inference(  # noqa: SLF001
+            data_graph, inference, URIRef("urn:pyshacl:inference")
+        )
+
+
+def is_addition(previous: Graph, graph: Graph) -> bool:
+    """Check if graph contains all triples of previous"""
+    return len(previous) <= len(graph) and all(triple in graph for triple in previous)
+
+
+class ClosureCache:
+    """Inference closures in the graph cache, keyed by data digest and the other inputs"""
+
+    def __init__(self, cache: GraphCache, *inputs: object) -> None:
+        self.cache = cache
+        self.inputs = inputs
+
+    def key(self, digest: str) -> str:
+        """Get the cache key of the closure of the data graph with digest"""
+        return cache_key("closure", *self.inputs, digest)
+
+    def get(self, digest: str) -> Graph | None:
+        """Get the closure of the data graph with digest, None if not cached"""
+        return self.cache.get(self.key(digest))
+
+    def previous(self) -> tuple[Graph, Graph] | None:
+        """Get the data graph and closure of the last run with the same inputs"""
+        data_graph = self.cache.get(cache_key("closure", *self.inputs))
+        if data_graph is None or not str(data_graph.identifier).startswith(DIGEST_PREFIX):
+            return None
+        closure = self.get(str(data_graph.identifier).removeprefix(DIGEST_PREFIX))
+        return None if closure is None else (data_graph, closure)
+
+    def snapshot(self, digest: str, data_graph: Graph) -> Graph:
+        """Copy the data graph before it is expanded, to be compared with the next run"""
+        snapshot = Graph(identifier=URIRef(f"{DIGEST_PREFIX}{digest}"))
+        snapshot += data_graph
+        return snapshot
+
+    def put(self, digest: str, closure: Graph, snapshot: Graph | None = None) -> None:
+        """Add the closure of the data graph with digest, and the snapshot for the next run"""
+        self.cache.put(self.key(digest), closure)
+        if snapshot is not None:
+            self.cache.put(cache_key("closure", *self.inputs), snapshot)
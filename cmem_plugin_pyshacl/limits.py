@@ -0,0 +1,123 @@
+"""Result limits and severity filters applied while the shapes are validated"""
+
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
+
+from rdflib import SH, Graph
+from rdflib.term import Node
+
+if TYPE_CHECKING:
+    from pyshacl import Shape, ShapesGraph, Validator
+    from pyshacl.pytypes import SHACLExecutor
+
+SEVERITIES = {
+    "info": {SH.Info, SH.Warning, SH.Violation},
+    "warning": {SH.Warning, SH.Violation},
+    "violation": {SH.Violation},
+}
+# results below the minimum severity do not affect conformance
+SEVERITY_OPTIONS = {
+    "info": {},
+    "warning": {"allow_infos": True},
+    "violation": {"allow_warnings": True},
+}
+
+
+def result_severity(report: tuple) -> Node | None:
+    """Get the severity of a pySHACL result tuple of message, result node and triples"""
+    _, node, triples = report
+    return next((o for s, p, o in triples if s == node and p == SH.resultSeverity), None)
+
+
+@dataclass
+class ResultLimit:
+    """Maximum number of results and minimum severity, counting the kept results"""
+
+    max_results: int = 0
+    min_severity: str = "info"
+    abort_on_first: bool = False
+    count: int = 0
+    truncated: bool = False
+
+    @property
+    def active(self) -> bool:
+        """Check if results are dropped or shapes skipped"""
+        return bool(self.max_results) or self.min_severity != "info"
+
+    @property
+    def reached(self) -> bool:
+        """Check if the maximum number of results is reached"""
+        return bool(self.max_results) and self.count >= self.max_results
+
+    def options(self) -> dict[str, bool]:
+        """Get the pySHACL validator options of the limit"""
+        return {"abort_on_first": self.abort_on_first, **SEVERITY_OPTIONS[self.min_severity]}
+
+    def fresh(self) -> "ResultLimit":
+        """Copy the limit without the counted results"""
+        return replace(self, count=0, truncated=False)
+
+    def validate(
+        self,
+        shape: "Shape",
+        executor: "SHACLExecutor",
+        target_graph: Graph,
+        focus: list | None = None,
+    ) -> tuple[bool, list]:
+        """Validate shape unless the maximum is reached, keep results up to the maximum"""
+        if self.reached:
+            # shapes without targets are only validated through other shapes
+            if focus or any(any(targets) for targets in shape.target()):
+                self.truncated = True
+            return True, []
+        conforms, reports = shape.validate(executor, target_graph, focus=focus)
+        if self.min_severity != "info":
+            severities = SEVERITIES[self.min_severity]
+            reports = [report for report in reports if result_severity(report) in severities]
+        if self.max_results and len(reports) > self.max_results - self.count:
+            self.truncated = True
+            reports = reports[: self.max_results - self.count]
+        self.count += len(reports)
+        return conforms, reports
+
+
+class LimitedShape:
+    """Shape validated through a result limit"""
+
+    def __init__(self, shape: "Shape", limit: ResultLimit) -> None:
+        self.shape = shape
+        self.limit = limit
+
+    def __getattr__(self, name: str) -> object:
+        """Delegate to the shape"""
+        return getattr(self.shape, name)
+
+    def validate(
+        self, executor: "SHACLExecutor", target_graph: Graph, focus: list | None = None
+    ) -> tuple[bool, list]:
+        """Validate the shape through the limit"""
+        return self.limit.validate(self.shape, executor, target_graph, focus)
+
+
+class LimitedShapesGraph:
+    """Shapes graph whose shapes are validated through a result limit"""
+
+    def __init__(self, shapes_graph: "ShapesGraph", limit: ResultLimit) -> None:
+        self.shapes_graph = shapes_graph
+        self.limit = limit
+
+    def __getattr__(self, name: str) -> object:
+        """Delegate to the shapes graph"""
+        return getattr(self.shapes_graph, name)
+
+    @property
+    def shapes(self) -> list[LimitedShape]:
+        """Get the shapes validated through the limit"""
+        return [LimitedShape(shape, self.limit) for shape in self.shapes_graph.shapes]
+
+
+def run_limited(validator: "Validator", limit: ResultLimit | None) -> tuple[bool, Graph, str]:
+    """Run validator, validating its shapes through limit if it is active"""
+    if limit is not None and limit.active:
+        validator.shacl_graph = LimitedShapesGraph(validator.shacl_graph, limit)  # type: ignore[assignment]
+    return validator.run()  # type: ignore[no-any-return]
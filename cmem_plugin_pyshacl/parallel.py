@@ -0,0 +1,287 @@
+"""Sharded SHACL validation in worker processes"""
+
+import multiprocessing
+import pickle
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from typing import TYPE_CHECKING
+
+from cmem_plugin_base.dataintegration.plugins import PluginLogger
+from rdflib import RDF, SH, BNode, Graph, Literal
+from rdflib.term import Node
+
+from cmem_plugin_pyshacl.inference import expand_graph
+from cmem_plugin_pyshacl.limits import ResultLimit
+
+if TYPE_CHECKING:
+    from pyshacl import ShapesGraph
+
+SHARDS_PER_WORKER = 4
+
+Shard = list[tuple[Node, list[Node]]]
+
+# validator of a worker process, validations in the current process keep their own
+_worker: dict = {}
+
+
+def make_shards(
+    data_graph: Graph,
+    shacl_graph: Graph,
+    shard_count: int,
+    focus_filter: set[Node] | None = None,
+    shapes_graph: "ShapesGraph | None" = None,
+) -> list[Shard]:
+    """Split the focus nodes of all shapes into shards of similar size"""
+    from pyshacl import ShapesGraph  # noqa: PLC0415
+
+    targets = [
+        (
+            shape.node,
+            [
+                node
+                for node in shape.focus_nodes(data_graph)
+                if focus_filter is None or node in focus_filter
+            ],
+        )
+        for shape in (shapes_graph or ShapesGraph(shacl_graph)).shapes
+        if not shape.deactivated
+    ]
+    total = sum(len(focus_nodes) for _, focus_nodes in targets)
+    size = max(1, -(-total // max(1, shard_count)))
+    shards: list[Shard] = []
+    shard: Shard = []
+    shard_len = 0
+    for shape_node, focus_nodes in targets:
+        start = 0
+        while start < len(focus_nodes):
+            chunk = focus_nodes[start : start + size - shard_len]
+            shard.append((shape_node, chunk))
+            shard_len += len(chunk)
+            start += len(chunk)
+            if shard_len == size:
+                shards.append(shard)
+                shard, shard_len = [], 0
+    if shard:
+        shards.append(shard)
+    return shards
+
+
+def _init_worker(path: Path, max_validation_depth: int, limit: ResultLimit | None) -> None:
+    """Load graphs and create a validator in a worker process"""
+    with path.open("rb") as file:
+        data_store, data_id, shacl_store, shacl_id = pickle.load(file)  # noqa: S301
+    _worker.update(
+        _make_worker(
+            Graph(store=data_store, identifier=data_id),
+            Graph(store=shacl_store, identifier=shacl_id),
+            max_validation_depth,
+            limit=limit,
+        )
+    )
+
+
+def _make_worker(
+    data_graph: Graph,
+    shacl_graph: Graph,
+    max_validation_depth: int,
+    shapes_graph: "ShapesGraph | None" = None,
+    limit: ResultLimit | None = None,
+) -> dict:
+    """Create a validator, using the compiled shapes if given"""
+    from pyshacl import Validator  # noqa: PLC0415
+
+    options = {"inplace": True, "max_validation_depth": max_validation_depth}
+    if limit is not None:
+        options.update(limit.options())
+    validator = Validator(data_graph, shacl_graph=shacl_graph, options=options)
+    if shapes_graph is not None:
+        validator.shacl_graph = shapes_graph
+    _ = validator.shacl_graph.shapes  # harvest shapes for lookup_shape_from_node
+    return {"data_graph": data_graph, "limit": limit, "validator": validator}
+
+
+def _validate_worker_shard(shard: Shard) -> tuple[bool, list, float]:
+    """Validate the focus nodes of a shard in a worker process"""
+    return _validate_shard(shard, _worker)
+
+
+def _validate_shard(shard: Shard, worker: dict) -> tuple[bool, list, float]:
+    """Validate the focus nodes of a shard, return conformance, report triples and duration"""
+    from pyshacl import Validator  # noqa: PLC0415
+
+    start = time()
+    validator = worker["validator"]
+    executor = validator.make_executor()
+    # each shard counts its own results, the reports are limited again when merged
+    limit = worker["limit"].fresh() if worker["limit"] is not None else None
+    conforms = True
+    reports: list = []
+    for shape_node, focus_nodes in shard:
+        shape = validator.shacl_graph.lookup_shape_from_node(shape_node)
+        if limit is not None:
+            shape_conforms, shape_reports = limit.validate(
+                shape, executor, worker["data_graph"], focus_nodes
+            )
+        else:
+            shape_conforms, shape_reports = shape.validate(
+                executor, worker["data_graph"], focus=focus_nodes
+            )
+        conforms = conforms and shape_conforms
+        reports.extend(shape_reports)
+        if executor.abort_on_first and not conforms:
+            break
+    report, _ = Validator.create_validation_report(validator.shacl_graph, conforms, reports)
+    return conforms, list(report), time() - start
+
+
+def merge_reports(
+    reports: list[tuple[bool, list]],
+    data_graph: Graph,
+    shacl_graph: Graph,
+    max_results: int = 0,
+) -> tuple[bool, Graph]:
+    """Merge shard reports into one validation report with at most max_results results"""
+    validation_graph = Graph(bind_namespaces="core")
+    report = BNode()
+    conforms = True
+    count = 0
+    # blank nodes cloned from the data and SHACL graphs keep their IDs in the shard
+    # reports and are copied once, other blank node IDs may collide between workers
+    cloned: set[Node] = set()
+    for shard_conforms, triples in reports:
+        conforms = conforms and shard_conforms
+        subjects: dict[Node, list[tuple[Node, Node]]] = defaultdict(list)
+        for s, p, o in triples:
+            subjects[s].append((p, o))
+        shard_report = next(s for s, p, o in triples if p == RDF.type and o == SH.ValidationReport)
+        bnodes: dict[Node, Node] = {}
+        pending = [o for p, o in subjects.pop(shard_report) if p == SH.result]
+        if max_results:
+            pending = pending[: max(0, max_results - count)]
+        count += len(pending)
+        for result in pending:
+            validation_graph.add((report, SH.result, _remap(result, bnodes, data_graph)))
+        while pending:
+            node = pending.pop()
+            for p, o in subjects.pop(node, ()):
+                obj = _remap(o, bnodes, data_graph, shacl_graph)
+                if o in subjects and (obj != o or o not in cloned):
+                    cloned.add(o)
+                    pending.append(o)
+                validation_graph.add((bnodes.get(node, node), p, obj))  # type: ignore[arg-type]
+    validation_graph.add((report, RDF.type, SH.ValidationReport))
+    validation_graph.add((report, SH.conforms, Literal(conforms)))
+    return conforms, validation_graph
+
+
+def _remap(node: Node, bnodes: dict[Node, Node], *graphs: Graph) -> Node:
+    """Replace blank nodes not occurring in graphs by new blank nodes"""
+    if not isinstance(node, BNode):
+        return node
+    if node not in bnodes:
+        known = any((node, None, None) in g or (None, None, node) in g for g in graphs)
+        bnodes[node] = node if known else BNode()
+    return bnodes[node]
+
+
+def _result_count(triples: list) -> int:
+    """Count the results of a shard report"""
+    return sum(1 for _, p, _ in triples if p == SH.result)
+
+
+def _stop(limit: ResultLimit | None, results: list[tuple[bool, list]]) -> bool:
+    """Count the results of the shard reports, check if the remaining shards can be skipped"""
+    if limit is None:
+        return False
+    limit.count = sum(_result_count(triples) for _, triples in results)
+    if limit.reached:
+        limit.truncated = True
+        limit.count = limit.max_results
+    return limit.reached or (limit.abort_on_first and not all(c for c, _ in results))
+
+
+def _log_shard(log: PluginLogger, number: int, total: int, shard: Shard, duration: float) -> None:
+    """Log the validation of a shard"""
+    focus_count = sum(len(focus_nodes) for _, focus_nodes in shard)
+    log.info(
+        f"Validated shard {number}/{total} ({focus_count} focus nodes) "
+        f"in {round(duration, 3)} seconds"
+    )
+
+
+def validate_parallel(  # noqa: PLR0913
+    data_graph: Graph,
+    shacl_graph: Graph,
+    ont_graph: Graph | None,
+    log: PluginLogger,
+    workers: int,
+    inference: str = "none",
+    meta_shacl: bool = False,
+    max_validation_depth: int = 15,
+    focus_filter: set[Node] | None = None,
+    shapes_graph: "ShapesGraph | None" = None,
+    limit: ResultLimit | None = None,
+) -> tuple[bool, Graph]:
+    """Validate shards of focus nodes in worker processes and merge the reports"""
+    if meta_shacl:
+        from pyshacl.entrypoints import meta_validate  # noqa: PLC0415
+        from pyshacl.errors import ReportableRuntimeError  # noqa: PLC0415
+
+        meta_conforms, _, meta_text = meta_validate(shacl_graph, inference=inference)
+        if not meta_conforms:
+            raise ReportableRuntimeError(
+                "SHACL File does not validate against the SHACL Shapes SHACL (MetaSHACL) "
+                f"file.\n{meta_text}"
+            )
+    expand_graph(data_graph, ont_graph, inference)
+    shards = make_shards(
+        data_graph, shacl_graph, workers * SHARDS_PER_WORKER, focus_filter, shapes_graph
+    )
+    log.info(f"Validating {len(shards)} shards with {workers} workers")
+    results: list[tuple[bool, list]] = []
+    max_results = limit.max_results if limit is not None else 0
+    if not shards:
+        return merge_reports(results, data_graph, shacl_graph)
+    if workers == 1:
+        # validate in the current process, no need to copy the graphs
+        worker = _make_worker(data_graph, shacl_graph, max_validation_depth, shapes_graph, limit)
+        for number, shard in enumerate(shards, 1):
+            shard_conforms, triples, duration = _validate_shard(shard, worker)
+            _log_shard(log, number, len(shards), shard, duration)
+            results.append((shard_conforms, triples))
+            if _stop(limit, results):
+                break
+        return merge_reports(results, data_graph, shacl_graph, max_results)
+    with TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "graphs.pickle"
+        with path.open("wb") as file:
+            pickle.dump(
+                (
+                    data_graph.store,
+                    data_graph.identifier,
+                    shacl_graph.store,
+                    shacl_graph.identifier,
+                ),
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        # the plugin process runs threads, so workers are not forked from it, they load the graphs
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(path, max_validation_depth, limit),
+        ) as executor:
+            futures = {executor.submit(_validate_worker_shard, shard): shard for shard in shards}
+            for number, future in enumerate(as_completed(futures), 1):
+                shard_conforms, triples, duration = future.result()
+                _log_shard(log, number, len(shards), futures[future], duration)
+                results.append((shard_conforms, triples))
+                if _stop(limit, results):
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    return merge_reports(results, data_graph, shacl_graph, max_results)
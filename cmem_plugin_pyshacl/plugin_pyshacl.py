@@ -1,12 +1,21 @@
 """CMEM plugin for SHACl validation using pySHACL"""
 
+import json
+import re
 from collections import OrderedDict
+from collections.abc import Collection, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from datetime import UTC, datetime
-from tempfile import NamedTemporaryFile
+from itertools import chain
+from pathlib import Path
+from tempfile import TemporaryFile
+from threading import Lock
 from time import time
+from urllib.parse import quote
 
-import validators.url
-from cmem.cmempy.dp.proxy.graph import get, post_streamed
+from cmem.cmempy.dp.proxy import sparql, update
+from cmem.cmempy.dp.proxy.graph import get
 from cmem_plugin_base.dataintegration.context import ExecutionContext
 from cmem_plugin_base.dataintegration.description import Icon, Plugin, PluginParameter
 from cmem_plugin_base.dataintegration.entity import (
@@ -16,10 +25,7 @@ from cmem_plugin_base.dataintegration.entity import (
     EntitySchema,
 )
 from cmem_plugin_base.dataintegration.parameter.choice import ChoiceParameterType
-from cmem_plugin_base.dataintegration.parameter.graph import (
-    GraphParameterType,
-    get_graphs_list,
-)
+from cmem_plugin_base.dataintegration.parameter.graph import GraphParameterType
 from cmem_plugin_base.dataintegration.plugins import WorkflowPlugin
 from cmem_plugin_base.dataintegration.types import (
     BoolParameterType,
@@ -27,8 +33,8 @@ from cmem_plugin_base.dataintegration.types import (
     StringParameterType,
 )
 from cmem_plugin_base.dataintegration.utils import setup_cmempy_user_access
-from pyshacl import validate
 from rdflib import (
+    DCTERMS,
     PROV,
     RDF,
     RDFS,
@@ -43,6 +49,40 @@ from rdflib import (
 )
 from rdflib.term import Node
 
+from cmem_plugin_pyshacl.cache import GraphCache, MemoryGraphCache, cache_key
+from cmem_plugin_pyshacl.client import (
+    ServiceUnavailableError,
+    job_environment,
+    job_parameters,
+    submit,
+)
+from cmem_plugin_pyshacl.columnar import FORMATS, ResultFileWriter, has_pyarrow
+from cmem_plugin_pyshacl.compiled import REGISTRY, CompiledShapes
+from cmem_plugin_pyshacl.graph_io import (
+    BatchedGraphWriter,
+    FileResponse,
+    StreamedResponse,
+    parse_ntriples_stream,
+    spool_stream,
+    update_queries,
+)
+from cmem_plugin_pyshacl.incremental import changed_resources, patch_report
+from cmem_plugin_pyshacl.inference import ClosureCache, expand_graph, is_addition
+from cmem_plugin_pyshacl.limits import ResultLimit
+from cmem_plugin_pyshacl.parallel import validate_parallel
+from cmem_plugin_pyshacl.profiling import Profiler, dump_profile
+from cmem_plugin_pyshacl.pushdown import BlankNodesError, NeighbourhoodFetcher
+from cmem_plugin_pyshacl.render import BlankNodeRenderer
+from cmem_plugin_pyshacl.results import ResultTable
+from cmem_plugin_pyshacl.shapes import (
+    ShapesProfile,
+    affected_nodes,
+    analyze_shapes,
+    extract_neighbourhood,
+)
+from cmem_plugin_pyshacl.skolem import ContentSkolemizer, Skolemizer
+from cmem_plugin_pyshacl.store import DiskGraph, has_bsddb
+
 SKOSXL = Namespace("http://www.w3.org/2008/05/skos-xl#")
 DATA_GRAPH_TYPES = [
     "https://vocab.eccenca.com/di/Dataset",
@@ -51,6 +91,16 @@ DATA_GRAPH_TYPES = [
     "http://www.w3.org/2002/07/owl#Ontology",
     "https://vocab.eccenca.com/dsm/ThesaurusProject",
 ]
+ENTITY_PATHS = [
+    SH.focusNode,
+    SH.resultPath,
+    SH.value,
+    SH.sourceShape,
+    SH.sourceConstraintComponent,
+    # SH.detail,
+    SH.resultMessage,
+    SH.resultSeverity,
+]
 
 
 def e_t(start: float) -> float:
@@ -58,6 +108,24 @@ def e_t(start: float) -> float:
     return round(time() - start, 3)
 
 
+def is_url(value: str) -> bool:
+    """Check if value is a valid URL"""
+    import validators.url  # noqa: PLC0415
+
+    return bool(validators.url(value))
+
+
+def entity_schema() -> EntitySchema:
+    """Get schema of the validation result entities"""
+    paths = [EntityPath(path=p) for p in ENTITY_PATHS] + [
+        EntityPath(path=SH.conforms),
+        EntityPath(path=PROV.wasDerivedFrom),
+        EntityPath(path=PROV.wasInformedBy),
+        EntityPath(path=PROV.generatedAtTime),
+    ]
+    return EntitySchema(type_uri=SH.ValidationResult, paths=paths)
+
+
 def get_label(graph: Graph, subject: URIRef | BNode):  # noqa: ANN201
     """Get preferred label"""
     labels = preferred_label(graph, subject)
@@ -103,6 +171,24 @@ def preferred_label(
     return default
 
 
+class LabelIndex:
+    """Preferred labels of the subjects of a graph, memoized on first lookup"""
+
+    def __init__(self, graph: Graph, lang: str | None = None) -> None:
+        self.graph = graph
+        self.lang = lang
+        self.labels: dict[Node, Literal | None] = {}
+
+    def get(self, subject: Node) -> Literal | None:
+        """Get preferred label"""
+        try:
+            return self.labels[subject]
+        except KeyError:
+            labels = preferred_label(self.graph, subject, lang=self.lang)  # type: ignore[arg-type]
+            label = self.labels[subject] = labels[0][1] if labels else None
+            return label
+
+
 @Plugin(
     label="SHACL validation with pySHACL",
     icon=Icon(file_name="pyshacl.svg", package=__package__),
@@ -303,12 +389,294 @@ def preferred_label(
             default_value=15,
             advanced=True,
         ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="cache_graphs",
+            label="Cache SHACL and ontology graphs",
+            description="If enabled, the parsed SHACL shapes graph and ontology graph are "
+            "cached on disk by the SHA-256 digest of their content. The graphs are still "
+            "downloaded to compute the digest, parsing is skipped while their content does not "
+            "change.",
+            default_value=True,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=IntParameterType(),
+            name="cache_max_size",
+            label="Graph cache size (MB)",
+            description="Maximum size of the on-disk graph cache in megabytes. Least recently "
+            "used graphs are removed when the cache grows beyond this size.",
+            default_value=1024,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=IntParameterType(),
+            name="workers",
+            label="Validation worker processes",
+            description="Number of worker processes for validation. If greater than 1, the "
+            "focus nodes of the shapes are split into shards which are validated in parallel "
+            "and merged into one validation report. Not available with SHACL advanced and "
+            "SHACL-JS features.",
+            default_value=1,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="extract_neighbourhood",
+            label="Validate focus node neighbourhoods only",
+            description="If enabled, only the triples reachable from the focus nodes of the "
+            "shapes within the maximum property path depth are validated. The full data graph "
+            "is validated if the shapes use SPARQL-based constraints, recursive shapes or "
+            "unbounded property paths, or if inference is enabled.",
+            default_value=False,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=GraphParameterType(show_graphs_without_class=True),
+            name="changeset_graph_uri",
+            label="Changeset graph URI",
+            description="The URI of a graph containing the triples added to and removed from "
+            "the data graph since the last validation. If set, only the focus nodes within the "
+            "maximum property path depth of the changed resources are validated, and their "
+            "results in the existing validation graph are replaced instead of posting the whole "
+            "validation graph. Entities are only output for the re-validated focus nodes. The full "
+            "data graph is validated if the shapes are unbounded, inference or SHACL advanced "
+            "features are enabled, or the changeset contains blank nodes or `rdfs:subClassOf` "
+            "triples. Requires the `Blank node skolemization` option.",
+            default_value="",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="push_down_targets",
+            label="Query focus node neighbourhoods",
+            description="If enabled, the focus nodes of the shapes' targets and the triples "
+            "within the maximum property path depth around them are fetched from the data graph "
+            "with paged SPARQL queries instead of downloading the whole data graph. The whole "
+            "data graph is downloaded if the shapes use SPARQL-based constraints, recursive "
+            "shapes or unbounded property paths, if inference is enabled, if focus nodes are "
+            "blank nodes, or if the shapes use inverse paths and the neighbourhoods include "
+            "blank nodes.",
+            default_value=False,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=IntParameterType(),
+            name="upload_batch_size",
+            label="Upload batch size (triples)",
+            description="Number of triples per N-Triples batch posted to the validation graph. "
+            "Batches are written to temporary files and uploaded in the background while labels "
+            "and provenance data are added. The first batch replaces the graph if `Clear "
+            "validation graph` is enabled. Without blank node skolemization, the validation graph "
+            "is posted in one batch.",
+            default_value=100000,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=StringParameterType(),
+            name="profile_directory",
+            label="Profile directory",
+            description="If set, each run is profiled with cProfile and tracemalloc and the "
+            "statistics (`.prof`) and the memory snapshot (`.tracemalloc`) are written to this "
+            "existing directory. Timings and memory of the phases are logged as JSON in any case.",
+            default_value="",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="cache_inference",
+            label="Cache inference closure",
+            description="If enabled and inference is used, the data graph expanded with the "
+            "inferred triples is stored in the graph cache, keyed by the SHA-256 digests of the "
+            "downloaded data and ontology graphs and the inference type. Runs on unchanged "
+            "graphs reuse the cached closure instead of running the inference again.",
+            default_value=False,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="incremental_inference",
+            label="Incremental inference",
+            description="If enabled and the data graph only has additions since the last run "
+            "with a cached inference closure, the inference continues from the cached closure "
+            "instead of the data graph. The continued closure may contain additional entailed "
+            "triples, for example `rdfs:Resource` types of vocabulary terms. Requires the "
+            "`Cache inference closure` option. Stores an additional copy of the data graph in "
+            "the graph cache. Data graphs with blank nodes are always expanded in full.",
+            default_value=False,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="reuse_shapes",
+            label="Reuse compiled shapes",
+            description="If enabled, the shapes parsed from the SHACL graph by pySHACL and the "
+            "result of the Meta-SHACL validation are kept in memory and reused by later "
+            "validations in the same process, also by other tasks using the same SHACL graph. "
+            "They are compiled again when the SHACL graph changes. Not used with SHACL advanced "
+            "or SHACL-JS features.",
+            default_value=True,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=StringParameterType(),
+            name="batch_data_graphs",
+            label="Batch data graph URIs",
+            description="URIs of further data graphs, separated by whitespace, which are "
+            "validated together with the data graph in one task. The SHACL and ontology graphs "
+            "are loaded and compiled once for all data graphs of the batch.",
+            default_value="",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=StringParameterType(),
+            name="batch_graph_pattern",
+            label="Batch graph URI pattern",
+            description="Regular expression matching the whole URI of further data graphs to "
+            "be validated in the batch. Graphs need one of the data graph types, or the batch "
+            "graph class if set. The SHACL, ontology and validation graphs are never selected.",
+            default_value="",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=StringParameterType(),
+            name="batch_graph_class",
+            label="Batch graph class",
+            description="URI of a class. All graphs of this class are validated in the batch. "
+            "If the batch graph URI pattern is set as well, graphs need to match both.",
+            default_value="",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=ChoiceParameterType(
+                OrderedDict(
+                    {
+                        "combined": "One validation graph",
+                        "per_graph": "One validation graph per data graph",
+                    }
+                )
+            ),
+            name="batch_output",
+            label="Batch validation graphs",
+            description="Output of the validation graph in batch mode. With one validation "
+            "graph, the reports of all data graphs are posted to the validation graph and each "
+            "report refers to its data graph with `prov:wasDerivedFrom`. Otherwise each report "
+            "is posted to its own graph, named by the validation graph URI followed by `/` and "
+            "the percent-encoded data graph URI.",
+            default_value="combined",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=IntParameterType(),
+            name="batch_workers",
+            label="Batch worker threads",
+            description="Number of data graphs of the batch which are processed concurrently. "
+            "Downloads and uploads of the data graphs overlap, validations run one at a time, "
+            "each in `Validation worker processes` processes.",
+            default_value=4,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=IntParameterType(),
+            name="max_results",
+            label="Maximum number of results",
+            description="If greater than 0, validation stops when this number of results is "
+            "reached. The remaining shapes are not validated, and further results of the last "
+            "validated shape are dropped before the validation graph is built.",
+            default_value=0,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="abort_on_first",
+            label="Stop at first violation",
+            description="If enabled, validation stops after the first shape which does not "
+            "conform, to check conformance only. The report contains the results of this shape. "
+            "With parallel validation, the shards validated so far are reported.",
+            default_value=False,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=ChoiceParameterType(
+                OrderedDict({"info": "Info", "warning": "Warning", "violation": "Violation"})
+            ),
+            name="min_severity",
+            label="Minimum result severity",
+            description="Results with a lower severity are dropped while the shapes are "
+            "validated and do not affect conformance. Options are Info (all results), Warning "
+            "and Violation.",
+            default_value="info",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=IntParameterType(),
+            name="disk_store_threshold",
+            label="On-disk data graph threshold (triples)",
+            description="If greater than 0, data graphs with at least this number of triples, "
+            "as counted by CMEM, are loaded into an on-disk BerkeleyDB store instead of memory. "
+            "The store is removed after the run. Validation with the on-disk store is slower "
+            "and runs in a single process. Requires the `berkeleydb` package.",
+            default_value=0,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=StringParameterType(),
+            name="disk_store_directory",
+            label="On-disk data graph directory",
+            description="Existing directory for the on-disk stores of data graphs. If empty, "
+            "the temporary directory of the system is used.",
+            default_value="",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=StringParameterType(),
+            name="service_address",
+            label="Validation service address",
+            description="Address `host:port` of a resident validation service started with "
+            "`python -m cmem_plugin_pyshacl.service`. The run is handed to the service, which "
+            "keeps SHACL and ontology graphs, compiled shapes and labels in memory between runs. "
+            "The plugin and the service need the same `PYSHACL_SERVICE_KEY` environment variable. "
+            "If the service is not reachable, the plugin validates in its own process.",
+            default_value="",
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="content_skolem_iris",
+            label="Content-based skolem IRIs",
+            description="If enabled, skolemized blank nodes get IRIs derived from a hash of their "
+            "content instead of random IRIs. Results get the same IRI in every run as long as "
+            "their focus node, path, source shape, constraint component and value are the same.",
+            default_value=False,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=BoolParameterType(),
+            name="diff_upload",
+            label="Upload differences only",
+            description="If enabled, the validation graph is compared with the stored validation "
+            "graph and only removed and added triples are sent. Requires `Content-based skolem "
+            "IRIs` and `Clear validation graph`.",
+            default_value=False,
+            advanced=True,
+        ),
+        PluginParameter(
+            param_type=StringParameterType(),
+            name="result_file",
+            label="Result file",
+            description="Path of a Parquet (`.parquet`) or Arrow IPC stream (`.arrows`) file the "
+            "validation results are written to, with the columns of the output entities. Values "
+            "are dictionary-encoded and compressed with Zstandard, rows are written in batches "
+            "while the results are formatted. Requires the `pyarrow` package.",
+            default_value="",
+            advanced=True,
+        ),
     ],
 )
 class ShaclValidation(WorkflowPlugin):
     """Plugin class"""
 
-    def __init__(  # noqa: PLR0913
+    def __init__(  # noqa: PLR0913 PLR0915
         self,
         data_graph_uri: str,
         shacl_graph_uri: str,
@@ -330,6 +698,31 @@ class ShaclValidation(WorkflowPlugin):
         remove_thesaurus_graph_type: bool = False,
         remove_shape_catalog_graph_type: bool = False,
         max_validation_depth: int = 15,
+        cache_graphs: bool = True,
+        cache_max_size: int = 1024,
+        workers: int = 1,
+        extract_neighbourhood: bool = False,
+        changeset_graph_uri: str = "",
+        push_down_targets: bool = False,
+        upload_batch_size: int = 100000,
+        profile_directory: str = "",
+        cache_inference: bool = False,
+        incremental_inference: bool = False,
+        reuse_shapes: bool = True,
+        batch_data_graphs: str = "",
+        batch_graph_pattern: str = "",
+        batch_graph_class: str = "",
+        batch_output: str = "combined",
+        batch_workers: int = 4,
+        max_results: int = 0,
+        abort_on_first: bool = False,
+        min_severity: str = "info",
+        disk_store_threshold: int = 0,
+        disk_store_directory: str = "",
+        service_address: str = "",
+        content_skolem_iris: bool = False,
+        diff_upload: bool = False,
+        result_file: str = "",
     ) -> None:
         self.data_graph_uri = data_graph_uri
         self.shacl_graph_uri = shacl_graph_uri
@@ -351,119 +744,198 @@ class ShaclValidation(WorkflowPlugin):
         self.remove_thesaurus_graph_type = remove_thesaurus_graph_type
         self.remove_shape_catalog_graph_type = remove_shape_catalog_graph_type
         self.max_validation_depth = max_validation_depth
+        self.cache_graphs = cache_graphs
+        self.cache_max_size = cache_max_size
+        self.workers = workers
+        self.extract_neighbourhood = extract_neighbourhood
+        self.changeset_graph_uri = changeset_graph_uri
+        self.push_down_targets = push_down_targets
+        self.upload_batch_size = upload_batch_size
+        self.profile_directory = profile_directory
+        self.cache_inference = cache_inference
+        self.incremental_inference = incremental_inference
+        self.reuse_shapes = reuse_shapes
+        self.batch_data_graphs = batch_data_graphs
+        self.batch_graph_pattern = batch_graph_pattern
+        self.batch_graph_class = batch_graph_class
+        self.batch_output = batch_output
+        self.batch_workers = batch_workers
+        self.max_results = max_results
+        self.abort_on_first = abort_on_first
+        self.min_severity = min_severity
+        self.disk_store_threshold = disk_store_threshold
+        self.disk_store_directory = disk_store_directory
+        self.service_address = service_address
+        self.content_skolem_iris = content_skolem_iris
+        self.diff_upload = diff_upload
+        self.result_file = result_file
+
+        self.label_indexes: dict[int, LabelIndex] = {}
+        self.graph_digests: dict[str, str] = {}
+        self.compiled_shapes: CompiledShapes | None = None
+        self.profiler = Profiler()
+        self.batch_graph_uris: list[str] = []
+        self.validation_lock = Lock()
+        self.known_graphs: dict[str, list[str]] = {}
+        self.memory_cache: MemoryGraphCache | None = None
+
+    def graph_label(self, graph: Graph, subject: Node | None) -> Literal | None:
+        """Get preferred label from the label index of graph"""
+        if subject is None:
+            return None
+        index = self.label_indexes.get(id(graph))
+        if index is None:
+            index = self.label_indexes[id(graph)] = LabelIndex(graph)
+        return index.get(subject)
 
-    def add_prov(self, validation_graph: Graph, utctime: str) -> Graph:
+    def add_prov(self, output: Graph, table: ResultTable, utctime: str) -> Graph:
         """Add provenance data"""
         self.log.info("Adding PROV information validation graph")
-        validation_report_uri = validation_graph.value(
-            predicate=RDF.type, object=SH.ValidationReport
-        )
-        if validation_report_uri:
-            validation_graph.add(
-                (validation_report_uri, PROV.wasDerivedFrom, URIRef(self.data_graph_uri))
-            )
-            validation_graph.add(
-                (validation_report_uri, PROV.wasInformedBy, URIRef(self.shacl_graph_uri))
-            )
-            validation_graph.add(
-                (
-                    validation_report_uri,
-                    PROV.generatedAtTime,
-                    Literal(utctime, datatype=XSD.dateTime),
+        with self.profiler.span("provenance") as span:
+            if table.report:
+                output.add((table.report, PROV.wasDerivedFrom, URIRef(self.data_graph_uri)))  # type: ignore[arg-type]
+                output.add((table.report, PROV.wasInformedBy, URIRef(self.shacl_graph_uri)))  # type: ignore[arg-type]
+                output.add(
+                    (
+                        table.report,  # type: ignore[arg-type]
+                        PROV.generatedAtTime,
+                        Literal(utctime, datatype=XSD.dateTime),
+                    )
                 )
-            )
-
-        return validation_graph
+            span.count = 3 if table.report else 0
+        return output
 
     def add_labels_val(
         self,
-        validation_graph: Graph,
+        output: Graph,
+        table: ResultTable,
         data_graph: Graph,
         shacl_graph: Graph,
-        validation_result_uris: list,
-    ) -> tuple:
-        """Add labels"""
+    ) -> list:
+        """Add labels, return focus nodes if shui:conforms flags are added"""
         self.log.info("Adding labels to validation graph")
         focus_nodes = []
-        validation_report_uri = validation_graph.value(
-            predicate=RDF.type, object=SH.ValidationReport
-        )
-        conforms = validation_graph.value(subject=validation_report_uri, predicate=SH.conforms)
-        label = f"SHACL validation report, conforms={conforms!s}"
-        if validation_report_uri:
-            validation_graph.add((validation_report_uri, RDFS.label, Literal(label)))
-        for validation_result_uri in validation_result_uris:
-            message = str(
-                validation_graph.value(subject=validation_result_uri, predicate=SH.resultMessage)
-            )
-            result_path = validation_graph.value(
-                subject=validation_result_uri, predicate=SH.resultPath
-            )
-            result_path_string = f"{result_path}: " if result_path else ""
+        label = f"SHACL validation report, conforms={table.conforms!s}"
+        if table.report:
+            output.add((table.report, RDFS.label, Literal(label)))  # type: ignore[arg-type]
+        for result in table:
+            message = str(result.result_message)
+            result_path_string = f"{result.result_path}: " if result.result_path else ""
             label = Literal(f"SHACL: {result_path_string}{message}")
-            validation_graph.add((validation_result_uri, RDFS.label, label))
+            output.add((result.node, RDFS.label, label))  # type: ignore[arg-type]
             if self.include_graphs_labels:
-                focus_node = validation_graph.value(
-                    subject=validation_result_uri, predicate=SH.focusNode
-                )
+                focus_node = result.focus_node
                 if self.add_shui_conforms:
                     focus_nodes.append(focus_node)
-                label = get_label(data_graph, focus_node)
-                if label and focus_node:
-                    validation_graph.add((focus_node, RDFS.label, label))  # type: ignore[arg-type]
-                value = validation_graph.value(subject=validation_result_uri, predicate=SH.value)
+                node_label = self.graph_label(data_graph, focus_node)
+                if node_label and focus_node:
+                    output.add((focus_node, RDFS.label, node_label))  # type: ignore[arg-type]
+                value = result.value
                 if value and isinstance(value, URIRef | BNode):
-                    label = get_label(data_graph, value)
-                    if label:
-                        validation_graph.add((value, RDFS.label, label))  # type: ignore[arg-type]
-                source_shape = validation_graph.value(
-                    subject=validation_result_uri, predicate=SH.sourceShape
-                )
-                label = get_label(shacl_graph, source_shape)
-                if label:
-                    validation_graph.add((source_shape, RDFS.label, label))  # type: ignore[arg-type]
-        return validation_graph, focus_nodes
+                    node_label = self.graph_label(data_graph, value)
+                    if node_label:
+                        output.add((value, RDFS.label, node_label))
+                source_shape = result.source_shape
+                node_label = self.graph_label(shacl_graph, source_shape)
+                if node_label:
+                    output.add((source_shape, RDFS.label, node_label))  # type: ignore[arg-type]
+        return focus_nodes
 
-    def add_shui_conforms_val(
-        self, validation_graph: Graph, validation_result_uris: list, focus_nodes: list
-    ) -> Graph:
+    def add_shui_conforms_val(self, output: Graph, table: ResultTable, focus_nodes: list) -> Graph:
         """Add shui conforms flag"""
         self.log.info("Adding shui:conforms flags to validation graph")
-        itr = focus_nodes if focus_nodes else validation_result_uris
-        for i in itr:
-            subj = i if focus_nodes else validation_graph.value(subject=i, predicate=SH.focusNode)
-            validation_graph.add(
-                (
+        itr = focus_nodes if focus_nodes else [result.focus_node for result in table]
+        for subj in itr:
+            output.add(
+                (  # type: ignore[arg-type]
                     subj,
                     URIRef("https://vocab.eccenca.com/shui/conforms"),
                     Literal(False, datatype=XSD.boolean),
                 )
             )
-        return validation_graph
+        return output
 
-    def post_graph(self, validation_graph: Graph) -> None:
-        """Post validation graph to cmem"""
+    def enrich_graph(
+        self,
+        output: Graph,
+        table: ResultTable,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        utctime: str,
+    ) -> None:
+        """Add labels, shui:conforms flags and provenance data of the results to output"""
+        focus_nodes = []
+        if self.add_labels:
+            with self.profiler.span("labelling") as span:
+                count = len(output)
+                focus_nodes = self.add_labels_val(output, table, data_graph, shacl_graph)
+                span.count = len(output) - count
+        if self.add_shui_conforms:
+            with self.profiler.span("conforms flags") as span:
+                count = len(output)
+                self.add_shui_conforms_val(output, table, focus_nodes)
+                span.count = len(output) - count
+        self.add_prov(output, table, utctime)
+
+    def post_graph(  # noqa: PLR0913
+        self,
+        validation_graph: Graph,
+        table: ResultTable,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        utctime: str,
+        skolemizer: Skolemizer | None = None,
+    ) -> None:
+        """Post validation graph to cmem in batches while adding labels and provenance data"""
         self.log.info("Posting SHACL validation graph...")
-        with NamedTemporaryFile(suffix=".nt") as temp:
-            validation_graph.serialize(temp.name, format="nt", encoding="utf-8")
-            res = post_streamed(
-                self.validation_graph_uri,
-                temp.name,
-                replace=self.clear_validation_graph,
-                content_type="application/n-triples",
+        start = time()
+        # blank nodes must not be split across batches
+        batch_size = self.upload_batch_size if skolemizer is not None else None
+        with (
+            self.profiler.span("upload") as span,
+            BatchedGraphWriter(
+                self.validation_graph_uri, self.clear_validation_graph, batch_size
+            ) as writer,
+        ):
+            writer.write(
+                validation_graph if skolemizer is None else skolemizer.triples(validation_graph)
             )
-        if res.status_code != 204:  # noqa: PLR2004
-            raise OSError(f"Error posting SHACL validation graph (status code {res.status_code}).")
+            enrichment = Graph()
+            self.enrich_graph(enrichment, table, data_graph, shacl_graph, utctime)
+            writer.write(enrichment)
+        span.count = writer.count
+        # serialization and uploads overlap with each other and with the enrichment
+        span.details.update(
+            batches=writer.batches,
+            serialize_seconds=round(writer.serialize_seconds, 6),
+            upload_seconds=round(writer.upload_seconds, 6),
+        )
+        self.log.info(
+            f"Posted {writer.count} triples in {writer.batches} batches in {e_t(start)} seconds"
+        )
 
-    def check_object(  # noqa: C901 PLR0912
+    def check_object(
         self, graph: Graph, subj: Node, pred: URIRef, data_graph: Graph, shacl_graph: Graph
     ) -> str:
         """Format RDF objects for entities output"""
+        return self.format_object(
+            graph, graph.value(subject=subj, predicate=pred), pred, data_graph, shacl_graph
+        )
+
+    def format_object(  # noqa: C901 PLR0912 PLR0913
+        self,
+        graph: Graph,
+        val: Node | None,
+        pred: URIRef,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        renderer: BlankNodeRenderer | None = None,
+    ) -> str:
+        """Format RDF object of a result for entities output"""
         if pred in (SH.sourceShape, SH.conforms):
             label_g = shacl_graph
         elif pred in (SH.value, SH.resultPath, SH.focusNode):
             label_g = data_graph
-        val = graph.value(subject=subj, predicate=pred)
         obj = val if val else None
         res_val = ""
         if obj:
@@ -472,21 +944,22 @@ class ShaclValidation(WorkflowPlugin):
                     SH.sourceConstraintComponent,
                     SH.resultSeverity,
                 ):
-                    label = get_label(label_g, obj)
+                    label = self.graph_label(label_g, obj)
                     res_val = str(label) if label else obj
                 else:
                     res_val = obj
             elif isinstance(obj, BNode):
                 if self.include_graphs_labels:
-                    label = get_label(label_g, obj)
+                    label = self.graph_label(label_g, obj)
                     if label:
                         res_val = str(label)
                 if not res_val:
-                    # first 50 lines of turtle CBD
-                    res_val = graph.cbd(obj).serialize(format="turtle")
-                    cbd_lines = res_val.split("\n")
-                    if len(cbd_lines) > 50:  # noqa: PLR2004
-                        res_val = "\n".join(cbd_lines[:50]) + "\n..."
+                    # property path syntax or first 50 lines of turtle
+                    renderer = renderer or BlankNodeRenderer(graph)
+                    if pred == SH.resultPath:
+                        res_val = renderer.render_path(obj)
+                    else:
+                        res_val = renderer.render(obj)
             elif isinstance(obj, Literal):
                 if pred == SH.value:
                     res_val = f'"{obj}"^^<{obj.datatype}>' if obj.datatype else f'"{obj}"'
@@ -494,72 +967,312 @@ class ShaclValidation(WorkflowPlugin):
                     res_val = str(obj)
         return res_val
 
-    def make_entities(
-        self, validation_graph: Graph, data_graph: Graph, shacl_graph: Graph, utctime: str
-    ) -> Entities:
-        """Create entities"""
-        self.log.info("Creating entities")
-        shp = [
-            "focusNode",
-            "resultPath",
-            "value",
-            "sourceShape",
-            "sourceConstraintComponent",
-            # "detail",
-            "resultMessage",
-            "resultSeverity",
-        ]
-        entities = []
-        conforms = next(iter(validation_graph.objects(predicate=SH.conforms)))
-        for validation_result in list(validation_graph.subjects(RDF.type, SH.ValidationResult)):
+    def result_values(
+        self,
+        validation_graph: Graph,
+        table: ResultTable,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        utctime: str,
+    ) -> Iterator[tuple[Node, list]]:
+        """Yield the nodes and entity values of validation results"""
+        renderer = BlankNodeRenderer(validation_graph)
+        for result in table:
             values = [
                 [
-                    self.check_object(
-                        validation_graph,
-                        validation_result,
-                        SH[p],
-                        data_graph,
-                        shacl_graph,
+                    self.format_object(
+                        validation_graph, result.get(p), p, data_graph, shacl_graph, renderer
                     )
                 ]
-                for p in shp
-            ] + [[conforms], [self.data_graph_uri], [self.shacl_graph_uri], [utctime]]
-            entities.append(Entity(uri=validation_result, values=values))
-        paths = [EntityPath(path=SH[p]) for p in shp] + [
-            EntityPath(path=SH.conforms),
-            EntityPath(path=PROV.wasDerivedFrom),
-            EntityPath(path=PROV.wasInformedBy),
-            EntityPath(path=PROV.generatedAtTime),
-        ]
+                for p in ENTITY_PATHS
+            ] + [[table.conforms], [self.data_graph_uri], [self.shacl_graph_uri], [utctime]]
+            yield result.node, values
+
+    def write_result_file(
+        self,
+        validation_graph: Graph,
+        table: ResultTable,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        utctime: str,
+    ) -> None:
+        """Write the entity values of validation results to the result file in batches"""
+        self.log.info(f"Writing results to {self.result_file}...")
+        start = time()
+        columns = [str(path.path) for path in entity_schema().paths]
+        with (
+            self.profiler.span("result file") as span,
+            ResultFileWriter(Path(self.result_file), columns) as writer,
+        ):
+            for node, values in self.result_values(
+                validation_graph, table, data_graph, shacl_graph, utctime
+            ):
+                writer.add(str(node), [None if v[0] is None else str(v[0]) for v in values])
+        span.count = writer.count
+        span.details["batches"] = writer.batches
+        self.log.info(
+            f"Wrote {writer.count} results in {writer.batches} batches in {e_t(start)} seconds"
+        )
+
+    def iter_entities(
+        self,
+        validation_graph: Graph,
+        table: ResultTable,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        utctime: str,
+    ) -> Iterator[Entity]:
+        """Yield entities of validation results, the span includes the time of the consumer"""
+        with self.profiler.span("entities") as span:
+            span.count = 0
+            for node, values in self.result_values(
+                validation_graph, table, data_graph, shacl_graph, utctime
+            ):
+                yield Entity(uri=node, values=values)
+                span.count += 1
+        if isinstance(data_graph, DiskGraph):
+            data_graph.close()
+        self.log.info(f"Profile of entities: {json.dumps(span.to_dict())}")
+
+    def make_entities(
+        self,
+        validation_graph: Graph,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        utctime: str,
+        table: ResultTable | None = None,
+    ) -> Entities:
+        """Create entities, formatted while they are consumed"""
+        self.log.info("Creating entities")
+        if table is None:
+            table = ResultTable.from_graph(validation_graph)
         return Entities(
-            entities=entities,
-            schema=EntitySchema(type_uri=SH.ValidationResult, paths=paths),
+            entities=self.iter_entities(validation_graph, table, data_graph, shacl_graph, utctime),
+            schema=entity_schema(),
         )
 
-    def get_graph(self, uri: str) -> Graph:
-        """Get graph from cmem"""
-        graph = Graph()
-        graph.parse(data=get(uri, owl_imports_resolution=self.owl_imports).text, format="turtle")
+    def get_graph(
+        self,
+        uri: str,
+        graph: Graph | None = None,
+        exclude: Collection[tuple[Node, Node, Node]] = (),
+    ) -> Graph:
+        """Get graph from cmem, streamed as N-Triples into graph or a new in-memory graph"""
+        with get(
+            uri,
+            owl_imports_resolution=self.owl_imports,
+            accept="application/n-triples",
+            stream=True,
+        ) as response:
+            return self.parse_graph(uri, response, graph, exclude)
+
+    def parse_graph(
+        self,
+        uri: str,
+        response: StreamedResponse,
+        graph: Graph | None = None,
+        exclude: Collection[tuple[Node, Node, Node]] = (),
+    ) -> Graph:
+        """Parse the streamed N-Triples of graph uri into graph or a new in-memory graph"""
+        graph = Graph() if graph is None else graph
+        start = time()
+        with self.profiler.span("fetch and parse") as span:
+            stats = parse_ntriples_stream(response, graph, exclude=exclude)
+        self.graph_digests[uri] = stats.digest
+        span.count = stats.triples
+        if exclude:
+            span.details["skipped"] = stats.skipped
+        # fetching and parsing are interleaved, the parser waits for the next chunk
+        span.details.update(graph=uri, bytes=stats.size, fetch_seconds=round(stats.wait_seconds, 6))
+        elapsed = max(time() - start, 1e-6)
+        self.log.info(
+            f"Loaded {stats.triples} triples ({round(stats.size / 1e6, 3)} MB) from <{uri}> in "
+            f"{round(elapsed, 3)} seconds ({int(stats.triples / elapsed)} triples/s, "
+            f"{round(stats.size / 1e6 / elapsed, 3)} MB/s)"
+        )
+        return graph
+
+    def get_graph_state(self, uri: str) -> list:
+        """Get triple count and modification date of graph"""
+        query = f"""SELECT ?count ?modified WHERE {{
+  {{ SELECT (COUNT(*) AS ?count) FROM <{uri}> WHERE {{ ?s ?p ?o }} }}
+  OPTIONAL {{ GRAPH <{uri}> {{ <{uri}> <{DCTERMS.modified}> ?modified }} }}
+}}"""  # noqa: S608
+        res = json.loads(sparql.post(query, owl_imports_resolution=self.owl_imports))
+        return [
+            {key: value["value"] for key, value in binding.items()}
+            for binding in res["results"]["bindings"]
+        ]
+
+    def graph_cache(self) -> GraphCache:
+        """Get the on-disk graph cache, warn if its directory is not private"""
+        cache = GraphCache(max_size=self.cache_max_size * 1024**2)
+        if not cache.available():
+            self.log.warning(
+                f"Graph cache directory {cache.directory} is accessible by other users, not used"
+            )
+        return cache
+
+    def get_cached_graph(self, uri: str) -> Graph:
+        """Get graph from the memory or on-disk cache by the digest of its content from cmem"""
+        with TemporaryFile() as file:
+            with (
+                self.profiler.span("fetch") as span,
+                get(
+                    uri,
+                    owl_imports_resolution=self.owl_imports,
+                    accept="application/n-triples",
+                    stream=True,
+                ) as response,
+            ):
+                key = cache_key(uri, self.owl_imports, spool_stream(response, file))
+                span.details.update(graph=uri, bytes=file.tell())
+            entry = None if self.memory_cache is None else self.memory_cache.get(key)
+            if entry is None:
+                cache = self.graph_cache()
+                graph = cache.get(key)
+                if graph is None:
+                    graph = self.parse_graph(uri, FileResponse(file))
+                    cache.put(key, graph)
+                else:
+                    self.log.info(f"Using cached graph <{uri}>")
+                if self.memory_cache is not None:
+                    entry = graph, self.memory_cache.put(key, graph)
+            else:
+                graph = entry[0]
+                self.log.info(f"Using graph <{uri}> from memory")
+        if entry is not None:
+            # labels of graphs kept in memory are memoized across runs
+            index = self.label_indexes[id(graph)] = LabelIndex(graph)
+            index.labels = entry[1]
+        # the cache key identifies the content of cached graphs
+        self.graph_digests[uri] = key
+        return graph
+
+    def disk_graph(self, uri: str) -> DiskGraph | None:
+        """Create an on-disk graph if the graph in cmem reaches the threshold, None otherwise"""
+        if not self.disk_store_threshold:
+            return None
+        count = int(self.get_graph_state(uri)[0]["count"])
+        if count < self.disk_store_threshold:
+            return None
+        self.log.info(f"Graph <{uri}> has {count} triples, using on-disk store")
+        return DiskGraph(self.disk_store_directory)
+
+    def load_graph(self, name: str, uri: str, cached: bool = False) -> Graph:
+        """Load graph from cmem and log the elapsed time"""
+        disk_graph = self.disk_graph(uri) if name == "data" else None
+        target = "memory" if disk_graph is None else "on-disk store"
+        self.log.info(f"Loading {name} graph <{uri}> into {target}...")
+        start = time()
+        if cached:
+            graph = self.get_cached_graph(uri)
+        else:
+            exclude = self.graph_type_filter() if name == "data" else set()
+            graph = self.get_graph(uri, disk_graph, exclude)
+        self.log.info(f"Finished loading {name} graph in {e_t(start)} seconds")
         return graph
 
-    def check_parameters(  # noqa: C901 PLR0912
+    def select_nodes(self, query: str) -> list[Node]:
+        """Get the values of the first variable of a SPARQL SELECT query"""
+        res = json.loads(sparql.post(query, owl_imports_resolution=self.owl_imports))
+        from rdflib.plugins.sparql.results.jsonresults import parseJsonTerm  # noqa: PLC0415
+
+        var = res["head"]["vars"][0]
+        return [parseJsonTerm(binding[var]) for binding in res["results"]["bindings"]]
+
+    def construct_ntriples(self, query: str) -> str:
+        """Get the result of a SPARQL CONSTRUCT query as N-Triples"""
+        return str(
+            sparql.post(
+                query, owl_imports_resolution=self.owl_imports, accept="application/n-triples"
+            )
+        )
+
+    def fetch_data_graph(self, shacl_graph: Graph) -> Graph:
+        """Fetch the focus node neighbourhoods of the shapes from the data graph with SPARQL"""
+        profile = analyze_shapes(shacl_graph)
+        if self.inference != "none":
+            reason = "inference is enabled"
+        elif not profile.bounded:
+            reason = f"shapes are unbounded: {profile.unbounded}"
+        else:
+            self.log.info(f"Querying focus node neighbourhoods in <{self.data_graph_uri}>...")
+            start = time()
+            fetcher = NeighbourhoodFetcher(profile, self.data_graph_uri)
+            try:
+                with self.profiler.span("fetch neighbourhoods") as span:
+                    graph, focus_count = fetcher.fetch(
+                        self.select_nodes, self.construct_ntriples, self.graph_type_filter()
+                    )
+                    span.count = len(graph)
+            except BlankNodesError as error:
+                reason = str(error)
+            else:
+                self.log.info(
+                    f"Fetched {len(graph)} triples around {focus_count} focus nodes with depth "
+                    f"{profile.depth} in {e_t(start)} seconds"
+                )
+                return graph
+        self.log.info(f"Loading full data graph, {reason}")
+        return self.load_graph("data", self.data_graph_uri)
+
+    def load_graphs(self) -> tuple[Graph, Graph, Graph | None]:
+        """Load data, SHACL and ontology graphs concurrently"""
+        uris = {"data": self.data_graph_uri, "SHACL": self.shacl_graph_uri}
+        if self.push_down_targets:
+            del uris["data"]
+        if self.ontology_graph_uri:
+            uris["ontology"] = self.ontology_graph_uri
+        start = time()
+        with ThreadPoolExecutor(max_workers=len(uris)) as executor:
+            futures = {
+                name: executor.submit(
+                    self.load_graph, name, uri, self.cache_graphs and name != "data"
+                )
+                for name, uri in uris.items()
+            }
+            graphs = {name: future.result() for name, future in futures.items()}
+        if self.push_down_targets:
+            graphs["data"] = self.fetch_data_graph(graphs["SHACL"])
+        self.log.info(f"Finished loading {len(graphs)} graphs in {e_t(start)} seconds")
+        return graphs["data"], graphs["SHACL"], graphs.get("ontology")
+
+    def check_parameters(  # noqa: C901 PLR0912 PLR0915
         self,
     ) -> None:
         """Validate plugin parameters"""
         self.log.info("Validating parameters...")
-        if not self.output_entities and not self.generate_graph:
+        if not self.output_entities and not self.generate_graph and not self.result_file:
             raise ValueError(
-                "Generate validation graph or Output values parameter needs to be set to true"
+                "Generate validation graph, Output values or Result file parameter needs to be set"
             )
-        if not validators.url(self.data_graph_uri):
+        if not is_url(self.data_graph_uri):
             raise ValueError("Data graph URI parameter is invalid")
-        if not validators.url(self.shacl_graph_uri):
+        if not is_url(self.shacl_graph_uri):
             raise ValueError("SHACL graph URI parameter is invalid")
-        graphs_dict = {graph["iri"]: graph["assignedClasses"] for graph in get_graphs_list()}
+        if self.ontology_graph_uri and not is_url(self.ontology_graph_uri):
+            raise ValueError("Ontology graph URI parameter is invalid")
+        if self.generate_graph and not is_url(self.validation_graph_uri):
+            raise ValueError("Validation graph URI parameter is invalid")
+        if self.changeset_graph_uri and not is_url(self.changeset_graph_uri):
+            raise ValueError("Changeset graph URI parameter is invalid")
+        batch_uris = self.batch_data_graphs.split()
+        for uri in batch_uris:
+            if not is_url(uri):
+                raise ValueError(f"Batch data graph URI <{uri}> is invalid")
+        graphs_dict = self.graph_classes(
+            [
+                self.data_graph_uri,
+                self.shacl_graph_uri,
+                self.ontology_graph_uri,
+                self.validation_graph_uri if self.generate_graph else "",
+                self.changeset_graph_uri,
+                *batch_uris,
+            ]
+        )
 
         if self.ontology_graph_uri:
-            if not validators.url(self.ontology_graph_uri):
-                raise ValueError("Ontology graph URI parameter is invalid")
             if self.ontology_graph_uri not in graphs_dict:
                 raise ValueError(f"Ontology graph <{self.ontology_graph_uri}> not found")
             if "http://www.w3.org/2002/07/owl#Ontology" not in graphs_dict[self.ontology_graph_uri]:
@@ -575,94 +1288,621 @@ class ShaclValidation(WorkflowPlugin):
             raise ValueError(f"Invalid graph type for data graph <{self.data_graph_uri}>")
         if "https://vocab.eccenca.com/shui/ShapeCatalog" not in graphs_dict[self.shacl_graph_uri]:
             raise ValueError(f"Invalid graph type for SHACL graph <{self.shacl_graph_uri}>")
-        if self.generate_graph:
-            if not validators.url(self.validation_graph_uri):
-                raise ValueError("Validation graph URI parameter is invalid")
-            if self.validation_graph_uri in graphs_dict:
-                self.log.warning(f"Graph <{self.validation_graph_uri}> already exists")
+        if self.generate_graph and self.validation_graph_uri in graphs_dict:
+            self.log.warning(f"Graph <{self.validation_graph_uri}> already exists")
         if not self.add_labels:
             self.include_graphs_labels = False
 
+        if self.changeset_graph_uri:
+            if self.changeset_graph_uri not in graphs_dict:
+                raise ValueError(f"Changeset graph <{self.changeset_graph_uri}> not found")
+            if self.generate_graph and not self.skolemize:
+                raise ValueError(
+                    "Blank node skolemization needs to be enabled to patch the validation graph"
+                )
+
         if self.inference not in ("none", "rdfs", "owlrl", "both"):
             raise ValueError("Invalid value for inference parameter")
 
         if self.max_validation_depth not in range(1, 1000):
             raise ValueError("Invalid value for maximum evaluation depth")
 
-    def remove_graph_type(self, data_graph: Graph, iri: str) -> None:
-        """Remove triple <data_graph_uri> a <iri>"""
-        self.log.info(f"Removing graph type <{iri}> from data graph")
-        data_graph.remove((URIRef(self.data_graph_uri), RDF.type, URIRef(iri)))
+        if self.cache_max_size < 1:
+            raise ValueError("Invalid value for graph cache size")
 
-    def execute(  # noqa: C901
-        self,
-        inputs: tuple,  # noqa: ARG002
-        context: ExecutionContext = ExecutionContext,
-    ) -> Entities | None:
-        """Execute plugin"""
-        setup_cmempy_user_access(context.user)
-        self.check_parameters()
-        self.log.info(f"Loading data graph <{self.data_graph_uri}> into memory...")
-        start = time()
-        data_graph = self.get_graph(self.data_graph_uri)
-        self.log.info(f"Finished loading data graph in {e_t(start)} seconds")
+        if self.workers < 1:
+            raise ValueError("Invalid value for number of validation worker processes")
+
+        if self.upload_batch_size < 1:
+            raise ValueError("Invalid value for upload batch size")
+
+        if self.profile_directory and not Path(self.profile_directory).is_dir():
+            raise ValueError(f"Profile directory {self.profile_directory} not found")
+
+        if self.incremental_inference and not self.cache_inference:
+            raise ValueError("Incremental inference requires the Cache inference closure option")
+
+        if self.disk_store_threshold < 0:
+            raise ValueError("Invalid value for on-disk data graph threshold")
+
+        if self.disk_store_threshold and not has_bsddb:
+            raise ValueError("The on-disk data graph store requires the berkeleydb package")
+
+        if self.disk_store_directory and not Path(self.disk_store_directory).is_dir():
+            raise ValueError(f"On-disk data graph directory {self.disk_store_directory} not found")
+
+        if self.result_file:
+            result_file = Path(self.result_file)
+            if result_file.suffix not in FORMATS:
+                raise ValueError(f"Result file suffix needs to be one of {', '.join(FORMATS)}")
+            if not result_file.parent.is_dir():
+                raise ValueError(f"Result file directory {result_file.parent} not found")
+            if not has_pyarrow:
+                raise ValueError("The result file requires the pyarrow package")
+
+        if self.max_results < 0:
+            raise ValueError("Invalid value for maximum number of results")
+
+        if self.min_severity not in ("info", "warning", "violation"):
+            raise ValueError("Invalid value for minimum result severity")
+
+        if self.batch_output not in ("combined", "per_graph"):
+            raise ValueError("Invalid value for batch validation graphs parameter")
+
+        if self.batch_workers < 1:
+            raise ValueError("Invalid value for number of batch worker threads")
+
+        self.batch_graph_uris = self.select_batch_graphs(graphs_dict)
+        if self.batch_graph_uris and self.changeset_graph_uri:
+            raise ValueError("Changeset graph URI parameter is not available in batch mode")
+
+        if self.batch_graph_uris and self.result_file:
+            raise ValueError("Result file parameter is not available in batch mode")
+
+        if self.generate_graph and self.diff_upload:
+            if not (self.skolemize and self.content_skolem_iris):
+                raise ValueError("Uploading differences requires content-based skolem IRIs")
+            if not self.clear_validation_graph:
+                raise ValueError("Uploading differences requires the Clear validation graph option")
+            if self.batch_graph_uris and self.batch_output == "combined":
+                raise ValueError(
+                    "Uploading differences is not available for a combined batch validation graph"
+                )
+
+    def select_batch_graphs(self, graphs_dict: dict[str, list[str]]) -> list[str]:
+        """Get the data graphs of the batch, empty if no batch parameter is set"""
+        if not (
+            self.batch_data_graphs.strip() or self.batch_graph_pattern or self.batch_graph_class
+        ):
+            return []
+        uris = [self.data_graph_uri]
+        for uri in self.batch_data_graphs.split():
+            if uri not in graphs_dict:
+                raise ValueError(f"Data graph <{uri}> not found")
+            if not any(check in graphs_dict[uri] for check in DATA_GRAPH_TYPES):
+                raise ValueError(f"Invalid graph type for data graph <{uri}>")
+            uris.append(uri)
+        try:
+            pattern = re.compile(self.batch_graph_pattern or ".*")
+        except re.error as error:
+            raise ValueError(f"Batch graph URI pattern parameter is invalid: {error}") from error
+        if self.batch_graph_class and not is_url(self.batch_graph_class):
+            raise ValueError("Batch graph class parameter is invalid")
+        if self.batch_graph_pattern or self.batch_graph_class:
+            classes = [self.batch_graph_class] if self.batch_graph_class else DATA_GRAPH_TYPES
+            excluded = {self.shacl_graph_uri, self.ontology_graph_uri, self.validation_graph_uri}
+            uris += [
+                uri
+                for uri in self.graphs_of_classes(classes)
+                if uri not in excluded
+                and not uri.startswith(f"{self.validation_graph_uri}/")
+                and pattern.fullmatch(uri)
+            ]
+        return list(dict.fromkeys(uris))
+
+    def graph_classes(self, uris: list[str]) -> dict[str, list[str]]:
+        """Get the classes of the existing graphs of uris, cached for the plugin instance"""
+        uris = [uri for uri in dict.fromkeys(uris) if uri]
+        # graphs are looked up again until they are found
+        missing = [uri for uri in uris if uri not in self.known_graphs]
+        if missing:
+            values = " ".join(f"<{uri}>" for uri in missing)
+            # the existing graphs are selected first, their types are looked up with ?graph bound
+            query = f"""SELECT ?graph ?class WHERE {{
+  {{ SELECT ?graph WHERE {{
+    VALUES ?graph {{ {values} }}
+    FILTER EXISTS {{ GRAPH ?graph {{ ?s ?p ?o }} }}
+  }} }}
+  OPTIONAL {{ GRAPH ?graph {{ ?graph a ?class }} }}
+}}"""
+            res = json.loads(sparql.post(query, owl_imports_resolution=False))
+            for binding in res["results"]["bindings"]:
+                classes = self.known_graphs.setdefault(binding["graph"]["value"], [])
+                if "class" in binding:
+                    classes.append(binding["class"]["value"])
+        return {uri: self.known_graphs[uri] for uri in uris if uri in self.known_graphs}
 
-        if self.remove_dataset_graph_type:
-            self.remove_graph_type(data_graph, "http://rdfs.org/ns/void#Dataset")
-        if self.remove_thesaurus_graph_type:
-            self.remove_graph_type(data_graph, "https://vocab.eccenca.com/dsm/ThesaurusProject")
-        if self.remove_shape_catalog_graph_type:
-            self.remove_graph_type(data_graph, "https://vocab.eccenca.com/shui/ShapeCatalog")
+    def graphs_of_classes(self, classes: list[str]) -> list[str]:
+        """Get the graphs which are instances of one of the classes"""
+        values = " ".join(f"<{iri}>" for iri in classes)
+        query = f"""SELECT DISTINCT ?graph WHERE {{
+  VALUES ?class {{ {values} }}
+  GRAPH ?graph {{ ?graph a ?class }}
+}}"""
+        return [str(node) for node in self.select_nodes(query)]
 
-        self.log.info(f"Loading SHACL graph <{self.shacl_graph_uri}> into memory...")
+    def graph_type_filter(self) -> set[tuple[Node, Node, Node]]:
+        """Get the graph type triples of the data graph which are skipped while it is loaded"""
+        removed = (
+            (self.remove_dataset_graph_type, "http://rdfs.org/ns/void#Dataset"),
+            (self.remove_thesaurus_graph_type, "https://vocab.eccenca.com/dsm/ThesaurusProject"),
+            (self.remove_shape_catalog_graph_type, "https://vocab.eccenca.com/shui/ShapeCatalog"),
+        )
+        triples: set[tuple[Node, Node, Node]] = set()
+        for remove, iri in removed:
+            if remove:
+                self.log.info(f"Removing graph type <{iri}> from data graph")
+                triples.add((URIRef(self.data_graph_uri), RDF.type, URIRef(iri)))
+        return triples
+
+    def extract_data_graph(self, data_graph: Graph, shacl_graph: Graph) -> Graph:
+        """Extract the neighbourhoods of the focus nodes from the data graph"""
+        if self.inference != "none":
+            self.log.info("Validating full data graph, inference is enabled")
+            return data_graph
+        profile = analyze_shapes(shacl_graph)
+        if not profile.bounded:
+            self.log.info(f"Validating full data graph, shapes are unbounded: {profile.unbounded}")
+            return data_graph
         start = time()
-        shacl_graph = self.get_graph(self.shacl_graph_uri)
-        self.log.info(f"Finished loading SHACL graph in {e_t(start)} seconds")
+        with self.profiler.span("neighbourhood extraction") as span:
+            graph, focus_count = extract_neighbourhood(data_graph, profile)
+            span.count = len(graph)
+        self.log.info(
+            f"Extracted {len(graph)} of {len(data_graph)} triples around {focus_count} focus "
+            f"nodes with depth {profile.depth} in {e_t(start)} seconds"
+        )
+        return graph
 
-        if self.ontology_graph_uri:
-            self.log.info(f"Loading ontology graph <{self.ontology_graph_uri}> into memory...")
-            ontology_graph = self.get_graph(self.ontology_graph_uri)
-            self.log.info(f"Finished loading ontology graph in {e_t(start)} seconds")
-        else:
-            ontology_graph = None
+    def full_validation_reason(
+        self, profile: ShapesProfile, changeset_graph: Graph, changed: set[Node]
+    ) -> str:
+        """Get the reason why the changeset requires validating the full data graph"""
+        if self.inference != "none":
+            return "inference is enabled"
+        if self.advanced or self.js:
+            return "SHACL advanced or SHACL-JS features are enabled"
+        if not profile.bounded:
+            return f"shapes are unbounded: {profile.unbounded}"
+        if (None, RDFS.subClassOf, None) in changeset_graph:
+            return "changeset contains rdfs:subClassOf triples"
+        if any(isinstance(node, BNode) for node in changed):
+            return "changeset contains blank nodes"
+        return ""
 
-        self.log.info("Starting SHACL validation...")
+    def prepare_incremental(
+        self, data_graph: Graph, shacl_graph: Graph
+    ) -> tuple[set[Node] | None, Graph | None]:
+        """Get focus node candidates affected by the changeset and the previous validation graph"""
+        previous_graph = None
+        if self.generate_graph:
+            if self.validation_graph_uri not in self.graph_classes([self.validation_graph_uri]):
+                self.log.info("Validating full data graph, validation graph not found")
+                return None, None
+            previous_graph = self.load_graph("validation", self.validation_graph_uri)
+            if (None, RDF.type, SH.ValidationReport) not in previous_graph:
+                self.log.info("Validating full data graph, no previous validation report found")
+                return None, None
+        changeset_graph = self.load_graph("changeset", self.changeset_graph_uri)
+        subjects, objects = changed_resources(changeset_graph)
+        changed = subjects | objects
+        profile = analyze_shapes(shacl_graph)
+        reason = self.full_validation_reason(profile, changeset_graph, changed)
+        if not reason:
+            affected = affected_nodes(data_graph, profile, subjects, objects)
+            if any(isinstance(node, BNode) for node in affected & profile.focus_nodes(data_graph)):
+                reason = "blank node focus nodes are affected"
+        if reason:
+            self.log.info(f"Validating full data graph, {reason}")
+            return None, None
+        self.log.info(
+            f"Validating {len(affected)} resources within depth {profile.depth} of "
+            f"{len(changed)} changed resources"
+        )
+        return affected, previous_graph
+
+    def patch_graph(
+        self, previous_graph: Graph, validation_graph: Graph, affected: set[Node]
+    ) -> None:
+        """Replace the results of re-validated focus nodes in the validation graph"""
+        removed, added = patch_report(
+            previous_graph, validation_graph, affected, self.validation_graph_uri
+        )
+        self.update_graph(removed, added)
+
+    def skolemizer(self, validation_graph: Graph) -> Skolemizer | None:
+        """Get the skolemizer of the validation graph, None without skolemization"""
+        if not self.skolemize:
+            return None
+        if self.content_skolem_iris:
+            return ContentSkolemizer(
+                validation_graph, self.validation_graph_uri, self.data_graph_uri
+            )
+        return Skolemizer(self.validation_graph_uri)
+
+    def update_graph(self, removed: Graph, added: Graph) -> None:
+        """Remove and add triples of the validation graph with SPARQL updates"""
+        self.log.info(
+            f"Patching SHACL validation graph, removing {len(removed)} and adding {len(added)} "
+            "triples..."
+        )
+        with self.profiler.span("upload") as span:
+            for query in update_queries(self.validation_graph_uri, removed, added):
+                update.post(query)
+            span.count = len(removed) + len(added)
+
+    def diff_graph(  # noqa: PLR0913
+        self,
+        validation_graph: Graph,
+        table: ResultTable,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        utctime: str,
+        skolemizer: Skolemizer,
+    ) -> None:
+        """Send the differences of the validation graph to the stored validation graph"""
+        if self.validation_graph_uri not in self.graph_classes([self.validation_graph_uri]):
+            self.log.info("Posting full SHACL validation graph, validation graph not found")
+            self.post_graph(validation_graph, table, data_graph, shacl_graph, utctime, skolemizer)
+            return
+        previous_graph = self.load_graph("validation", self.validation_graph_uri)
+        output = skolemizer.graph(validation_graph)
+        self.enrich_graph(output, table, data_graph, shacl_graph, utctime)
+        self.update_graph(previous_graph - output, output - previous_graph)
+
+    def infer_data_graph(self, data_graph: Graph, ontology_graph: Graph | None) -> Graph:
+        """Get the inference closure of the data graph from the cache or materialize it"""
+        digest = self.graph_digests[self.data_graph_uri]
+        closures = ClosureCache(
+            self.graph_cache(),
+            self.data_graph_uri,
+            self.owl_imports,
+            self.inference,
+            self.graph_digests.get(self.ontology_graph_uri),
+            self.remove_dataset_graph_type,
+            self.remove_thesaurus_graph_type,
+            self.remove_shape_catalog_graph_type,
+        )
         start = time()
-        _conforms, validation_graph, _results_text = validate(
+        with self.profiler.span("inference") as span:
+            closure = closures.get(digest)
+            if closure is not None:
+                span.details["mode"] = "cached"
+            else:
+                previous = closures.previous() if self.incremental_inference else None
+                snapshot = (
+                    closures.snapshot(digest, data_graph) if self.incremental_inference else None
+                )
+                if previous is not None and is_addition(previous[0], data_graph):
+                    span.details["mode"] = "incremental"
+                    closure = previous[1]
+                    closure += data_graph
+                    expand_graph(closure, None, self.inference)
+                else:
+                    span.details["mode"] = "full"
+                    closure = data_graph
+                    expand_graph(closure, ontology_graph, self.inference)
+                closures.put(digest, closure, snapshot)
+            span.count = len(closure)
+        self.log.info(
+            f"Inference closure of {len(closure)} triples ({span.details['mode']}) in "
+            f"{e_t(start)} seconds"
+        )
+        return closure
+
+    def compile_shapes(self, shacl_graph: Graph) -> CompiledShapes | None:
+        """Get the compiled shapes of the SHACL graph, shared by runs while it is unchanged"""
+        if not self.reuse_shapes or self.advanced or self.js:
+            return None
+        digest = self.graph_digests.get(self.shacl_graph_uri)
+        with self.profiler.span("shapes compilation") as span:
+            if digest is None:
+                compiled, reused = CompiledShapes(shacl_graph), False
+            else:
+                key = cache_key(self.shacl_graph_uri, self.owl_imports, digest)
+                compiled, reused = REGISTRY.get(key, shacl_graph)
+            if self.meta_shacl:
+                compiled.meta_validate(self.inference)
+            # validations of all runs sharing the compiled shapes are serialized
+            self.validation_lock = compiled.lock
+            span.count = len(compiled.shapes)
+            span.details["reused"] = reused
+        self.log.info(
+            f"{'Reusing' if reused else 'Compiled'} {len(compiled.shapes)} shapes of "
+            f"<{self.shacl_graph_uri}>"
+        )
+        return compiled
+
+    def run_validation(  # noqa: PLR0913
+        self,
+        data_graph: Graph,
+        shacl_graph: Graph,
+        ontology_graph: Graph | None,
+        focus_filter: set[Node] | None = None,
+        inferred: bool = False,
+        limit: ResultLimit | None = None,
+    ) -> tuple[bool, Graph]:
+        """Run pySHACL validation, sharded across worker processes if enabled"""
+        inference = "none" if inferred else self.inference
+        limit = limit or ResultLimit()
+        workers = self.workers
+        if workers > 1 and isinstance(data_graph, DiskGraph):
+            # the on-disk store cannot be copied to the worker processes
+            self.log.warning(
+                "Parallel validation is not available with the on-disk data graph store, "
+                "validating in a single process"
+            )
+            workers = 1
+        if workers > 1 and (self.advanced or self.js):
+            self.log.warning(
+                "Parallel validation is not available with SHACL advanced or SHACL-JS "
+                "features, validating in a single process"
+            )
+        elif workers > 1 or focus_filter is not None:
+            return validate_parallel(
+                data_graph,
+                shacl_graph,
+                ontology_graph,
+                self.log,
+                workers,
+                inference=inference,
+                meta_shacl=self.meta_shacl and self.compiled_shapes is None,
+                max_validation_depth=self.max_validation_depth,
+                focus_filter=focus_filter,
+                shapes_graph=self.compiled_shapes.shapes_graph if self.compiled_shapes else None,
+                limit=limit,
+            )
+        compiled = self.compiled_shapes
+        if compiled is None and limit.active:
+            # the shapes are validated through the limit, compiled for this run only
+            compiled = CompiledShapes(shacl_graph)
+            if self.meta_shacl:
+                compiled.meta_validate(inference)
+            if self.js:
+                compiled.shapes_graph.enable_js()
+        if compiled is not None:
+            conforms, validation_graph, _results_text = compiled.validate(
+                data_graph,
+                ontology_graph,
+                limit,
+                inference=inference,
+                advanced=self.advanced,
+                use_js=self.js,
+                max_validation_depth=self.max_validation_depth,
+                inplace=True,
+                **limit.options(),
+            )
+            return conforms, validation_graph
+        from pyshacl import validate  # noqa: PLC0415
+
+        conforms, validation_graph, _results_text = validate(
             data_graph=data_graph,
             shacl_graph=shacl_graph,
             ont_graph=ontology_graph,
             meta_shacl=self.meta_shacl,
-            inference=self.inference,
+            inference=inference,
             advanced=self.advanced,
             js=self.js,
             max_validation_depth=self.max_validation_depth,
             inplace=True,
+            **limit.options(),  # type: ignore[arg-type]
+        )
+        return conforms, validation_graph
+
+    def execute(
+        self,
+        inputs: tuple,  # noqa: ARG002
+        context: ExecutionContext = ExecutionContext,
+    ) -> Entities | None:
+        """Execute plugin, in the validation service if configured"""
+        setup_cmempy_user_access(context.user)
+        if self.service_address:
+            try:
+                return self.execute_in_service()
+            except ServiceUnavailableError as error:
+                self.log.warning(
+                    f"Validation service at {self.service_address} is not available, "
+                    f"validating in the plugin process: {error}"
+                )
+        return self.run()
+
+    def execute_in_service(self) -> Entities | None:
+        """Hand the run to the validation service and replay its log"""
+        start = time()
+        self.log.info(f"Handing validation to the service at {self.service_address}...")
+        parameters = job_parameters(self)
+        parameters["service_address"] = ""
+        result = submit(
+            self.service_address, {"parameters": parameters, "environment": job_environment()}
+        )
+        for level, message in result["log"]:
+            getattr(self.log, level)(message)
+        if result["error"] is not None:
+            raise result["error"]
+        self.log.info(f"Validation service finished in {e_t(start)} seconds")
+        if result["entities"] is None:
+            return None
+        return Entities(
+            entities=(Entity(uri=uri, values=values) for uri, values in result["entities"]),
+            schema=entity_schema(),
         )
+
+    def run(self) -> Entities | None:
+        """Reset the state of the last run and run the plugin"""
+        self.label_indexes.clear()
+        self.graph_digests.clear()
+        self.compiled_shapes = None
+        self.validation_lock = Lock()
+        self.profiler = Profiler()
+        self.batch_graph_uris = []
+        if not self.profile_directory:
+            return self.process()
+        name = f"pyshacl-{datetime.now(tz=UTC):%Y%m%dT%H%M%S}"
+        with dump_profile(Path(self.profile_directory), name):
+            entities = self.process()
+        self.log.info(f"Wrote profile {name} to {self.profile_directory}")
+        return entities
+
+    def process(self) -> Entities | None:
+        """Load graphs, validate and output the results"""
+        self.check_parameters()
+        data_graph, shacl_graph, ontology_graph = self.load_graphs()
+        self.compiled_shapes = self.compile_shapes(shacl_graph)
+        if self.compiled_shapes is not None:
+            shacl_graph = self.compiled_shapes.graph
+        if self.batch_graph_uris:
+            return self.process_batch(data_graph, shacl_graph, ontology_graph)
+        return self.validate_data_graph(data_graph, shacl_graph, ontology_graph)
+
+    def batch_task(self, uri: str) -> "ShaclValidation":
+        """Copy the plugin to validate one data graph of the batch with the loaded shapes"""
+        task = copy(self)
+        task.data_graph_uri = uri
+        if self.batch_output == "per_graph":
+            task.validation_graph_uri = f"{self.validation_graph_uri}/{quote(uri, safe='')}"
+        else:
+            # the combined validation graph is cleared once before the batch
+            task.clear_validation_graph = False
+        task.label_indexes = {}
+        task.graph_digests = dict(self.graph_digests)
+        task.profiler = Profiler()
+        return task
+
+    def validate_batch_graph(
+        self,
+        uri: str,
+        data_graph: Graph | None,
+        shacl_graph: Graph,
+        ontology_graph: Graph | None,
+    ) -> list[Entity]:
+        """Load and validate one data graph of the batch, return its entities"""
+        task = self.batch_task(uri)
+        if data_graph is None:
+            data_graph = (
+                task.fetch_data_graph(shacl_graph)
+                if self.push_down_targets
+                else task.load_graph("data", uri)
+            )
+        entities = task.validate_data_graph(data_graph, shacl_graph, ontology_graph)
+        # formatted here, the data and validation graphs are released with the task
+        return list(entities.entities) if entities is not None else []
+
+    def process_batch(
+        self, data_graph: Graph, shacl_graph: Graph, ontology_graph: Graph | None
+    ) -> Entities | None:
+        """Validate the data graphs of the batch concurrently against one SHACL graph"""
+        self.log.info(
+            f"Validating {len(self.batch_graph_uris)} data graphs with {self.batch_workers} "
+            "worker threads..."
+        )
+        start = time()
+        if self.generate_graph and self.batch_output == "combined" and self.clear_validation_graph:
+            with BatchedGraphWriter(self.validation_graph_uri, replace=True):
+                pass
+        graphs = [data_graph] + [None] * (len(self.batch_graph_uris) - 1)
+        with (
+            self.profiler.span("batch") as span,
+            ThreadPoolExecutor(max_workers=self.batch_workers) as executor,
+        ):
+            results = list(
+                executor.map(
+                    lambda uri, graph: self.validate_batch_graph(
+                        uri, graph, shacl_graph, ontology_graph
+                    ),
+                    self.batch_graph_uris,
+                    graphs,
+                )
+            )
+            span.count = len(results)
+            span.details["workers"] = self.batch_workers
+        self.log.info(f"Finished validating {len(results)} data graphs in {e_t(start)} seconds")
+        self.log.info(f"Profile: {self.profiler.to_json()}")
+        if self.output_entities:
+            self.log.info("Outputting entities")
+            return Entities(entities=chain.from_iterable(results), schema=entity_schema())
+        return None
+
+    def validate_data_graph(  # noqa: C901 PLR0912
+        self, data_graph: Graph, shacl_graph: Graph, ontology_graph: Graph | None
+    ) -> Entities | None:
+        """Validate the loaded data graph and output the results"""
+        affected, previous_graph = (
+            self.prepare_incremental(data_graph, shacl_graph)
+            if self.changeset_graph_uri
+            else (None, None)
+        )
+
+        inferred = self.cache_inference and self.inference != "none"
+        if inferred and isinstance(data_graph, DiskGraph):
+            self.log.info("Inference closure of the on-disk data graph is not cached")
+            inferred = False
+        if inferred:
+            data_graph = self.infer_data_graph(data_graph, ontology_graph)
+
+        self.log.info("Starting SHACL validation...")
+        start = time()
+        limit = ResultLimit(self.max_results, self.min_severity, self.abort_on_first)
+        # without the closure cache, inference runs inside pySHACL in the validation span
+        with self.validation_lock, self.profiler.span("validation") as span:
+            _conforms, validation_graph = self.run_validation(
+                self.extract_data_graph(data_graph, shacl_graph)
+                if self.extract_neighbourhood
+                else data_graph,
+                shacl_graph,
+                None if inferred else ontology_graph,
+                affected,
+                inferred,
+                limit,
+            )
+            span.count = len(validation_graph)
+            span.details["inference"] = "none" if inferred else self.inference
+            if limit.active:
+                span.details["truncated"] = limit.truncated
         self.log.info(f"Finished SHACL validation in {e_t(start)} seconds")
+        if limit.truncated:
+            self.log.warning(f"Validation stopped after {limit.count} results")
         utctime = str(datetime.fromtimestamp(int(time()), tz=UTC))[:-6].replace(" ", "T") + "Z"
+        with self.profiler.span("result extraction") as span:
+            table = ResultTable.from_graph(validation_graph)
+            span.count = len(table)
+        if self.result_file:
+            self.write_result_file(validation_graph, table, data_graph, shacl_graph, utctime)
         if self.output_entities:
-            entities = self.make_entities(validation_graph, data_graph, shacl_graph, utctime)
+            entities = self.make_entities(validation_graph, data_graph, shacl_graph, utctime, table)
         if self.generate_graph:
-            if self.skolemize:
-                self.log.info("Skolemizing validation graph")
-                validation_graph = validation_graph.skolemize(basepath=self.validation_graph_uri)
-            if self.add_labels or self.add_shui_conforms:
-                validation_graph_uris = validation_graph.subjects(RDF.type, SH.ValidationResult)
-                focus_nodes = []
-                if self.add_labels:
-                    validation_graph, focus_nodes = self.add_labels_val(
-                        validation_graph, data_graph, shacl_graph, validation_graph_uris
-                    )
-                if self.add_shui_conforms:
-                    validation_graph = self.add_shui_conforms_val(
-                        validation_graph, validation_graph_uris, focus_nodes
-                    )
-            validation_graph = self.add_prov(validation_graph, utctime)
-
-            self.post_graph(validation_graph)
+            skolemizer = self.skolemizer(validation_graph)
+            if skolemizer is not None:
+                # the posted triples are skolemized while they are written
+                table = table.rename(skolemizer.node)
+            if affected is not None and previous_graph is not None and skolemizer is not None:
+                with self.profiler.span("skolemization") as span:
+                    validation_graph = skolemizer.graph(validation_graph)
+                    span.count = len(validation_graph)
+                self.enrich_graph(validation_graph, table, data_graph, shacl_graph, utctime)
+                self.patch_graph(previous_graph, validation_graph, affected)
+            elif self.diff_upload and skolemizer is not None:
+                self.diff_graph(
+                    validation_graph, table, data_graph, shacl_graph, utctime, skolemizer
+                )
+            else:
+                self.post_graph(
+                    validation_graph, table, data_graph, shacl_graph, utctime, skolemizer
+                )
+        self.log.info(f"Profile: {self.profiler.to_json()}")
 
         if self.output_entities:
             self.log.info("Outputting entities")
             return entities
+        if isinstance(data_graph, DiskGraph):
+            data_graph.close()
         return None
@@ -0,0 +1,149 @@
+"""Structured timing and memory spans of the validation phases"""
+
+import cProfile
+import json
+import resource
+import sys
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from time import perf_counter, process_time
+
+# ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def cpu_time() -> float:
+    """Get CPU time of this process and its terminated child processes in seconds"""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return process_time() + children.ru_utime + children.ru_stime
+
+
+def max_rss() -> int:
+    """Get peak resident set size of this process and its child processes in bytes"""
+    return RSS_UNIT * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+
+
+def current_rss() -> int:
+    """Get current resident set size of this process in bytes, the peak if unavailable"""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return max_rss()
+    return pages * resource.getpagesize()
+
+
+class Span:
+    """Wall time, CPU time, memory and item count of a phase"""
+
+    __slots__ = (
+        "count",
+        "cpu_seconds",
+        "details",
+        "name",
+        "peak_traced",
+        "process_peak_rss",
+        "start_seconds",
+        "wall_seconds",
+    )
+
+    def __init__(self, name: str, start_seconds: float) -> None:
+        self.name = name
+        self.start_seconds = start_seconds
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.process_peak_rss = 0
+        self.peak_traced: int | None = None
+        self.count: int | None = None
+        self.details: dict[str, str | int | float] = {}
+
+    def to_dict(self) -> dict:
+        """Get span as JSON object with times in seconds and memory in MB"""
+        span: dict = {
+            "name": self.name,
+            "start_seconds": round(self.start_seconds, 6),
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "process_peak_rss_mb": round(self.process_peak_rss / 1024**2, 3),
+        }
+        if self.peak_traced is not None:
+            span["peak_traced_mb"] = round(self.peak_traced / 1024**2, 3)
+        if self.count is not None:
+            span["count"] = self.count
+        return span | self.details
+
+
+class Profiler:
+    """Spans of the phases of a plugin run"""
+
+    def __init__(self) -> None:
+        self.start = perf_counter()
+        self.spans: list[Span] = []
+        self.open: list[Span] = []
+        self.lock = Lock()
+
+    def trace_peak(self, spans: list[Span]) -> None:
+        """Add the traced memory peak since the last reset to the peaks of spans"""
+        peak = tracemalloc.get_traced_memory()[1]
+        for span in spans:
+            span.peak_traced = max(span.peak_traced or 0, peak)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        """Record wall time, CPU time and peak memory of the block as span"""
+        # CPU time and memory are process wide and include concurrent spans,
+        # the traced peak is reset per span and kept by the spans still open
+        start, cpu = perf_counter(), cpu_time()
+        span = Span(name, start - self.start)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            with self.lock:
+                self.trace_peak(self.open)
+                tracemalloc.reset_peak()
+                self.open.append(span)
+        try:
+            yield span
+        finally:
+            span.wall_seconds = perf_counter() - start
+            span.cpu_seconds = cpu_time() - cpu
+            span.process_peak_rss = max_rss()
+            if tracing:
+                with self.lock:
+                    self.trace_peak([span])
+                    self.open.remove(span)
+            self.spans.append(span)
+
+    def summary(self) -> dict:
+        """Get total time and spans in order of completion"""
+        return {
+            "wall_seconds": round(perf_counter() - self.start, 6),
+            "process_peak_rss_mb": round(max_rss() / 1024**2, 3),
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+    def to_json(self) -> str:
+        """Get summary as JSON"""
+        return json.dumps(self.summary())
+
+
+@contextmanager
+def dump_profile(directory: Path, name: str) -> Iterator[None]:
+    """Write cProfile statistics and a tracemalloc snapshot of the block to directory"""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(directory / f"{name}.prof")
+        tracemalloc.take_snapshot().dump(str(directory / f"{name}.tracemalloc"))
+        if started:
+            tracemalloc.stop()
@@ -0,0 +1,175 @@
+"""Fetch focus node neighbourhoods of shapes with SPARQL queries"""
+
+from collections.abc import Callable, Collection, Iterator
+
+from rdflib import RDF, RDFS, BNode, Graph, Literal
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from rdflib.term import Node
+
+from cmem_plugin_pyshacl.graph_io import GraphSink
+from cmem_plugin_pyshacl.shapes import ShapesProfile
+
+PAGE_SIZE = 1000
+
+
+class BlankNodesError(Exception):
+    """Focus nodes or their neighbourhoods have blank nodes which cannot be fetched with queries"""
+
+
+class NeighbourhoodFetcher:
+    """Paged SPARQL queries for the focus nodes of a shapes profile and their neighbourhoods"""
+
+    def __init__(self, profile: ShapesProfile, graph_uri: str = "", page_size: int = PAGE_SIZE):
+        self.profile = profile
+        self.dataset = f"FROM <{graph_uri}>" if graph_uri else ""
+        self.page_size = page_size
+
+    def target_patterns(self) -> str:
+        """Get the union of the target patterns binding ?focus"""
+        patterns = [
+            f"{{ ?focus <{RDF.type}>/<{RDFS.subClassOf}>* {target.n3()} }}"  # type: ignore[attr-defined]
+            for target in sorted(self.profile.target_classes)  # type: ignore[type-var]
+        ]
+        patterns += [
+            f"{{ ?focus {predicate.n3()} [] }}"  # type: ignore[attr-defined]
+            for predicate in sorted(self.profile.target_subjects_of)  # type: ignore[type-var]
+        ]
+        patterns += [
+            f"{{ [] {predicate.n3()} ?focus }}"  # type: ignore[attr-defined]
+            for predicate in sorted(self.profile.target_objects_of)  # type: ignore[type-var]
+        ]
+        return " UNION ".join(patterns)
+
+    def blank_focus_query(self) -> str:
+        """Get query for a blank node focus node"""
+        return (
+            f"SELECT ?focus {self.dataset} WHERE {{ {self.target_patterns()} "
+            "FILTER(isBlank(?focus)) } LIMIT 1"
+        )
+
+    def focus_query(self, offset: int) -> str:
+        """Get query for a page of focus nodes"""
+        return (
+            f"SELECT DISTINCT ?focus {self.dataset} WHERE {{ {self.target_patterns()} }} "
+            f"ORDER BY ?focus LIMIT {self.page_size} OFFSET {offset}"
+        )
+
+    def schema_query(self) -> str:
+        """Get query for subclass and target objects triples needed to find focus nodes"""
+        predicates = " ".join(
+            p.n3()  # type: ignore[attr-defined]
+            for p in [RDFS.subClassOf, *sorted(self.profile.target_objects_of)]  # type: ignore[type-var]
+        )
+        return (
+            f"CONSTRUCT {{ ?s ?p ?o }} {self.dataset} WHERE {{ VALUES ?p {{ {predicates} }} "
+            "?s ?p ?o }"
+        )
+
+    def level_pattern(self, level: int) -> tuple[str, str]:
+        """Get the template and pattern of triples one hop away from ?n<level>"""
+        node, following, predicate = f"?n{level}", f"?n{level + 1}", f"?p{level}"
+        if not self.profile.inverse:
+            triple = f"{node} {predicate} {following} ."
+            return triple, triple
+        subject, obj = f"?s{level}", f"?o{level}"
+        return (
+            f"{subject} {predicate} {obj} .",
+            f"{{ {node} {predicate} {following} . BIND({node} AS {subject}) "
+            f"BIND({following} AS {obj}) }} UNION "
+            f"{{ {following} {predicate} {node} . BIND({following} AS {subject}) "
+            f"BIND({node} AS {obj}) }}",
+        )
+
+    def neighbourhood_query(self, nodes: list[Node], depth: int) -> str:
+        """Get query for the triples of nodes and of the blank nodes within depth of them"""
+        templates: list[str] = []
+        where = ""
+        for level in reversed(range(depth + 1)):
+            template, pattern = self.level_pattern(level)
+            templates.insert(0, template)
+            if level:
+                # blank nodes cannot be queried later, their labels are scoped to one response
+                pattern = f"FILTER(isBlank(?n{level})) {pattern}"
+            where = f"{pattern} OPTIONAL {{ {where} }}" if where else pattern
+        values = " ".join(node.n3() for node in nodes)  # type: ignore[attr-defined]
+        return (
+            f"CONSTRUCT {{ {' '.join(templates)} }} {self.dataset} WHERE {{ "
+            f"VALUES ?n0 {{ {values} }} {where} }}"
+        )
+
+    def focus_nodes(self, select: Callable[[str], list[Node]]) -> list[Node]:
+        """Get focus nodes of all targets page by page"""
+        nodes = set(self.profile.target_nodes)
+        if any(isinstance(node, BNode) for node in nodes):
+            raise BlankNodesError("target nodes include blank nodes")
+        if not self.target_patterns():
+            return sorted(nodes)  # type: ignore[type-var]
+        if select(self.blank_focus_query()):
+            raise BlankNodesError("focus nodes include blank nodes")
+        offset = 0
+        while True:
+            page = select(self.focus_query(offset))
+            nodes.update(page)
+            if len(page) < self.page_size:
+                break
+            offset += self.page_size
+        return sorted(nodes)  # type: ignore[type-var]
+
+    def reached(self, page: Graph, nodes: list[Node]) -> Iterator[tuple[Node, int]]:
+        """Get the nodes reached from nodes directly or through blank nodes with their distance"""
+        seen = set(nodes)
+        frontier = set(nodes)
+        distance = 1
+        while frontier:
+            following: set[Node] = set()
+            for node in frontier:
+                neighbours = list(page.objects(node))  # type: ignore[arg-type]
+                if self.profile.inverse:
+                    neighbours += page.subjects(None, node)
+                for neighbour in neighbours:
+                    if isinstance(neighbour, Literal) or neighbour in seen:
+                        continue
+                    seen.add(neighbour)
+                    if isinstance(neighbour, BNode):
+                        following.add(neighbour)
+                    else:
+                        yield neighbour, distance
+            frontier = following
+            distance += 1
+
+    def parse(
+        self, ntriples: str, graph: Graph, exclude: Collection[tuple[Node, Node, Node]]
+    ) -> None:
+        """Parse the N-Triples of one response with its own blank node labels"""
+        parser = W3CNTriplesParser(sink=GraphSink(graph, exclude))  # type: ignore[arg-type]
+        parser.parsestring(ntriples, bnode_context={})
+
+    def fetch(
+        self,
+        select: Callable[[str], list[Node]],
+        construct: Callable[[str], str],
+        exclude: Collection[tuple[Node, Node, Node]] = (),
+    ) -> tuple[Graph, int]:
+        """Fetch the neighbourhoods of all focus nodes level by level without excluded triples"""
+        graph = Graph()
+        self.parse(construct(self.schema_query()), graph, exclude)
+        focus_nodes = self.focus_nodes(select)
+        levels: dict[int, set[Node]] = {0: set(focus_nodes)}
+        visited: set[Node] = set()
+        for level in range(self.profile.depth + 1):
+            frontier = sorted(levels.pop(level, set()) - visited)  # type: ignore[type-var]
+            visited.update(frontier)
+            for start in range(0, len(frontier), self.page_size):
+                nodes = frontier[start : start + self.page_size]
+                page = Graph()
+                query = self.neighbourhood_query(nodes, self.profile.depth - level)
+                self.parse(construct(query), page, exclude)
+                if self.profile.inverse and any(
+                    isinstance(node, BNode) for node in page.all_nodes()
+                ):
+                    # a blank node reached again from another response would be a partial copy
+                    raise BlankNodesError("neighbourhoods include blank nodes and inverse paths")
+                for node, distance in self.reached(page, nodes):
+                    levels.setdefault(level + distance, set()).add(node)
+                graph += page
+        return graph, len(focus_nodes)
@@ -0,0 +1,111 @@
+"""Bounded rendering of blank node values for entities output"""
+
+from rdflib import RDF, SH, BNode, Graph, URIRef
+from rdflib.collection import Collection
+from rdflib.term import Node
+
+MAX_LINES = 50
+MAX_TRIPLES = 200
+UNARY_PATHS = (
+    (SH.inversePath, "^{}"),
+    (SH.zeroOrMorePath, "{}*"),
+    (SH.oneOrMorePath, "{}+"),
+    (SH.zeroOrOnePath, "{}?"),
+)
+
+
+def path_string(graph: Graph, path: Node, nested: bool = False) -> str | None:
+    """Get SHACL property path in SPARQL property path syntax, None if path is invalid"""
+    if isinstance(path, URIRef):
+        return graph.namespace_manager.normalizeUri(path)
+    if not isinstance(path, BNode):
+        return None
+    if (path, RDF.first, None) in graph:
+        return _join(graph, Collection(graph, path), "/", nested)
+    alternatives = graph.value(path, SH.alternativePath)
+    if alternatives is not None:
+        return _join(graph, Collection(graph, alternatives), "|", nested)
+    for predicate, template in UNARY_PATHS:
+        inner = graph.value(path, predicate)
+        if inner is not None:
+            inner_string = path_string(graph, inner, nested=True)
+            return template.format(inner_string) if inner_string else None
+    return None
+
+
+def _join(graph: Graph, paths: Collection, separator: str, nested: bool) -> str | None:
+    """Join the strings of a list of paths"""
+    strings = [path_string(graph, path, nested=True) for path in paths]
+    if not strings or None in strings:
+        return None
+    joined = separator.join(strings)  # type: ignore[arg-type]
+    return f"({joined})" if nested and len(strings) > 1 else joined
+
+
+class BlankNodeRenderer:
+    """Render bounded Turtle descriptions of blank nodes, cached by structure"""
+
+    def __init__(
+        self, graph: Graph, max_lines: int = MAX_LINES, max_triples: int = MAX_TRIPLES
+    ) -> None:
+        self.graph = graph
+        self.max_lines = max_lines
+        self.max_triples = max_triples
+        self.renderings: dict[str, str] = {}
+
+    def describe(self, node: BNode) -> tuple[dict[Node, list[tuple[Node, Node]]], bool]:
+        """Get outgoing edges of node and nested blank nodes, and whether the budget was hit"""
+        edges: dict[Node, list[tuple[Node, Node]]] = {}
+        pending = [node]
+        count = 0
+        while pending:
+            subject = pending.pop()
+            if subject in edges:
+                continue
+            edges[subject] = []
+            for p, o in self.graph.predicate_objects(subject):  # type: ignore[arg-type]
+                if count == self.max_triples:
+                    return edges, True
+                edges[subject].append((p, o))
+                count += 1
+                if isinstance(o, BNode) and o not in edges:
+                    pending.append(o)
+        return edges, False
+
+    def structure(
+        self, node: Node, edges: dict[Node, list[tuple[Node, Node]]], path: frozenset = frozenset()
+    ) -> str:
+        """Get canonical string of the structure below node, ignoring blank node labels"""
+        if not isinstance(node, BNode):
+            return node.n3()  # type: ignore[attr-defined, no-any-return]
+        if node in path:
+            return "_:cycle"
+        path = path | {node}
+        return (
+            "["
+            + ";".join(
+                sorted(f"{p.n3()} {self.structure(o, edges, path)}" for p, o in edges.get(node, ()))  # type: ignore[attr-defined]
+            )
+            + "]"
+        )
+
+    def render(self, node: BNode) -> str:
+        """Render Turtle of node with at most max_lines lines"""
+        edges, truncated = self.describe(node)
+        key = f"{truncated}{self.structure(node, edges)}"
+        rendering = self.renderings.get(key)
+        if rendering is None:
+            graph = Graph()
+            for subject, predicate_objects in edges.items():
+                for p, o in predicate_objects:
+                    graph.add((subject, p, o))
+            rendering = graph.serialize(format="turtle")
+            lines = rendering.split("\n")
+            if len(lines) > self.max_lines or truncated:
+                rendering = "\n".join(lines[: self.max_lines]) + "\n..."
+            self.renderings[key] = rendering
+        return rendering
+
+    def render_path(self, node: BNode) -> str:
+        """Render SHACL property path in compact syntax, Turtle if it is not a valid path"""
+        return path_string(self.graph, node) or self.render(node)
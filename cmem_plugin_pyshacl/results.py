@@ -0,0 +1,105 @@
+"""Validation results extracted from a validation graph in one pass"""
+
+from collections.abc import Callable, Iterator
+
+from rdflib import RDF, SH, BNode, Graph
+from rdflib.term import Node
+
+RESULT_FIELDS = {
+    SH.focusNode: "focus_node",
+    SH.resultPath: "result_path",
+    SH.value: "value",
+    SH.sourceShape: "source_shape",
+    SH.sourceConstraintComponent: "source_constraint_component",
+    SH.resultMessage: "result_message",
+    SH.resultSeverity: "result_severity",
+}
+
+
+def skolemize(node: Node | None, basepath: str) -> Node | None:
+    """Skolemize blank node like Graph.skolemize"""
+    return node.skolemize(basepath=basepath) if isinstance(node, BNode) else node
+
+
+class ValidationResult:
+    """Values of a validation result"""
+
+    __slots__ = (
+        "focus_node",
+        "node",
+        "result_message",
+        "result_path",
+        "result_severity",
+        "source_constraint_component",
+        "source_shape",
+        "value",
+    )
+
+    def __init__(self, node: Node) -> None:
+        self.node = node
+        self.focus_node: Node | None = None
+        self.result_path: Node | None = None
+        self.value: Node | None = None
+        self.source_shape: Node | None = None
+        self.source_constraint_component: Node | None = None
+        self.result_message: Node | None = None
+        self.result_severity: Node | None = None
+
+    def get(self, predicate: Node) -> Node | None:
+        """Get value of result predicate"""
+        return getattr(self, RESULT_FIELDS[predicate])  # type: ignore[index, no-any-return]
+
+    def skolemize(self, basepath: str) -> "ValidationResult":
+        """Get result with skolemized blank nodes"""
+        return self.rename(lambda node: skolemize(node, basepath))
+
+    def rename(self, rename: Callable[[Node | None], Node | None]) -> "ValidationResult":
+        """Get result with the nodes replaced by rename"""
+        result = ValidationResult(rename(self.node))  # type: ignore[arg-type]
+        for name in RESULT_FIELDS.values():
+            setattr(result, name, rename(getattr(self, name)))
+        return result
+
+
+class ResultTable:
+    """Validation report and results of a validation graph"""
+
+    def __init__(
+        self, report: Node | None, conforms: Node | None, results: list[ValidationResult]
+    ) -> None:
+        self.report = report
+        self.conforms = conforms
+        self.results = results
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "ResultTable":
+        """Extract report and results with one scan of the triples of each result"""
+        report = graph.value(predicate=RDF.type, object=SH.ValidationReport)
+        results = []
+        for node in graph.subjects(RDF.type, SH.ValidationResult):
+            result = ValidationResult(node)
+            for predicate, obj in graph.predicate_objects(node):
+                name = RESULT_FIELDS.get(predicate)  # type: ignore[call-overload]
+                if name is not None and getattr(result, name) is None:
+                    setattr(result, name, obj)
+            results.append(result)
+        conforms = graph.value(report, SH.conforms) if report is not None else None
+        return cls(report, conforms, results)
+
+    def skolemize(self, basepath: str) -> "ResultTable":
+        """Get table with blank nodes skolemized like Graph.skolemize"""
+        return self.rename(lambda node: skolemize(node, basepath))
+
+    def rename(self, rename: Callable[[Node | None], Node | None]) -> "ResultTable":
+        """Get table with the nodes replaced by rename"""
+        return ResultTable(
+            rename(self.report), self.conforms, [result.rename(rename) for result in self.results]
+        )
+
+    def __iter__(self) -> Iterator[ValidationResult]:
+        """Iterate over results"""
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        """Get number of results"""
+        return len(self.results)
@@ -0,0 +1,197 @@
+"""Resident validation service keeping graphs, compiled shapes and labels in memory
+
+Run with `python -m cmem_plugin_pyshacl.service` and the `PYSHACL_SERVICE_KEY` variable
+shared with the plugin.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import pickle
+from collections.abc import Iterator
+from contextlib import contextmanager
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from threading import BoundedSemaphore, Condition, Event, Thread
+
+from cmem_plugin_base.dataintegration.plugins import PluginLogger
+
+from cmem_plugin_pyshacl.cache import MAX_GRAPHS, MemoryGraphCache
+from cmem_plugin_pyshacl.client import ENVIRONMENT_PREFIXES, parse_address, service_key
+from cmem_plugin_pyshacl.compiled import REGISTRY
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+from cmem_plugin_pyshacl.profiling import current_rss
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+
+class JobLogger(PluginLogger):
+    """Plugin logger recording the messages of a job for the client"""
+
+    def __init__(self) -> None:
+        self.messages: list[tuple[str, str]] = []
+
+    def debug(self, message: str) -> None:
+        """Record debug message"""
+        self.messages.append(("debug", message))
+        super().debug(message)
+
+    def info(self, message: str) -> None:
+        """Record info message"""
+        self.messages.append(("info", message))
+        super().info(message)
+
+    def warning(self, message: str) -> None:
+        """Record warning message"""
+        self.messages.append(("warning", message))
+        super().warning(message)
+
+    def error(self, message: str) -> None:
+        """Record error message"""
+        self.messages.append(("error", message))
+        super().error(message)
+
+
+class Credentials:
+    """Process environment of the running jobs, jobs with another environment wait"""
+
+    def __init__(self) -> None:
+        self.condition = Condition()
+        self.environment: dict[str, str] | None = None
+        self.running = 0
+
+    @contextmanager
+    def use(self, environment: dict[str, str]) -> Iterator[None]:
+        """Set the cmempy environment of a job while it runs"""
+        with self.condition:
+            self.condition.wait_for(lambda: not self.running or self.environment == environment)
+            if not self.running:
+                for name in [name for name in os.environ if name.startswith(ENVIRONMENT_PREFIXES)]:
+                    del os.environ[name]
+                os.environ.update(environment)
+                self.environment = environment
+            self.running += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.running -= 1
+                self.condition.notify_all()
+
+
+def picklable(error: Exception) -> Exception:
+    """Get error, or a runtime error with its message if it cannot be sent to the client"""
+    try:
+        pickle.dumps(error)
+    except Exception:  # noqa: BLE001
+        return RuntimeError(f"{type(error).__name__}: {error}")
+    return error
+
+
+class ValidationService:
+    """Validation jobs of plugin clients with warm caches, limited in concurrency and memory"""
+
+    def __init__(
+        self,
+        address: str = DEFAULT_ADDRESS,
+        jobs: int = 2,
+        max_memory: int = 0,
+        max_graphs: int = MAX_GRAPHS,
+    ) -> None:
+        self.address = parse_address(address)
+        self.authkey = service_key()
+        self.max_memory = max_memory
+        self.slots = BoundedSemaphore(jobs)
+        self.credentials = Credentials()
+        self.memory_cache = MemoryGraphCache(max_graphs)
+        self.stopped = Event()
+        self.log = logging.getLogger(__name__)
+
+    def serve(self, ready: Event | None = None) -> None:
+        """Accept jobs until stopped, each in its own thread"""
+        with Listener(self.address, authkey=self.authkey) as listener:
+            self.address = listener.address
+            self.log.info(f"Validation service listening on {self.address[0]}:{self.address[1]}")
+            if ready is not None:
+                ready.set()
+            while not self.stopped.is_set():
+                try:
+                    connection = listener.accept()
+                except (OSError, EOFError, AuthenticationError) as error:
+                    self.log.warning(f"Rejected connection: {error}")
+                    continue
+                Thread(target=self.handle, args=(connection,), daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop accepting jobs after waking up the listener"""
+        self.stopped.set()
+        with Client(self.address, authkey=self.authkey):
+            pass
+
+    def handle(self, connection: Connection) -> None:
+        """Receive a job, run it when a slot is free and send the result"""
+        with connection:
+            try:
+                job = connection.recv()
+            except EOFError:
+                return
+            with self.slots:
+                result = self.run(job)
+                self.evict()
+            try:
+                connection.send(result)
+            except OSError as error:
+                self.log.warning(f"Could not send result: {error}")
+
+    def run(self, job: dict) -> dict:
+        """Run the plugin with the job parameters and credentials"""
+        logger = JobLogger()
+        result: dict = {"log": logger.messages, "entities": None, "error": None}
+        try:
+            plugin = ShaclValidation(**job["parameters"])
+            plugin.log = logger
+            plugin.memory_cache = self.memory_cache
+            with self.credentials.use(job["environment"]):
+                entities = plugin.run()
+                if entities is not None:
+                    # the entities are created lazily from the graphs of the job
+                    result["entities"] = [
+                        (entity.uri, entity.values) for entity in entities.entities
+                    ]
+        except Exception as error:  # noqa: BLE001
+            result["error"] = picklable(error)
+        return result
+
+    def evict(self) -> None:
+        """Drop least recently used graphs and compiled shapes while above max_memory"""
+        if not self.max_memory:
+            return
+        while current_rss() > self.max_memory * 1024**2:
+            if not (self.memory_cache.evict() or REGISTRY.evict()):
+                break
+            gc.collect()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the validation service"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="host:port to listen on")
+    parser.add_argument("--jobs", type=int, default=2, help="maximum concurrent jobs")
+    parser.add_argument(
+        "--max-memory", type=int, default=0, help="resident memory in MB to evict caches at"
+    )
+    parser.add_argument(
+        "--max-graphs", type=int, default=MAX_GRAPHS, help="maximum graphs kept in memory"
+    )
+    args = parser.parse_args(argv)
+    try:
+        service = ValidationService(args.address, args.jobs, args.max_memory, args.max_graphs)
+    except ValueError as error:
+        parser.error(str(error))
+    logging.basicConfig(level=logging.INFO)
+    service.serve()
+
+
+if __name__ == "__main__":
+    main()
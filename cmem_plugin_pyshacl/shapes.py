@@ -0,0 +1,186 @@
+"""Static analysis of SHACL shapes graphs"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from rdflib import OWL, RDF, RDFS, SH, Graph, Literal, URIRef
+from rdflib.collection import Collection
+from rdflib.term import Node
+
+UNBOUNDED_PREDICATES = {
+    SH.sparql: "SPARQL-based constraints",
+    SH.target: "SPARQL-based targets",
+    SH.rule: "SHACL rules",
+    SH.js: "SHACL-JS constraints",
+    SH.expression: "node expressions",
+    SH.zeroOrMorePath: "sh:zeroOrMorePath",
+    SH.oneOrMorePath: "sh:oneOrMorePath",
+}
+NESTED_SHAPE_PREDICATES = (SH.node, SH.property, SH.qualifiedValueShape, SH["not"])
+NESTED_SHAPE_LIST_PREDICATES = (SH["and"], SH["or"], SH.xone)
+
+
+class UnboundedShapesError(Exception):
+    """Shapes graph cannot be analysed statically"""
+
+
+@dataclass
+class ShapesProfile:
+    """Targets and maximum path depth of a shapes graph"""
+
+    target_classes: set[Node] = field(default_factory=set)
+    target_nodes: set[Node] = field(default_factory=set)
+    target_subjects_of: set[Node] = field(default_factory=set)
+    target_objects_of: set[Node] = field(default_factory=set)
+    depth: int = 0
+    inverse: bool = False
+    unbounded: str = ""
+
+    @property
+    def bounded(self) -> bool:
+        """Focus node neighbourhoods are bounded"""
+        return not self.unbounded
+
+    def focus_nodes(self, data_graph: Graph) -> set[Node]:
+        """Get focus nodes of all targets in the data graph"""
+        nodes = set(self.target_nodes)
+        for target_class in self.target_classes:
+            for cls in data_graph.transitive_subjects(RDFS.subClassOf, target_class):
+                nodes.update(data_graph.subjects(RDF.type, cls))
+        for predicate in self.target_subjects_of:
+            nodes.update(data_graph.subjects(predicate, None))
+        for predicate in self.target_objects_of:
+            nodes.update(data_graph.objects(None, predicate))
+        return nodes
+
+
+class ShapesAnalyzer:
+    """Compute targets and path depths of the shapes in a shapes graph"""
+
+    def __init__(self, shacl_graph: Graph) -> None:
+        self.graph = shacl_graph
+        self.depths: dict[Node, int] = {}
+        self.visiting: set[Node] = set()
+        self.inverse = False
+
+    def path_length(self, path: Node) -> int:
+        """Get the maximum number of hops of a property path"""
+        if isinstance(path, URIRef):
+            return 1
+        if (path, RDF.first, None) in self.graph:
+            return sum(self.path_length(p) for p in Collection(self.graph, path))
+        alternatives = self.graph.value(path, SH.alternativePath)
+        if alternatives is not None:
+            paths = Collection(self.graph, alternatives)
+            return max((self.path_length(p) for p in paths), default=0)
+        inverse = self.graph.value(path, SH.inversePath)
+        if inverse is not None:
+            self.inverse = True
+            return self.path_length(inverse)
+        optional = self.graph.value(path, SH.zeroOrOnePath)
+        if optional is not None:
+            return self.path_length(optional)
+        raise UnboundedShapesError(f"unsupported property path {path.n3()}")
+
+    def nested_shapes(self, shape: Node) -> list[Node]:
+        """Get shapes referenced by shape-expecting parameters"""
+        nested = [o for p in NESTED_SHAPE_PREDICATES for o in self.graph.objects(shape, p)]
+        for predicate in NESTED_SHAPE_LIST_PREDICATES:
+            for shape_list in self.graph.objects(shape, predicate):
+                nested.extend(Collection(self.graph, shape_list))
+        return nested
+
+    def depth(self, shape: Node) -> int:
+        """Get the number of hops from a focus node needed to validate shape"""
+        if shape in self.depths:
+            return self.depths[shape]
+        if shape in self.visiting:
+            raise UnboundedShapesError("recursive shapes")
+        self.visiting.add(shape)
+        path = self.graph.value(shape, SH.path)
+        depth = self.path_length(path) if path is not None else 0
+        depth += max((self.depth(nested) for nested in self.nested_shapes(shape)), default=0)
+        self.visiting.discard(shape)
+        self.depths[shape] = depth
+        return depth
+
+    def analyze(self) -> ShapesProfile:
+        """Create the profile of the shapes graph"""
+        profile = ShapesProfile()
+        for predicate, reason in UNBOUNDED_PREDICATES.items():
+            if (None, predicate, None) in self.graph:
+                profile.unbounded = reason
+                return profile
+        if (None, RDF.type, SH.ConstraintComponent) in self.graph:
+            profile.unbounded = "custom constraint components"
+            return profile
+        shapes: set[Node] = set()
+        for predicate, targets in (
+            (SH.targetClass, profile.target_classes),
+            (SH.targetNode, profile.target_nodes),
+            (SH.targetSubjectsOf, profile.target_subjects_of),
+            (SH.targetObjectsOf, profile.target_objects_of),
+        ):
+            for shape, target in self.graph.subject_objects(predicate):
+                shapes.add(shape)
+                targets.add(target)
+        for shape_type in (SH.NodeShape, SH.PropertyShape):
+            for shape in self.graph.subjects(RDF.type, shape_type):
+                if {RDFS.Class, OWL.Class} & set(self.graph.objects(shape, RDF.type)):
+                    profile.target_classes.add(shape)
+                    shapes.add(shape)
+        try:
+            profile.depth = max((self.depth(shape) for shape in shapes), default=0)
+        except UnboundedShapesError as error:
+            profile.unbounded = str(error)
+        profile.inverse = self.inverse
+        return profile
+
+
+def analyze_shapes(shacl_graph: Graph) -> ShapesProfile:
+    """Analyse targets and maximum path depth of a shapes graph"""
+    return ShapesAnalyzer(shacl_graph).analyze()
+
+
+def extract_neighbourhood(data_graph: Graph, profile: ShapesProfile) -> tuple[Graph, int]:
+    """Extract the sub-graph reachable from the focus nodes, return graph and focus node count"""
+    graph = Graph(identifier=data_graph.identifier)
+    for predicate in {RDFS.subClassOf} | profile.target_subjects_of | profile.target_objects_of:
+        for triple in data_graph.triples((None, predicate, None)):  # type: ignore[arg-type]
+            graph.add(triple)
+    focus_nodes = profile.focus_nodes(data_graph)
+    visited: set[Node] = set()
+    frontier = {node for node in focus_nodes if not isinstance(node, Literal)}
+    for _ in range(profile.depth + 1):
+        visited.update(frontier)
+        reached: set[Node] = set()
+        for node in frontier:
+            for triple in data_graph.triples((node, None, None)):  # type: ignore[arg-type]
+                graph.add(triple)
+                reached.add(triple[2])
+            if profile.inverse:
+                for triple in data_graph.triples((None, None, node)):  # type: ignore[arg-type]
+                    graph.add(triple)
+                    reached.add(triple[0])
+        frontier = {node for node in reached if not isinstance(node, Literal)} - visited
+    return graph, len(focus_nodes)
+
+
+def affected_nodes(
+    data_graph: Graph, profile: ShapesProfile, subjects: set[Node], objects: Iterable[Node] = ()
+) -> set[Node]:
+    """Get the nodes within the maximum path depth of the subjects and objects of changed triples"""
+    # changed triples are only reached from their objects by inverse paths, else the objects
+    # (classes, literals) would affect all their other subjects, they may be focus nodes though
+    objects = set(objects)
+    frontier = (subjects | objects) if profile.inverse else set(subjects)
+    affected = frontier | objects
+    for _ in range(profile.depth):
+        reached: set[Node] = set()
+        for node in frontier:
+            reached.update(data_graph.subjects(None, node))
+            if profile.inverse and not isinstance(node, Literal):
+                reached.update(data_graph.objects(node, None))  # type: ignore[arg-type]
+        frontier = reached - affected
+        affected.update(frontier)
+    return affected
@@ -0,0 +1,101 @@
+"""Skolem IRIs of the blank nodes of validation graphs"""
+
+import json
+from collections.abc import Iterable, Iterator
+from hashlib import sha256
+
+from rdflib import RDF, SH, BNode, Graph, URIRef
+from rdflib.term import Node
+
+from cmem_plugin_pyshacl.results import skolemize
+
+# values identifying a validation result across runs, a shape can have several constraints
+# of one component which only differ in the constraint or message
+RESULT_KEY = (
+    SH.focusNode,
+    SH.resultPath,
+    SH.sourceShape,
+    SH.sourceConstraintComponent,
+    SH.sourceConstraint,
+    SH.value,
+    SH.resultSeverity,
+    SH.resultMessage,
+)
+
+
+class Skolemizer:
+    """Skolem IRIs of blank nodes like Graph.skolemize"""
+
+    def __init__(self, basepath: str) -> None:
+        self.basepath = basepath
+
+    def node(self, node: Node | None) -> Node | None:
+        """Get the skolem IRI of a blank node, other nodes unchanged"""
+        return skolemize(node, self.basepath)
+
+    def triples(self, triples: Iterable[tuple[Node, Node, Node]]) -> Iterator[tuple]:
+        """Skolemize the blank nodes of triples while they are consumed"""
+        for s, p, o in triples:
+            yield self.node(s), p, self.node(o)
+
+    def graph(self, graph: Graph) -> Graph:
+        """Get a skolemized copy of graph"""
+        skolemized = Graph()
+        for triple in self.triples(graph):
+            skolemized.add(triple)
+        return skolemized
+
+
+class ContentSkolemizer(Skolemizer):
+    """Skolem IRIs derived from the content of blank nodes, equal across runs for equal results"""
+
+    def __init__(self, graph: Graph, basepath: str, report_key: str) -> None:
+        super().__init__(basepath)
+        self.source = graph
+        self.report_key = report_key
+        self.digests: dict[BNode, str] = {}
+        self.results: dict[str, BNode] = {}
+
+    def node(self, node: Node | None) -> Node | None:
+        """Get the content-addressed skolem IRI of a blank node, other nodes unchanged"""
+        if not isinstance(node, BNode):
+            return node
+        return URIRef(f"{self.basepath}{self.digest(node)}")
+
+    def term(self, node: Node | None, visiting: frozenset[BNode]) -> str:
+        """Get the key of a term, the digest of its content for blank nodes"""
+        if node is None:
+            return ""
+        if isinstance(node, BNode):
+            return self.digest(node, visiting)
+        return node.n3()  # type: ignore[no-any-return]
+
+    def digest(self, node: BNode, visiting: frozenset[BNode] = frozenset()) -> str:
+        """Get the digest of the report key, the result key or the triples of a blank node"""
+        if node in self.digests:
+            return self.digests[node]
+        if node in visiting:
+            return "cycle"
+        visiting |= {node}
+        parts: list[str]
+        if (node, RDF.type, SH.ValidationReport) in self.source:
+            parts = ["report", self.report_key]
+        elif (node, RDF.type, SH.ValidationResult) in self.source:
+            parts = ["result"] + [
+                " ".join(sorted(self.term(obj, visiting) for obj in self.source.objects(node, p)))
+                for p in RESULT_KEY
+            ]
+        else:
+            parts = sorted(
+                f"{predicate.n3()} {self.term(obj, visiting)}"
+                for predicate, obj in self.source.predicate_objects(node)
+            )
+        digest = sha256(json.dumps(parts).encode()).hexdigest()
+        if parts[0] == "result":
+            # results with equal keys are numbered to keep them apart
+            key, count = digest, 0
+            while self.results.setdefault(digest, node) != node:
+                count += 1
+                digest = sha256(f"{key} {count}".encode()).hexdigest()
+        self.digests[node] = digest
+        return digest
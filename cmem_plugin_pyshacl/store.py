@@ -0,0 +1,33 @@
+"""On-disk stores for data graphs larger than memory"""
+
+import shutil
+import weakref
+from tempfile import mkdtemp
+
+from rdflib import Graph
+from rdflib.plugins.stores.berkeleydb import has_bsddb
+from rdflib.store import Store
+
+
+def _remove_store(store: Store, path: str) -> None:
+    """Close store and remove its directory"""
+    try:
+        store.close()
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class DiskGraph(Graph):
+    """Graph in a BerkeleyDB store in a temporary directory, removed when closed or collected"""
+
+    def __init__(self, directory: str = "") -> None:
+        if not has_bsddb:
+            raise ImportError("The on-disk store requires the berkeleydb package")
+        super().__init__(store="BerkeleyDB")
+        self.path = mkdtemp(prefix="cmem-plugin-pyshacl-", dir=directory or None)
+        self.open(self.path, create=True)
+        self._remove = weakref.finalize(self, _remove_store, self.store, self.path)
+
+    def close(self, commit_pending_transaction: bool = False) -> None:  # noqa: ARG002
+        """Close the store and remove its directory"""
+        self._remove()
@@ -0,0 +1,249 @@
+"""Benchmark the validation pipeline on synthetic graphs.
+
+Run with `python -m tests.benchmark --scales 10000 100000 --output benchmark.json`.
+Each scale runs in a separate process against an in-memory stand-in for the CMEM
+graph store, so the recorded peak RSS belongs to that scale only.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+from collections import deque
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from datetime import UTC, datetime
+from itertools import islice
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from types import SimpleNamespace
+from unittest import mock
+
+from cmem_plugin_base.dataintegration.context import ExecutionContext, ReportContext
+from cmem_plugin_base.testing import TestSystemContext, TestTaskContext, TestWorkflowContext
+from rdflib import RDF, SH, XSD, BNode, Dataset, Graph, Literal, Namespace, URIRef
+
+from cmem_plugin_pyshacl import graph_io, plugin_pyshacl
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+from cmem_plugin_pyshacl.profiling import max_rss
+
+SCALES = (10**4, 10**5, 10**6, 10**7)
+EX = Namespace("https://example.org/benchmark/")
+DATA_GRAPH_URI = "https://example.org/benchmark/data"
+SHACL_GRAPH_URI = "https://example.org/benchmark/shapes"
+VALIDATION_GRAPH_URI = "https://example.org/benchmark/validation"
+
+SHAPES = """
+@prefix ex: <https://example.org/benchmark/> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+<https://example.org/benchmark/shapes> a <https://vocab.eccenca.com/shui/ShapeCatalog> .
+
+ex:PersonShape a sh:NodeShape ;
+    sh:targetClass ex:Person ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ; sh:maxCount 1 ; sh:datatype xsd:string ] ;
+    sh:property [ sh:path ex:age ; sh:datatype xsd:integer ; sh:minInclusive 0 ] ;
+    sh:property [ sh:path ex:email ; sh:pattern "^[^@]+@[^@]+$" ] ;
+    sh:property [ sh:path ex:employer ; sh:minCount 1 ; sh:class ex:Organization ] ;
+    sh:property [ sh:path ( ex:address ex:city ) ; sh:class ex:City ] ;
+    sh:property [ sh:path ex:knows ; sh:class ex:Person ] .
+
+ex:OrganizationShape a sh:NodeShape ;
+    sh:targetClass ex:Organization ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+"""
+
+
+def make_shapes() -> Graph:
+    """Create the shapes graph"""
+    return Graph().parse(data=SHAPES, format="turtle")
+
+
+def make_data(triples: int, violations: float = 0.05, seed: int = 0) -> Graph:
+    """Create a data graph of people, organizations and addresses with about triples triples"""
+    rng = random.Random(seed)  # noqa: S311
+    graph = Graph()
+    graph.add((URIRef(DATA_GRAPH_URI), RDF.type, URIRef("http://rdfs.org/ns/void#Dataset")))
+    for i in range(50):
+        graph.add((EX[f"city{i}"], RDF.type, EX.City))
+    i = 0
+    while len(graph) < triples:
+        person = EX[f"person{i}"]
+        graph.add((person, RDF.type, EX.Person))
+        if i % 100 == 0:
+            organization = EX[f"org{i // 100}"]
+            graph.add((organization, RDF.type, EX.Organization))
+            graph.add((organization, EX.name, Literal(f"Organization {i // 100}")))
+        if rng.random() >= violations:
+            graph.add((person, EX.name, Literal(f"Person {i}")))
+        age = Literal(rng.randrange(100)) if rng.random() >= violations else Literal("unknown")
+        graph.add((person, EX.age, age))
+        email = f"person{i}@example.org" if rng.random() >= violations else f"person{i}"
+        graph.add((person, EX.email, Literal(email)))
+        graph.add((person, EX.employer, EX[f"org{i // 100}"]))
+        address = BNode()
+        graph.add((person, EX.address, address))
+        city = EX[f"city{i % 50}"] if rng.random() >= violations else EX.Atlantis
+        graph.add((address, EX.city, city))
+        graph.add((address, EX.postalCode, Literal(f"{10000 + i % 90000}", datatype=XSD.string)))
+        graph.add((person, EX.knows, EX[f"person{i + 1}"]))
+        i += 1
+    return graph
+
+
+class LocalResponse:
+    """Streamed response of the local graph store"""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def __enter__(self) -> "LocalResponse":
+        """Open response"""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close response"""
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        """Iterate over the body in chunks"""
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start : start + chunk_size]
+
+
+class LocalGraphStore:
+    """In-memory stand-in for the CMEM graph store"""
+
+    def __init__(self) -> None:
+        self.graphs: dict[str, Graph] = {}
+        self.lock = Lock()
+
+    def get(self, uri: str, **_: object) -> LocalResponse:
+        """Get graph as streamed N-Triples response"""
+        return LocalResponse(self.graphs[uri].serialize(format="nt", encoding="utf-8"))
+
+    def post_streamed(
+        self, uri: str, file: str, replace: bool = False, **_: object
+    ) -> SimpleNamespace:
+        """Add or replace graph with an N-Triples file"""
+        data = Path(file).read_bytes()
+        with self.lock:
+            if replace or uri not in self.graphs:
+                self.graphs[uri] = Graph()
+            self.graphs[uri].parse(data=data, format="nt")
+        return SimpleNamespace(status_code=204)
+
+    def sparql_post(self, query: str, **_: object) -> str:
+        """Answer SPARQL queries on graph existence and types with JSON results"""
+        # the catalog has the types and one other triple of each graph, not the whole graphs
+        catalog = Dataset()
+        for uri, graph in self.graphs.items():
+            context = catalog.graph(URIRef(uri))
+            context += graph.triples((URIRef(uri), RDF.type, None))
+            context += islice(graph, 1)
+        return (catalog.query(query).serialize(format="json") or b"").decode()
+
+    @contextmanager
+    def patch(self) -> Iterator["LocalGraphStore"]:
+        """Replace the CMEM API functions used by the plugin with this store"""
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch.object(plugin_pyshacl, "get", self.get))
+            stack.enter_context(
+                mock.patch.object(plugin_pyshacl, "sparql", SimpleNamespace(post=self.sparql_post))
+            )
+            stack.enter_context(
+                mock.patch.object(plugin_pyshacl, "setup_cmempy_user_access", return_value=None)
+            )
+            stack.enter_context(mock.patch.object(graph_io, "post_streamed", self.post_streamed))
+            yield self
+
+
+class LocalExecutionContext(ExecutionContext):
+    """Execution context without a user, which would need a token from CMEM"""
+
+    def __init__(self) -> None:
+        self.system = TestSystemContext()
+        self.report = ReportContext()
+        self.task = TestTaskContext()
+        self.user = None
+        self.workflow = TestWorkflowContext()
+
+
+def run_scale(triples: int, workers: int = 1, violations: float = 0.05) -> dict:
+    """Run the plugin on a synthetic data graph with about triples triples"""
+    start = perf_counter()
+    store = LocalGraphStore()
+    store.graphs[DATA_GRAPH_URI] = make_data(triples, violations)
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    generate = perf_counter() - start
+    plugin = ShaclValidation(
+        data_graph_uri=DATA_GRAPH_URI,
+        shacl_graph_uri=SHACL_GRAPH_URI,
+        validation_graph_uri=VALIDATION_GRAPH_URI,
+        generate_graph=True,
+        output_entities=True,
+        include_graphs_labels=True,
+        add_shui_conforms=True,
+        cache_graphs=False,
+        workers=workers,
+    )
+    with store.patch():
+        start = perf_counter()
+        entities = plugin.execute(inputs=(), context=LocalExecutionContext())
+        if entities is not None:
+            deque(entities.entities, 0)
+        total = perf_counter() - start
+    phases: dict[str, float] = {}
+    for span in plugin.profiler.spans:
+        phases[span.name] = phases.get(span.name, 0.0) + span.wall_seconds
+    validation_graph = store.graphs[VALIDATION_GRAPH_URI]
+    return {
+        "scale": triples,
+        "triples": len(store.graphs[DATA_GRAPH_URI]),
+        "workers": workers,
+        "results": len(set(validation_graph.subjects(RDF.type, SH.ValidationResult))),
+        "validation_triples": len(validation_graph),
+        "generate_seconds": round(generate, 3),
+        "total_seconds": round(total, 3),
+        "phase_seconds": {phase: round(seconds, 3) for phase, seconds in phases.items()},
+        "peak_rss_mb": round(max_rss() / 1024**2, 1),
+    }
+
+
+def run(scales: list[int], workers: int, violations: float) -> dict:
+    """Run each scale in a fresh process"""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for scale in scales:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_scale, (scale, workers, violations))
+        print(  # noqa: T201
+            f"{result['triples']} triples, {result['results']} results: "
+            f"{result['total_seconds']} s, {result['peak_rss_mb']} MB peak RSS, "
+            f"{result['phase_seconds']}"
+        )
+        results.append(result)
+    return {
+        "timestamp": datetime.now(tz=UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run benchmark and write results as JSON"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES[:2]))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--violations", type=float, default=0.05)
+    parser.add_argument("--output", type=Path, default=Path("benchmark.json"))
+    args = parser.parse_args(argv)
+    summary = run(args.scales, args.workers, args.violations)
+    args.output.write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Batch validation tests."""
+
+from collections import Counter
+from urllib.parse import quote
+
+import pytest
+from rdflib import PROV, RDF, SH, Graph, URIRef
+
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+
+from .benchmark import (
+    DATA_GRAPH_URI,
+    SHACL_GRAPH_URI,
+    VALIDATION_GRAPH_URI,
+    LocalExecutionContext,
+    LocalGraphStore,
+    make_data,
+    make_shapes,
+)
+
+BATCH_URIS = [f"{DATA_GRAPH_URI}/{i}" for i in range(3)]
+VOID_DATASET = URIRef("http://rdfs.org/ns/void#Dataset")
+
+
+def make_store() -> LocalGraphStore:
+    """Create local graph store with the data graph and three batch data graphs"""
+    store = LocalGraphStore()
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    store.graphs[DATA_GRAPH_URI] = make_data(300)
+    for seed, uri in enumerate(BATCH_URIS, 1):
+        graph = make_data(300, violations=0.2, seed=seed)
+        graph.remove((URIRef(DATA_GRAPH_URI), RDF.type, VOID_DATASET))
+        graph.add((URIRef(uri), RDF.type, VOID_DATASET))
+        store.graphs[uri] = graph
+    return store
+
+
+def run_batch(store: LocalGraphStore, **parameters: object) -> list:
+    """Run plugin in batch mode on the local graph store, return the entities"""
+    plugin = ShaclValidation(
+        data_graph_uri=DATA_GRAPH_URI,
+        shacl_graph_uri=SHACL_GRAPH_URI,
+        validation_graph_uri=VALIDATION_GRAPH_URI,
+        generate_graph=True,
+        output_entities=True,
+        cache_graphs=False,
+        batch_workers=2,
+        **parameters,  # type: ignore[arg-type]
+    )
+    with store.patch():
+        entities = plugin.execute(inputs=(), context=LocalExecutionContext())
+        return list(entities.entities) if entities is not None else []
+
+
+def report_sources(graph: Graph) -> Counter:
+    """Count validation reports by data graph"""
+    return Counter(
+        str(graph.value(report, PROV.wasDerivedFrom))
+        for report in graph.subjects(RDF.type, SH.ValidationReport)
+    )
+
+
+def test_batch_combined() -> None:
+    """Test one validation graph with a report per data graph"""
+    store = make_store()
+    store.graphs[VALIDATION_GRAPH_URI] = Graph()
+    store.graphs[VALIDATION_GRAPH_URI].add((URIRef(VALIDATION_GRAPH_URI), RDF.type, SH.Shape))
+    entities = run_batch(store, batch_data_graphs=" ".join(BATCH_URIS[:2]))
+    graph = store.graphs[VALIDATION_GRAPH_URI]
+    assert (URIRef(VALIDATION_GRAPH_URI), RDF.type, SH.Shape) not in graph
+    assert report_sources(graph) == Counter([DATA_GRAPH_URI, *BATCH_URIS[:2]])
+    results = set(graph.subjects(RDF.type, SH.ValidationResult))
+    assert len(entities) == len(results) > 0
+    assert {entity.values[8][0] for entity in entities} <= {DATA_GRAPH_URI, *BATCH_URIS[:2]}
+
+
+def test_batch_per_graph() -> None:
+    """Test one validation graph per data graph, selected by pattern"""
+    store = make_store()
+    run_batch(store, batch_graph_pattern=f"{DATA_GRAPH_URI}/[0-9]+", batch_output="per_graph")
+    for uri in [DATA_GRAPH_URI, *BATCH_URIS]:
+        graph = store.graphs[f"{VALIDATION_GRAPH_URI}/{quote(uri, safe='')}"]
+        assert report_sources(graph) == Counter([uri])
+    assert VALIDATION_GRAPH_URI not in store.graphs
+
+
+def test_batch_parameters() -> None:
+    """Test batch parameter checks"""
+    store = make_store()
+    with pytest.raises(ValueError, match="not found"):
+        run_batch(store, batch_data_graphs=f"{DATA_GRAPH_URI}/missing")
+    with pytest.raises(ValueError, match="pattern parameter is invalid"):
+        run_batch(store, batch_graph_pattern="[")
+    with pytest.raises(ValueError, match="not available in batch mode"):
+        run_batch(store, batch_graph_class=str(VOID_DATASET), changeset_graph_uri=BATCH_URIS[0])
@@ -0,0 +1,32 @@
+"""Benchmark tests."""
+
+import json
+from pathlib import Path
+
+from .benchmark import main, make_data, run_scale
+
+
+def test_make_data() -> None:
+    """Test synthetic data size and determinism"""
+    graph = make_data(1000)
+    assert 1000 <= len(graph) < 1100  # noqa: PLR2004
+    assert graph.isomorphic(make_data(1000))
+
+
+def test_run_scale() -> None:
+    """Test benchmark run on local graph store"""
+    result = run_scale(2000)
+    assert {"fetch and parse", "validation", "entities", "labelling", "upload"} <= set(
+        result["phase_seconds"]
+    )
+    assert result["results"] > 0
+    assert result["validation_triples"] > result["results"]
+    assert result["peak_rss_mb"] > 0
+
+
+def test_main(tmp_path: Path) -> None:
+    """Test JSON output"""
+    output = tmp_path / "benchmark.json"
+    main(["--scales", "1000", "--output", str(output)])
+    summary = json.loads(output.read_text())
+    assert [result["scale"] for result in summary["results"]] == [1000]
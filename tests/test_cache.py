@@ -0,0 +1,118 @@
+"""Graph cache tests."""
+
+import os
+import stat
+from functools import partial
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+
+from cmem_plugin_pyshacl import plugin_pyshacl
+from cmem_plugin_pyshacl.cache import GraphCache, MemoryGraphCache, cache_key
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+
+from .benchmark import (
+    DATA_GRAPH_URI,
+    SHACL_GRAPH_URI,
+    SHAPES,
+    LocalExecutionContext,
+    LocalGraphStore,
+    make_data,
+)
+
+
+def make_graph(size: int) -> Graph:
+    """Create graph with size triples"""
+    graph = Graph()
+    for i in range(size):
+        graph.add((URIRef(f"https://example.org/{i}"), URIRef("https://example.org/p"), Literal(i)))
+    return graph
+
+
+def test_graph_cache(tmp_path: Path) -> None:
+    """Test cache round trip and key changes"""
+    cache = GraphCache(directory=tmp_path)
+    graph = make_graph(10)
+    key = cache_key("https://example.org/", True, [{"count": "10"}])
+    assert cache.get(key) is None
+    cache.put(key, graph)
+    cached = cache.get(key)
+    assert cached is not None
+    assert isomorphic(cached, graph)
+    assert cache.get(cache_key("https://example.org/", True, [{"count": "11"}])) is None
+
+
+def test_graph_cache_eviction(tmp_path: Path) -> None:
+    """Test least recently used entries are evicted"""
+    cache = GraphCache(directory=tmp_path)
+    cache.put("a", make_graph(100))
+    cache.max_size = cache.path("a").stat().st_size * 2
+    cache.put("b", make_graph(100))
+    os.utime(cache.path("a"), (1, 1))
+    os.utime(cache.path("b"), (2, 2))
+    assert cache.get("a") is not None
+    assert cache.path("a").stat().st_mtime > 2  # noqa: PLR2004
+    cache.put("c", make_graph(100))
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_graph_cache_private(tmp_path: Path) -> None:
+    """Test the cache is only used in a directory private to the current user"""
+    cache = GraphCache(directory=tmp_path / "cache")
+    cache.put("a", make_graph(10))
+    assert stat.S_IMODE((tmp_path / "cache").stat().st_mode) == 0o700  # noqa: PLR2004
+    assert cache.get("a") is not None
+    (tmp_path / "shared").mkdir(mode=0o777)
+    (tmp_path / "shared").chmod(0o777)
+    shared = GraphCache(directory=tmp_path / "shared")
+    assert not shared.available()
+    shared.put("a", make_graph(10))
+    assert not shared.path("a").exists()
+    assert shared.get("a") is None
+
+
+def test_memory_graph_cache() -> None:
+    """Test graphs and their labels are kept in memory and evicted least recently used first"""
+    cache = MemoryGraphCache()
+    first, second = make_graph(1), make_graph(2)
+    labels = cache.put("first", first)
+    labels[URIRef("https://example.org/0")] = Literal("zero")
+    cache.put("second", second)
+    assert cache.get("first") == (first, {URIRef("https://example.org/0"): Literal("zero")})
+    assert cache.evict()
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.evict()
+    assert not cache.evict()
+    capped = MemoryGraphCache(max_size=2)
+    for key in ("a", "b", "a", "c"):
+        if capped.get(key) is None:
+            capped.put(key, Graph())
+    assert list(capped.graphs) == ["a", "c"]
+
+
+def test_cached_shapes_changed(tmp_path: Path) -> None:
+    """Test shapes changed without changing their triple count are not taken from the cache"""
+    store = LocalGraphStore()
+    store.graphs[DATA_GRAPH_URI] = make_data(300)
+    counts = []
+    for minimum in (0, 200):
+        shapes = SHAPES.replace("sh:minInclusive 0", f"sh:minInclusive {minimum}")
+        store.graphs[SHACL_GRAPH_URI] = Graph().parse(data=shapes, format="turtle")
+        plugin = ShaclValidation(
+            data_graph_uri=DATA_GRAPH_URI, shacl_graph_uri=SHACL_GRAPH_URI, output_entities=True
+        )
+        with (
+            store.patch(),
+            mock.patch.object(plugin_pyshacl, "GraphCache", partial(GraphCache, tmp_path)),
+        ):
+            entities = plugin.execute(inputs=(), context=LocalExecutionContext())
+            assert entities is not None
+            counts.append(len(list(entities.entities)))
+    assert counts[1] > counts[0]
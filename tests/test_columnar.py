@@ -0,0 +1,108 @@
+"""Columnar result file tests."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from cmem_plugin_pyshacl.columnar import ResultFileWriter
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation, entity_schema
+
+from .benchmark import (
+    DATA_GRAPH_URI,
+    SHACL_GRAPH_URI,
+    LocalExecutionContext,
+    LocalGraphStore,
+    make_data,
+    make_shapes,
+)
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def read_table(path: Path) -> Any:  # noqa: ANN401
+    """Read Parquet or Arrow IPC stream file"""
+    if path.suffix == ".parquet":
+        return pq.read_table(path)
+    with pa.ipc.open_stream(path) as reader:
+        return reader.read_all()
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrows"])
+def test_result_file_writer(tmp_path: Path, suffix: str) -> None:
+    """Test rows are written in batches with dictionary-encoded columns"""
+    path = tmp_path / f"results{suffix}"
+    rows = [(f"urn:result:{i}", [f"urn:shape:{i % 3}", None if i % 2 else "x"]) for i in range(25)]
+    with ResultFileWriter(path, ["shape", "value"], batch_size=10) as writer:
+        for uri, values in rows:
+            writer.add(uri, values)  # type: ignore[arg-type]
+    assert writer.count == len(rows)
+    assert writer.batches == 3  # noqa: PLR2004
+    table = read_table(path)
+    assert table.column_names == ["uri", "shape", "value"]
+    assert pa.types.is_dictionary(table.schema.field("shape").type)
+    assert table.column("uri").to_pylist() == [uri for uri, _ in rows]
+    assert table.column("value").to_pylist() == [values[1] for _, values in rows]
+
+
+def test_result_file_writer_empty(tmp_path: Path) -> None:
+    """Test a file without results has the schema"""
+    path = tmp_path / "results.parquet"
+    with ResultFileWriter(path, ["shape"]) as writer:
+        pass
+    assert writer.count == 0
+    table = read_table(path)
+    assert table.num_rows == 0
+    assert table.column_names == ["uri", "shape"]
+
+
+def test_plugin_result_file(tmp_path: Path) -> None:
+    """Test the result file has the rows and columns of the output entities"""
+    store = LocalGraphStore()
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    store.graphs[DATA_GRAPH_URI] = make_data(300, violations=0.2)
+    path = tmp_path / "results.parquet"
+    plugin = ShaclValidation(
+        data_graph_uri=DATA_GRAPH_URI,
+        shacl_graph_uri=SHACL_GRAPH_URI,
+        generate_graph=False,
+        output_entities=True,
+        cache_graphs=False,
+        result_file=str(path),
+    )
+    with store.patch():
+        entities = plugin.execute(inputs=(), context=LocalExecutionContext())
+        assert entities is not None
+        rows = [
+            [str(entity.uri), *(None if v[0] is None else str(v[0]) for v in entity.values)]
+            for entity in entities.entities
+        ]
+    table = read_table(path)
+    assert rows
+    assert table.column_names == ["uri"] + [str(p.path) for p in entity_schema().paths]
+    assert [list(row.values()) for row in table.to_pylist()] == rows
+
+
+def test_result_file_parameters(tmp_path: Path) -> None:
+    """Test the result file needs a supported suffix and an existing directory"""
+    parameters = {
+        "data_graph_uri": DATA_GRAPH_URI,
+        "shacl_graph_uri": SHACL_GRAPH_URI,
+        "generate_graph": False,
+    }
+    store = LocalGraphStore()
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    store.graphs[DATA_GRAPH_URI] = make_data(100)
+    with store.patch():
+        for name in ("results.csv", "results.arrow"):
+            with pytest.raises(ValueError, match="Result file suffix"):
+                ShaclValidation(
+                    **parameters,  # type: ignore[arg-type]
+                    result_file=str(tmp_path / name),
+                ).check_parameters()
+        with pytest.raises(ValueError, match="Result file directory"):
+            ShaclValidation(
+                **parameters,  # type: ignore[arg-type]
+                result_file=str(tmp_path / "missing" / "results.parquet"),
+            ).check_parameters()
@@ -0,0 +1,66 @@
+"""Compiled shapes tests."""
+
+import pytest
+from pyshacl import validate
+from pyshacl.errors import ReportableRuntimeError
+from rdflib import Graph
+
+from cmem_plugin_pyshacl.compiled import CompiledShapes, ShapesRegistry
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+
+from .benchmark import DATA_GRAPH_URI, SHACL_GRAPH_URI
+from .test_shapes import DATA, PREFIXES, SHAPES, result_keys
+
+
+def parse(data: str) -> Graph:
+    """Parse Turtle"""
+    return Graph().parse(data=data, format="turtle")
+
+
+def test_compiled_shapes_validate() -> None:
+    """Test validating with compiled shapes equals pySHACL validation, also when reused"""
+    _, expected, _ = validate(parse(DATA), shacl_graph=parse(SHAPES), inplace=True)
+    compiled = CompiledShapes(parse(SHAPES))
+    for _ in range(2):
+        conforms, validation_graph, _ = compiled.validate(parse(DATA), inplace=True)
+        assert not conforms
+        assert result_keys(validation_graph) == result_keys(expected)
+
+
+def test_meta_validate() -> None:
+    """Test Meta-SHACL validation is memoized per inference type"""
+    compiled = CompiledShapes(parse(SHAPES))
+    compiled.meta_validate("none")
+    assert compiled.meta_results["none"][0]
+    invalid = CompiledShapes(parse(PREFIXES + "ex:S a sh:NodeShape ; sh:minCount -1 ."))
+    for _ in range(2):
+        with pytest.raises(ReportableRuntimeError, match="MetaSHACL"):
+            invalid.meta_validate("none")
+    assert list(invalid.meta_results) == ["none"]
+
+
+def test_shapes_registry() -> None:
+    """Test compiled shapes are reused by key and least recently used ones are evicted"""
+    registry = ShapesRegistry(max_size=2)
+    a, reused = registry.get("a", parse(SHAPES))
+    assert not reused
+    assert registry.get("a", parse(SHAPES)) == (a, True)
+    registry.get("b", parse(SHAPES))
+    registry.get("a", parse(SHAPES))
+    registry.get("c", parse(SHAPES))
+    assert list(registry.compiled) == ["a", "c"]
+
+
+def test_shared_shapes_lock() -> None:
+    """Test runs sharing compiled shapes validate one at a time"""
+    plugins = [
+        ShaclValidation(
+            data_graph_uri=DATA_GRAPH_URI, shacl_graph_uri=SHACL_GRAPH_URI, output_entities=True
+        )
+        for _ in range(2)
+    ]
+    for plugin in plugins:
+        plugin.graph_digests[SHACL_GRAPH_URI] = "test_shared_shapes_lock"
+        plugin.compiled_shapes = plugin.compile_shapes(parse(SHAPES))
+    assert plugins[0].compiled_shapes is plugins[1].compiled_shapes
+    assert plugins[0].validation_lock is plugins[1].validation_lock
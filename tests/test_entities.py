@@ -0,0 +1,69 @@
+"""Entities output tests."""
+
+import tracemalloc
+from collections import deque
+from collections.abc import Callable
+
+from rdflib import RDF, SH, BNode, Graph, Literal, URIRef
+
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+
+UTCTIME = "2025-01-01T00:00:00Z"
+
+
+def make_report(size: int) -> Graph:
+    """Create synthetic validation report with size results"""
+    graph = Graph()
+    report = BNode()
+    graph.add((report, RDF.type, SH.ValidationReport))
+    graph.add((report, SH.conforms, Literal(False)))
+    for i in range(size):
+        result = BNode()
+        graph.add((report, SH.result, result))
+        graph.add((result, RDF.type, SH.ValidationResult))
+        graph.add((result, SH.focusNode, URIRef(f"https://example.org/{i}")))
+        graph.add((result, SH.resultPath, URIRef("https://example.org/name")))
+        graph.add((result, SH.value, Literal(i)))
+        graph.add((result, SH.sourceShape, URIRef("https://example.org/Shape")))
+        graph.add((result, SH.sourceConstraintComponent, SH.DatatypeConstraintComponent))
+        graph.add((result, SH.resultMessage, Literal(f"Value {i} is not a string")))
+        graph.add((result, SH.resultSeverity, SH.Violation))
+    return graph
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Get peak memory allocated while running func"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_entities() -> None:
+    """Test an entity is created for each result"""
+    plugin = ShaclValidation("https://example.org/data", "https://example.org/shapes")
+    entities = plugin.make_entities(make_report(10), Graph(), Graph(), UTCTIME)
+    assert not isinstance(entities.entities, list)
+    values = sorted(entity.values[0][0] for entity in entities.entities)
+    assert values == sorted(URIRef(f"https://example.org/{i}") for i in range(10))
+    assert len(entities.schema.paths) == 11  # noqa: PLR2004
+
+
+def test_entities_memory() -> None:
+    """Benchmark peak memory of consuming entities lazily against creating a list"""
+    plugin = ShaclValidation("https://example.org/data", "https://example.org/shapes")
+    graph = make_report(1000)
+
+    def streamed() -> None:
+        entities = plugin.make_entities(graph, Graph(), Graph(), UTCTIME).entities
+        deque(entities, maxlen=0)
+
+    def listed() -> None:
+        entities = plugin.make_entities(graph, Graph(), Graph(), UTCTIME).entities
+        _ = list(entities)
+
+    streamed_peak = peak_memory(streamed)
+    listed_peak = peak_memory(listed)
+    assert streamed_peak * 4 < listed_peak, f"streamed {streamed_peak} B, listed {listed_peak} B"
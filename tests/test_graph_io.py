@@ -0,0 +1,148 @@
+"""Graph transfer tests."""
+
+import tracemalloc
+from collections.abc import Iterator
+from hashlib import sha256
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from cmem.cmempy.dp.proxy import graph as graph_api
+from rdflib import RDFS, BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+
+from cmem_plugin_pyshacl.graph_io import BatchedGraphWriter, parse_ntriples_stream
+
+NTRIPLES = (
+    "<https://example.org/a> <https://example.org/p> <https://example.org/b> .\n"
+    '<https://example.org/a> <http://www.w3.org/2000/01/rdf-schema#label> "Grüße"@de .\n'
+    "_:b0 <https://example.org/p> <https://example.org/a> .\n"
+    "<https://example.org/b> <https://example.org/q> _:b0 .\n"
+).encode()
+
+
+class FakeResponse:
+    """Streamed response yielding tiny chunks"""
+
+    def __init__(self, body: bytes, size: int) -> None:
+        self.body = body
+        self.size = size
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:  # noqa: ARG002
+        """Split body into chunks, cutting through lines and UTF-8 sequences"""
+        for i in range(0, len(self.body), self.size):
+            yield self.body[i : i + self.size]
+
+
+def test_parse_ntriples_stream() -> None:
+    """Test chunked N-Triples parsing"""
+    graph = Graph()
+    stats = parse_ntriples_stream(FakeResponse(NTRIPLES, 7), graph)
+    assert stats.triples == 4  # noqa: PLR2004
+    assert stats.size == len(NTRIPLES)
+    assert stats.wait_seconds >= 0
+    assert stats.digest == sha256(NTRIPLES).hexdigest()
+    assert (URIRef("https://example.org/a"), None, Literal("Grüße", lang="de")) in graph
+    assert isomorphic(graph, Graph().parse(data=NTRIPLES, format="nt"))
+
+
+def test_parse_ntriples_stream_exclude() -> None:
+    """Test excluded triples are skipped while parsing"""
+    graph = Graph()
+    excluded = (
+        URIRef("https://example.org/a"),
+        URIRef("https://example.org/p"),
+        URIRef("https://example.org/b"),
+    )
+    stats = parse_ntriples_stream(FakeResponse(NTRIPLES, 7), graph, exclude={excluded})
+    assert stats.triples == 3  # noqa: PLR2004
+    assert stats.skipped == 1
+    assert excluded not in graph
+
+
+def test_batched_graph_writer() -> None:
+    """Test triples are posted in batches, only the first one replacing the graph"""
+    posts: list[tuple[bool, Graph]] = []
+
+    def post(graph_uri: str, file: str, replace: bool, content_type: str) -> SimpleNamespace:
+        assert graph_uri == "https://example.org/graph"
+        assert content_type == "application/n-triples"
+        posts.append((replace, Graph().parse(file, format="nt")))
+        return SimpleNamespace(status_code=204)
+
+    graph = Graph()
+    for i in range(25):
+        graph.add((URIRef(f"https://example.org/{i}"), RDFS.label, Literal(f"line\n{i}")))
+    with BatchedGraphWriter("https://example.org/graph", True, 10, post) as writer:
+        writer.write(graph)
+    assert writer.count == len(graph)
+    assert writer.serialize_seconds > 0
+    assert [replace for replace, _ in posts] == [True, False, False]
+    assert [len(batch) for _, batch in posts] == [10, 10, 5]
+    assert isomorphic(posts[0][1] + posts[1][1] + posts[2][1], graph)
+
+
+def test_batched_graph_writer_single_batch() -> None:
+    """Test triples with blank nodes are posted in one batch spooled to disk"""
+    sizes: list[int] = []
+
+    def post(graph_uri: str, file: str, replace: bool, content_type: str) -> SimpleNamespace:  # noqa: ARG001
+        sizes.append(Path(file).stat().st_size)
+        return SimpleNamespace(status_code=204)
+
+    tracemalloc.start()
+    try:
+        graph = Graph()
+        for i in range(5000):
+            node = BNode()
+            graph.add((URIRef(f"https://example.org/{i}"), RDFS.seeAlso, node))
+            graph.add((node, RDFS.label, Literal(f"label {i}")))
+        graph_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        with BatchedGraphWriter("https://example.org/graph", True, None, post) as writer:
+            writer.write(graph)
+        peak = tracemalloc.get_traced_memory()[1] - graph_size
+    finally:
+        tracemalloc.stop()
+    assert writer.batches == 1
+    assert writer.count == len(graph)
+    assert sizes[0] > 0
+    # the batch is not copied into a graph or serialized in memory
+    assert peak < graph_size / 4
+
+
+def test_batched_graph_writer_cmempy() -> None:
+    """Test batches are posted through cmempy and their files removed"""
+    posts: list[tuple[str, Graph]] = []
+    paths: list[str] = []
+
+    def request(uri: str, data: object, **_: object) -> SimpleNamespace:
+        paths.append(data.name)  # type: ignore[attr-defined]
+        posts.append((uri, Graph().parse(data=data.read(), format="nt")))  # type: ignore[attr-defined]
+        return SimpleNamespace(status_code=204)
+
+    graph = Graph()
+    for i in range(15):
+        graph.add((URIRef(f"https://example.org/{i}"), RDFS.label, Literal(f"label {i}")))
+    with (
+        mock.patch.object(graph_api, "request", request),
+        BatchedGraphWriter("https://example.org/graph", True, 10) as writer,
+    ):
+        writer.write(graph)
+    assert [uri.rpartition("&")[2] for uri, _ in posts] == ["replace=true", "replace=false"]
+    assert isomorphic(posts[0][1] + posts[1][1], graph)
+    assert not any(Path(path).exists() for path in paths)
+
+
+def test_batched_graph_writer_error() -> None:
+    """Test failed uploads raise an error"""
+    with (
+        pytest.raises(OSError, match="status code 500"),
+        BatchedGraphWriter(
+            "https://example.org/graph",
+            True,
+            post=lambda *_, **__: SimpleNamespace(status_code=500),
+        ),
+    ):
+        pass
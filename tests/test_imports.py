@@ -0,0 +1,44 @@
+"""Import time tests."""
+
+import subprocess
+import sys
+
+# modules only needed to validate, loaded when the plugin is executed
+VALIDATION_MODULES = {"pyshacl", "owlrl", "validators", "rdflib.plugins.sparql"}
+# seconds to import the plugin package after cmem-plugin-base, like the plugin discovery
+IMPORT_BUDGET = 0.25
+DISCOVERY = """
+import cmem_plugin_base.dataintegration.description
+from cmem_plugin_base.dataintegration.discovery import import_modules
+import_modules("cmem_plugin_pyshacl")
+"""
+
+
+def import_times(code: str) -> list[tuple[str, int]]:
+    """Run code with -X importtime, return the modules and their cumulative microseconds"""
+    process = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            # the name is indented by nesting level after one separating space
+            times.append((name[1:], int(cumulative)))
+    return times
+
+
+def test_discovery_imports() -> None:
+    """Test the plugin discovery loads no validation modules and stays within the budget"""
+    times = import_times(DISCOVERY)
+    assert not VALIDATION_MODULES & {name.strip() for name, _ in times}
+    names = [name for name, _ in times]
+    base = names.index("cmem_plugin_base.dataintegration.description")
+    # modules imported at the top level after cmem-plugin-base are imported by the plugin
+    total = sum(cumulative for name, cumulative in times[base + 1 :] if not name.startswith(" "))
+    assert total / 1e6 < IMPORT_BUDGET
@@ -0,0 +1,105 @@
+"""Incremental validation tests."""
+
+import logging
+
+from pyshacl import validate
+from rdflib import RDF, SH, Graph, Literal, URIRef
+
+from cmem_plugin_pyshacl.graph_io import update_queries
+from cmem_plugin_pyshacl.incremental import changed_resources, patch_report
+from cmem_plugin_pyshacl.parallel import validate_parallel
+from cmem_plugin_pyshacl.shapes import affected_nodes, analyze_shapes
+
+from .benchmark import EX, make_data, make_shapes
+from .test_shapes import DATA, PREFIXES, SHAPES
+
+BASEPATH = "https://example.org/validation/"
+CHANGES = (
+    PREFIXES
+    + """
+ex:carol ex:name "Carol" .
+ex:Paris a ex:City .
+ex:erin a ex:Person ; ex:name "Erin" ; ex:employer ex:acme .
+"""
+)
+
+
+def result_keys(graph: Graph) -> set:
+    """Get comparable keys of validation results"""
+    return {
+        (
+            graph.value(result, SH.focusNode),
+            graph.value(result, SH.sourceConstraintComponent),
+            graph.value(result, SH.value),
+        )
+        for result in graph.subjects(RDF.type, SH.ValidationResult)
+    }
+
+
+def test_affected_nodes() -> None:
+    """Test nodes within the path depth of changed resources are affected"""
+    data_graph = Graph().parse(data=DATA, format="turtle")
+    profile = analyze_shapes(Graph().parse(data=SHAPES, format="turtle"))
+    affected = affected_nodes(data_graph, profile, {URIRef("https://example.org/Paris")})
+    for name in ("Paris", "acme", "alice", "carol", "France"):
+        assert URIRef(f"https://example.org/{name}") in affected
+    assert URIRef("https://example.org/bob") not in affected
+    assert URIRef("https://example.org/dave") not in affected
+
+
+def test_affected_nodes_new_resource() -> None:
+    """Test a new resource does not affect the other instances of its class or its values"""
+    data_graph = make_data(20000)
+    profile = analyze_shapes(make_shapes())
+    changeset_graph = Graph().parse(
+        data=f"""
+        @prefix ex: <{EX}> .
+        ex:new a ex:Person ; ex:name "Person 5" ; ex:knows ex:person1 .
+        """,
+        format="turtle",
+    )
+    data_graph += changeset_graph
+    affected = affected_nodes(data_graph, profile, *changed_resources(changeset_graph))
+    assert EX.new in affected
+    assert EX.person1 in affected
+    assert EX.person5 not in affected
+    assert len(affected) < 10  # noqa: PLR2004
+
+
+def test_patch_report() -> None:
+    """Test patching a report gives the same results as validating the changed data"""
+    shacl_graph = Graph().parse(data=SHAPES, format="turtle")
+    data_graph = Graph().parse(data=DATA, format="turtle")
+    _, previous, _ = validate(data_graph, shacl_graph=shacl_graph)
+    previous = previous.skolemize(basepath=BASEPATH)
+    data_graph.parse(data=CHANGES, format="turtle")
+    changeset_graph = Graph().parse(data=CHANGES, format="turtle")
+    affected = affected_nodes(
+        data_graph, analyze_shapes(shacl_graph), *changed_resources(changeset_graph)
+    )
+    _, report = validate_parallel(
+        data_graph, shacl_graph, None, logging.getLogger(__name__), 1, focus_filter=affected
+    )
+    removed, added = patch_report(previous, report.skolemize(basepath=BASEPATH), affected, BASEPATH)
+    assert removed
+    assert added
+    patched = (previous - removed) + added
+    conforms, expected, _ = validate(data_graph, shacl_graph=shacl_graph)
+    assert result_keys(patched) == result_keys(expected)
+    assert len(set(patched.subjects(RDF.type, SH.ValidationReport))) == 1
+    assert set(patched.objects(predicate=SH.conforms)) == {Literal(conforms)}
+    assert (
+        not set(patched.subjects())
+        - set(patched.objects())
+        - set(patched.subjects(RDF.type, SH.ValidationReport))
+    )
+
+
+def test_update_queries() -> None:
+    """Test triples are sent in batches of DELETE DATA and INSERT DATA updates"""
+    triple = (URIRef("https://example.org/s"), URIRef("https://example.org/p"), Literal("o"))
+    queries = list(update_queries(BASEPATH, [triple], [triple] * 3, batch_size=2))
+    assert len(queries) == 3  # noqa: PLR2004
+    assert queries[0].startswith(f"DELETE DATA {{ GRAPH <{BASEPATH}> {{")
+    assert queries[1].count('<https://example.org/s> <https://example.org/p> "o" .') == 2  # noqa: PLR2004
+    assert queries[2].startswith("INSERT DATA")
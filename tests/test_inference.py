@@ -0,0 +1,103 @@
+"""Inference closure tests."""
+
+from pathlib import Path
+
+from pyshacl import validate
+from rdflib import RDF, SH, Graph, Namespace
+from rdflib.compare import isomorphic
+
+from cmem_plugin_pyshacl.cache import GraphCache
+from cmem_plugin_pyshacl.inference import ClosureCache, expand_graph, is_addition
+
+EX = Namespace("https://example.org/")
+PREFIXES = """
+@prefix ex: <https://example.org/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+"""
+ONTOLOGY = (
+    PREFIXES
+    + """
+ex:worksFor rdfs:domain ex:Person ; rdfs:range ex:Organization .
+ex:Student rdfs:subClassOf ex:Person .
+"""
+)
+SHAPES = (
+    PREFIXES
+    + """
+ex:PersonShape a sh:NodeShape ;
+    sh:targetClass ex:Person ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+ex:OrganizationShape a sh:NodeShape ;
+    sh:targetClass ex:Organization ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+"""
+)
+DATA = (
+    PREFIXES
+    + """
+ex:alice a ex:Student ; ex:name "Alice" ; ex:worksFor ex:acme .
+ex:bob ex:worksFor ex:acme .
+"""
+)
+ADDED = (
+    PREFIXES
+    + """
+ex:carol ex:worksFor ex:initech .
+"""
+)
+
+
+def parse(*data: str) -> Graph:
+    """Parse Turtle documents into one graph"""
+    graph = Graph()
+    for document in data:
+        graph.parse(data=document, format="turtle")
+    return graph
+
+
+def focus_nodes(data_graph: Graph, ontology_graph: Graph | None, inference: str) -> set:
+    """Get focus nodes of the validation results"""
+    _conforms, report, _text = validate(
+        data_graph, shacl_graph=parse(SHAPES), ont_graph=ontology_graph, inference=inference
+    )
+    return set(report.objects(None, SH.focusNode))
+
+
+def test_expand_graph() -> None:
+    """Test validating the expanded graph equals validating with inference in pySHACL"""
+    expected = focus_nodes(parse(DATA), parse(ONTOLOGY), "rdfs")
+    assert expected == {EX.bob, EX.acme}
+    graph = parse(DATA)
+    expand_graph(graph, parse(ONTOLOGY), "rdfs")
+    assert (EX.bob, RDF.type, EX.Person) in graph
+    assert focus_nodes(graph, None, "none") == expected
+
+
+def test_closure_cache(tmp_path: Path) -> None:
+    """Test closures are cached by digest and continued for additions"""
+    closures = ClosureCache(GraphCache(directory=tmp_path), "https://example.org/data", "rdfs")
+    data = parse(DATA)
+    assert closures.get("a") is None
+    assert closures.previous() is None
+    snapshot = closures.snapshot("a", data)
+    expand_graph(data, parse(ONTOLOGY), "rdfs")
+    closures.put("a", data, snapshot)
+    cached = closures.get("a")
+    assert cached is not None
+    assert isomorphic(cached, data)
+
+    added = parse(DATA, ADDED)
+    previous = closures.previous()
+    assert previous is not None
+    previous_data, closure = previous
+    assert isomorphic(previous_data, parse(DATA))
+    assert is_addition(previous_data, added)
+    assert not is_addition(added, previous_data)
+    closure += added
+    expand_graph(closure, None, "rdfs")
+    expected = parse(DATA, ADDED)
+    expand_graph(expected, parse(ONTOLOGY), "rdfs")
+    # the continued closure may contain additional entailed triples like x a rdfs:Resource
+    assert set(expected) <= set(closure)
+    assert focus_nodes(closure, None, "none") == focus_nodes(expected, None, "none")
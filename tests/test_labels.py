@@ -0,0 +1,45 @@
+"""Label index tests."""
+
+from rdflib import RDFS, SKOS, BNode, Graph, Literal, URIRef
+
+from cmem_plugin_pyshacl.plugin_pyshacl import SKOSXL, LabelIndex, ShaclValidation
+
+EX = "https://example.org/"
+
+
+def make_graph() -> Graph:
+    """Create graph with labels of different priority"""
+    graph = Graph()
+    a, b, c = URIRef(f"{EX}a"), URIRef(f"{EX}b"), URIRef(f"{EX}c")
+    graph.add((a, RDFS.label, Literal("A", lang="en")))
+    graph.add((a, SKOS.prefLabel, Literal("A skos")))
+    label = BNode()
+    graph.add((b, SKOSXL.prefLabel, label))
+    graph.add((label, SKOSXL.literalForm, Literal("B")))
+    graph.add((b, SKOS.prefLabel, Literal("B skos")))
+    graph.add((c, SKOS.prefLabel, Literal("C")))
+    return graph
+
+
+def test_label_index() -> None:
+    """Test label priority, language filter and memoization"""
+    graph = make_graph()
+    index = LabelIndex(graph)
+    assert index.get(URIRef(f"{EX}a")) == Literal("A", lang="en")
+    assert index.get(URIRef(f"{EX}b")) == Literal("B")
+    assert index.get(URIRef(f"{EX}c")) == Literal("C")
+    assert index.get(URIRef(f"{EX}d")) is None
+    graph.remove((None, None, None))
+    assert index.get(URIRef(f"{EX}a")) == Literal("A", lang="en")
+    untagged = LabelIndex(make_graph(), lang="")
+    assert untagged.get(URIRef(f"{EX}a")) == Literal("A skos")
+
+
+def test_graph_label() -> None:
+    """Test one label index is used per graph"""
+    plugin = ShaclValidation(f"{EX}data", f"{EX}shapes")
+    graph = make_graph()
+    assert plugin.graph_label(graph, URIRef(f"{EX}a")) == Literal("A", lang="en")
+    assert plugin.graph_label(Graph(), URIRef(f"{EX}a")) is None
+    assert plugin.graph_label(graph, URIRef(f"{EX}c")) == Literal("C")
+    assert len(plugin.label_indexes[id(graph)].labels) == 2  # noqa: PLR2004
@@ -0,0 +1,123 @@
+"""Result limit tests."""
+
+from unittest import mock
+
+from rdflib import SH, Graph
+
+from cmem_plugin_pyshacl.compiled import CompiledShapes
+from cmem_plugin_pyshacl.limits import ResultLimit
+from cmem_plugin_pyshacl.parallel import validate_parallel
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+
+from .benchmark import (
+    DATA_GRAPH_URI,
+    SHACL_GRAPH_URI,
+    VALIDATION_GRAPH_URI,
+    LocalExecutionContext,
+    LocalGraphStore,
+    make_data,
+    make_shapes,
+)
+from .test_shapes import DATA, PREFIXES
+
+SHAPES = (
+    PREFIXES
+    + """
+ex:PersonShape a sh:NodeShape ;
+    sh:targetSubjectsOf ex:parent ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+
+ex:ParentShape a sh:NodeShape ;
+    sh:targetObjectsOf ex:parent ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ; sh:severity sh:Warning ] .
+"""
+)
+
+
+def parse(data: str) -> Graph:
+    """Parse Turtle"""
+    return Graph().parse(data=data, format="turtle")
+
+
+def severities(graph: Graph) -> list:
+    """Get the severities of the validation results"""
+    return sorted(graph.objects(None, SH.resultSeverity))
+
+
+def test_severity_filter() -> None:
+    """Test results below the minimum severity are dropped and do not affect conformance"""
+    compiled = CompiledShapes(parse(SHAPES))
+    conforms, graph, _ = compiled.validate(parse(DATA), inplace=True)
+    assert not conforms
+    assert severities(graph) == [SH.Violation, SH.Violation, SH.Warning]
+    limit = ResultLimit(min_severity="violation")
+    conforms, graph, _ = compiled.validate(parse(DATA), None, limit, **limit.options())
+    assert not conforms
+    assert severities(graph) == [SH.Violation, SH.Violation]
+    data = parse(DATA + 'ex:carol ex:name "Carol" . ex:dave ex:name "Dave" .')
+    conforms, graph, _ = compiled.validate(data, None, limit, **limit.options())
+    assert conforms
+    assert severities(graph) == []
+
+
+def test_max_results() -> None:
+    """Test validation stops at the maximum number of results"""
+    compiled = CompiledShapes(parse(SHAPES))
+    limit = ResultLimit(max_results=1)
+    conforms, graph, _ = compiled.validate(parse(DATA), None, limit, **limit.options())
+    assert not conforms
+    assert len(severities(graph)) == 1
+    assert limit.truncated
+    limit = ResultLimit(max_results=3)
+    compiled.validate(parse(DATA), None, limit, **limit.options())
+    assert not limit.truncated
+    assert limit.count == 3  # noqa: PLR2004
+
+
+def test_abort_on_first() -> None:
+    """Test validation stops after the first shape which does not conform"""
+    compiled = CompiledShapes(parse(SHAPES))
+    limit = ResultLimit(abort_on_first=True)
+    conforms, graph, _ = compiled.validate(parse(DATA), None, limit, **limit.options())
+    assert not conforms
+    assert severities(graph) in ([SH.Violation, SH.Violation], [SH.Warning])
+
+
+def test_parallel_limits() -> None:
+    """Test limits of sharded validation"""
+    limit = ResultLimit(max_results=2, min_severity="violation")
+    conforms, graph = validate_parallel(
+        parse(DATA), parse(SHAPES), None, mock.Mock(), 1, limit=limit
+    )
+    assert not conforms
+    assert severities(graph) == [SH.Violation, SH.Violation]
+    limit = ResultLimit(max_results=1)
+    conforms, graph = validate_parallel(
+        parse(DATA), parse(SHAPES), None, mock.Mock(), 2, limit=limit
+    )
+    assert not conforms
+    assert len(severities(graph)) == 1
+    assert limit.truncated
+
+
+def test_plugin_max_results() -> None:
+    """Test the validation graph and entities of the plugin are limited"""
+    store = LocalGraphStore()
+    store.graphs[DATA_GRAPH_URI] = make_data(2000, violations=0.2)
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    plugin = ShaclValidation(
+        data_graph_uri=DATA_GRAPH_URI,
+        shacl_graph_uri=SHACL_GRAPH_URI,
+        validation_graph_uri=VALIDATION_GRAPH_URI,
+        generate_graph=True,
+        output_entities=True,
+        cache_graphs=False,
+        max_results=10,
+    )
+    with store.patch():
+        entities = plugin.execute(inputs=(), context=LocalExecutionContext())
+        assert entities is not None
+        assert len(list(entities.entities)) == 10  # noqa: PLR2004
+    assert len(set(store.graphs[VALIDATION_GRAPH_URI].subjects(SH.resultSeverity))) == 10  # noqa: PLR2004
+    span = next(span for span in plugin.profiler.spans if span.name == "validation")
+    assert span.details["truncated"]
@@ -0,0 +1,110 @@
+"""Parallel validation tests."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from pyshacl import validate
+from rdflib import SH, Graph
+from rdflib.compare import to_isomorphic
+
+from cmem_plugin_pyshacl.parallel import make_shards, validate_parallel
+
+SHAPES = """
+@prefix ex: <https://example.org/> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+ex:PersonShape a sh:NodeShape ;
+    sh:targetClass ex:Person ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ; sh:datatype xsd:string ] ;
+    sh:property [ sh:path ( ex:address ex:city ) ; sh:minCount 1 ] .
+
+ex:KnowsShape a sh:NodeShape ;
+    sh:targetObjectsOf ex:knows ;
+    sh:class ex:Person .
+"""
+
+
+NAME_SHAPES = """
+@prefix ex: <https://example.org/> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+
+ex:NameShape a sh:NodeShape ;
+    sh:targetClass ex:Person ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+"""
+
+
+def make_data(size: int) -> Graph:
+    """Create data graph with some violations"""
+    lines = ["@prefix ex: <https://example.org/> ."]
+    for i in range(size):
+        name = f'ex:name "Person {i}" ;' if i % 3 else "ex:name 42 ;"
+        city = "ex:address [ ex:city ex:Berlin ] ;" if i % 4 else ""
+        lines.append(f"ex:p{i} a ex:Person ; {name} {city} ex:knows ex:p{(i + 1) % (size + 2)} .")
+    lines.append("[] a ex:Person .")
+    return Graph().parse(data="\n".join(lines), format="turtle")
+
+
+def result_keys(graph: Graph) -> set:
+    """Get comparable keys of validation results"""
+    return {
+        (
+            graph.value(result, SH.focusNode),
+            graph.value(result, SH.sourceConstraintComponent),
+            graph.value(result, SH.value),
+        )
+        for result in graph.subjects(SH.resultSeverity, SH.Violation)
+    }
+
+
+def test_make_shards() -> None:
+    """Test every focus node of every shape is assigned exactly once"""
+    data_graph = make_data(50)
+    shards = make_shards(data_graph, Graph().parse(data=SHAPES, format="turtle"), 7)
+    assert len(shards) == 7  # noqa: PLR2004
+    pairs = [(shape, node) for shard in shards for shape, nodes in shard for node in nodes]
+    assert len(pairs) == len(set(pairs)) == 51 + 50
+
+
+def test_validate_parallel() -> None:
+    """Test sharded validation produces the same results as pySHACL"""
+    data_graph = make_data(40)
+    shacl_graph = Graph().parse(data=SHAPES, format="turtle")
+    conforms, expected, _ = validate(data_graph, shacl_graph=shacl_graph)
+    parallel_conforms, report = validate_parallel(
+        data_graph, shacl_graph, None, logging.getLogger(__name__), 3
+    )
+    assert parallel_conforms is conforms is False
+    assert result_keys(report) == result_keys(expected)
+    assert len(report) == len(expected)
+    assert len(set(report.objects(predicate=SH.result))) == len(
+        set(expected.objects(predicate=SH.result))
+    )
+    assert to_isomorphic(report) == to_isomorphic(expected)
+
+
+def test_validate_in_process_concurrently() -> None:
+    """Test concurrent validations in the current process keep their own validators"""
+    data_graph = make_data(40)
+    shacl_graphs = [Graph().parse(data=data, format="turtle") for data in (SHAPES, NAME_SHAPES)]
+    expected = [
+        result_keys(validate(data_graph, shacl_graph=shacl_graph)[1])
+        for shacl_graph in shacl_graphs
+    ]
+    focus_filter = set(data_graph.subjects()) | set(data_graph.objects())
+
+    def run(shacl_graph: Graph) -> set:
+        _, report = validate_parallel(
+            data_graph,
+            shacl_graph,
+            None,
+            logging.getLogger(__name__),
+            1,
+            focus_filter=focus_filter,
+        )
+        return result_keys(report)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(3):
+            assert list(executor.map(run, shacl_graphs * 2)) == expected * 2
@@ -0,0 +1,71 @@
+"""Parameter check tests."""
+
+from unittest import mock
+
+import pytest
+from rdflib import Graph
+
+from cmem_plugin_pyshacl import plugin_pyshacl
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+
+from .benchmark import (
+    DATA_GRAPH_URI,
+    SHACL_GRAPH_URI,
+    VALIDATION_GRAPH_URI,
+    LocalExecutionContext,
+    LocalGraphStore,
+    make_data,
+    make_shapes,
+)
+
+
+def test_graph_lookup() -> None:
+    """Test that referenced graphs are looked up with one cached query"""
+    store = LocalGraphStore()
+    store.graphs[DATA_GRAPH_URI] = make_data(100)
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    plugin = ShaclValidation(
+        data_graph_uri=DATA_GRAPH_URI,
+        shacl_graph_uri=SHACL_GRAPH_URI,
+        validation_graph_uri=VALIDATION_GRAPH_URI,
+        generate_graph=True,
+        cache_graphs=False,
+    )
+    with (
+        store.patch(),
+        mock.patch.object(plugin_pyshacl.sparql, "post", wraps=store.sparql_post) as post,
+    ):
+        plugin.check_parameters()
+        assert post.call_count == 1
+        # the types are only looked up in the referenced graphs
+        assert "GRAPH ?graph { ?graph a ?class }" in post.call_args.args[0]
+        assert plugin.known_graphs == {
+            DATA_GRAPH_URI: ["http://rdfs.org/ns/void#Dataset"],
+            SHACL_GRAPH_URI: ["https://vocab.eccenca.com/shui/ShapeCatalog"],
+        }
+        # the missing validation graph is looked up again
+        plugin.check_parameters()
+        assert post.call_count == 2  # noqa: PLR2004
+        assert VALIDATION_GRAPH_URI not in plugin.known_graphs
+        plugin.execute(inputs=(), context=LocalExecutionContext())
+        assert VALIDATION_GRAPH_URI in store.graphs
+        plugin.check_parameters()
+        assert VALIDATION_GRAPH_URI in plugin.known_graphs
+        post.reset_mock()
+        plugin.check_parameters()
+        post.assert_not_called()
+
+
+def test_graph_not_found() -> None:
+    """Test missing graph and invalid graph type"""
+    store = LocalGraphStore()
+    store.graphs[DATA_GRAPH_URI] = make_data(100)
+    plugin = ShaclValidation(
+        data_graph_uri=DATA_GRAPH_URI, shacl_graph_uri=SHACL_GRAPH_URI, output_entities=True
+    )
+    with store.patch():
+        with pytest.raises(ValueError, match=r"SHACL graph <.+> not found"):
+            plugin.execute(inputs=(), context=LocalExecutionContext())
+        store.graphs[SHACL_GRAPH_URI] = Graph().parse(data=f"<{SHACL_GRAPH_URI}> a <urn:x> .")
+        with pytest.raises(ValueError, match="Invalid graph type for SHACL graph"):
+            plugin.execute(inputs=(), context=LocalExecutionContext())
@@ -0,0 +1,47 @@
+"""Profiling tests."""
+
+import json
+import pstats
+import tracemalloc
+from pathlib import Path
+
+from cmem_plugin_pyshacl.profiling import Profiler, dump_profile
+
+
+def test_profiler() -> None:
+    """Test spans record time, memory and counts"""
+    profiler = Profiler()
+    with profiler.span("outer") as outer:
+        with profiler.span("inner") as inner:
+            inner.count = sum(range(100000))
+            inner.details["unit"] = "numbers"
+        outer.count = 1
+    summary = json.loads(profiler.to_json())
+    assert [span["name"] for span in summary["spans"]] == ["inner", "outer"]
+    inner_span, outer_span = summary["spans"]
+    assert inner_span["count"] == sum(range(100000))
+    assert inner_span["unit"] == "numbers"
+    assert 0 < inner_span["wall_seconds"] <= outer_span["wall_seconds"]
+    assert outer_span["start_seconds"] <= inner_span["start_seconds"]
+    assert inner_span["process_peak_rss_mb"] > 0
+    assert "peak_traced_mb" not in inner_span
+
+
+def test_dump_profile(tmp_path: Path) -> None:
+    """Test cProfile statistics and tracemalloc snapshot are written"""
+    profiler = Profiler()
+    with dump_profile(tmp_path, "run"), profiler.span("outer"):
+        with profiler.span("allocate"):
+            data = [str(i) for i in range(100000)]
+        del data
+        with profiler.span("small"):
+            small = [str(i) for i in range(10)]
+    assert small
+    assert not tracemalloc.is_tracing()
+    allocate, small_span, outer = profiler.spans
+    assert allocate.peak_traced
+    assert small_span.peak_traced
+    assert outer.peak_traced
+    assert small_span.peak_traced < allocate.peak_traced <= outer.peak_traced
+    pstats.Stats(str(tmp_path / "run.prof"))
+    assert tracemalloc.Snapshot.load(str(tmp_path / "run.tracemalloc")).traces
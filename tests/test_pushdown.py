@@ -0,0 +1,85 @@
+"""SPARQL target push-down tests."""
+
+import pytest
+from pyshacl import validate
+from rdflib import BNode, Graph, URIRef
+from rdflib.term import Node
+
+from cmem_plugin_pyshacl.pushdown import BlankNodesError, NeighbourhoodFetcher
+from cmem_plugin_pyshacl.shapes import analyze_shapes
+
+from .test_shapes import DATA, SHAPES, result_keys
+
+# the data without blank nodes, which are not fetched with inverse paths
+IRI_DATA = DATA.replace("[ ex:city ex:Berlin ] , [ ex:city ex:Paris ]", "ex:a1 , ex:a2").replace(
+    "ex:Berlin a ex:City", "ex:a1 ex:city ex:Berlin . ex:a2 ex:city ex:Paris .\nex:Berlin a ex:City"
+)
+# the shapes without inverse paths
+FORWARD_SHAPES = SHAPES[: SHAPES.index("ex:ParentShape")]
+
+
+def make_fetcher(data_graph: Graph, page_size: int, shapes: str = SHAPES) -> tuple:
+    """Create fetcher and query functions running the queries on data_graph"""
+    queries: list[str] = []
+
+    def select(query: str) -> list[Node]:
+        queries.append(query)
+        return [row[0] for row in data_graph.query(query)]  # type: ignore[index]
+
+    def construct(query: str) -> str:
+        queries.append(query)
+        return data_graph.query(query).graph.serialize(format="nt")  # type: ignore[union-attr]
+
+    profile = analyze_shapes(Graph().parse(data=shapes, format="turtle"))
+    return NeighbourhoodFetcher(profile, page_size=page_size), select, construct, queries
+
+
+def test_fetch_neighbourhoods() -> None:
+    """Test validation of the fetched neighbourhoods gives the same results"""
+    data_graph = Graph().parse(data=IRI_DATA, format="turtle")
+    shacl_graph = Graph().parse(data=SHAPES, format="turtle")
+    fetcher, select, construct, queries = make_fetcher(data_graph, 2)
+    graph, focus_count = fetcher.fetch(select, construct)
+    assert focus_count == 3  # noqa: PLR2004
+    assert len(graph) < len(data_graph)
+    assert (None, URIRef("https://example.org/neighbour"), None) not in graph
+    assert len([q for q in queries if q.startswith("SELECT DISTINCT")]) == 2  # noqa: PLR2004
+    _, expected, _ = validate(data_graph, shacl_graph=shacl_graph)
+    conforms, report, _ = validate(graph, shacl_graph=shacl_graph)
+    assert not conforms
+    assert result_keys(report) == result_keys(expected)
+
+
+def test_blank_focus_nodes() -> None:
+    """Test blank focus nodes are detected"""
+    data_graph = Graph().parse(data=DATA, format="turtle")
+    data_graph.add((BNode(), URIRef("https://example.org/parent"), BNode()))
+    fetcher, select, construct, _ = make_fetcher(data_graph, 10)
+    with pytest.raises(BlankNodesError):
+        fetcher.fetch(select, construct)
+
+
+def test_fetch_blank_nodes() -> None:
+    """Test blank nodes are fetched in the response of the resource they are reached from"""
+    data_graph = Graph().parse(data=DATA, format="turtle")
+    shacl_graph = Graph().parse(data=FORWARD_SHAPES, format="turtle")
+    fetcher, select, construct, _ = make_fetcher(data_graph, 1, FORWARD_SHAPES)
+    graph, _ = fetcher.fetch(select, construct)
+    assert len(list(graph.objects(URIRef("https://example.org/acme"), None))) == 2  # noqa: PLR2004
+    assert len(set(graph.subjects(URIRef("https://example.org/city"), None))) == 2  # noqa: PLR2004
+    _, expected, _ = validate(data_graph, shacl_graph=shacl_graph)
+    conforms, report, _ = validate(graph, shacl_graph=shacl_graph)
+    assert not conforms
+    assert result_keys(report) == result_keys(expected)
+    with pytest.raises(BlankNodesError, match="inverse paths"):
+        make_fetcher(data_graph, 1)[0].fetch(select, construct)
+
+
+def test_fetch_levels() -> None:
+    """Test each node is queried once, level by level"""
+    data_graph = Graph().parse(data=IRI_DATA, format="turtle")
+    fetcher, select, construct, queries = make_fetcher(data_graph, 100)
+    fetcher.fetch(select, construct)
+    neighbourhood_queries = [q for q in queries if "VALUES ?n0" in q]
+    assert len(neighbourhood_queries) <= fetcher.profile.depth + 1
+    assert "<https://example.org/alice>" not in "".join(neighbourhood_queries[1:])
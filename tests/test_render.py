@@ -0,0 +1,67 @@
+"""Blank node rendering tests."""
+
+from rdflib import SH, BNode, Graph
+from rdflib.compare import isomorphic
+
+from cmem_plugin_pyshacl.render import BlankNodeRenderer, path_string
+
+from .test_shapes import PREFIXES
+
+PATHS = (
+    PREFIXES
+    + """
+ex:s1 sh:path ( ex:a ex:b ) .
+ex:s2 sh:path [ sh:alternativePath ( ex:a [ sh:inversePath ex:b ] ) ] .
+ex:s3 sh:path [ sh:zeroOrMorePath ( ex:a ex:b ) ] .
+ex:s4 sh:path ( [ sh:oneOrMorePath ex:a ] [ sh:zeroOrOnePath ex:b ] ) .
+ex:s5 sh:path [ ex:unknown ex:a ] .
+"""
+)
+
+
+def test_path_string() -> None:
+    """Test SHACL paths are rendered in SPARQL property path syntax"""
+    graph = Graph().parse(data=PATHS, format="turtle")
+    paths = {
+        str(shape).rsplit("/", 1)[1]: path_string(graph, path)
+        for shape, path in graph.subject_objects(SH.path)
+    }
+    assert paths == {
+        "s1": "ex:a/ex:b",
+        "s2": "ex:a|^ex:b",
+        "s3": "(ex:a/ex:b)*",
+        "s4": "ex:a+/ex:b?",
+        "s5": None,
+    }
+
+
+def test_render_cache() -> None:
+    """Test equal structures are rendered once and match the CBD"""
+    data = PREFIXES + "ex:x ex:p [ ex:q ( 1 2 ) ] .\nex:y ex:p [ ex:q ( 1 2 ) ] ."
+    graph = Graph().parse(data=data, format="turtle")
+    renderer = BlankNodeRenderer(graph)
+    nodes = [
+        node
+        for node in graph.objects(predicate=graph.namespace_manager.expand_curie("ex:p"))
+        if isinstance(node, BNode)
+    ]
+    renderings = {renderer.render(node) for node in nodes}
+    assert len(renderings) == len(renderer.renderings) == 1
+    rendered = Graph().parse(data=renderings.pop(), format="turtle")
+    assert isomorphic(rendered, graph.cbd(nodes[0]))
+    assert renderer.render_path(nodes[0]) == renderer.render(nodes[0])
+
+
+def test_render_bounded() -> None:
+    """Test rendering stops at the triple and line budget"""
+    items = " ".join(str(i) for i in range(1000))
+    graph = Graph().parse(data=PREFIXES + f"ex:x ex:p ( {items} ) .", format="turtle")
+    head = next(graph.objects(predicate=graph.namespace_manager.expand_curie("ex:p")))
+    renderer = BlankNodeRenderer(graph, max_triples=100)
+    assert isinstance(head, BNode)
+    edges, truncated = renderer.describe(head)
+    assert truncated
+    assert sum(len(e) for e in edges.values()) == 100  # noqa: PLR2004
+    rendering = renderer.render(head)
+    assert rendering.endswith("\n...")
+    assert len(rendering.split("\n")) <= renderer.max_lines + 1
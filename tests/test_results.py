@@ -0,0 +1,55 @@
+"""Result table tests."""
+
+from pyshacl import validate
+from rdflib import PROV, RDF, RDFS, SH, Graph
+
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+from cmem_plugin_pyshacl.results import RESULT_FIELDS, ResultTable
+
+from .test_shapes import DATA, SHAPES
+
+BASEPATH = "https://example.org/validation/"
+
+
+def make_report() -> Graph:
+    """Create validation report with blank node results"""
+    data_graph = Graph().parse(data=DATA, format="turtle")
+    shacl_graph = Graph().parse(data=SHAPES, format="turtle")
+    report: Graph
+    _, report, _ = validate(data_graph, shacl_graph=shacl_graph)
+    return report
+
+
+def test_result_table() -> None:
+    """Test the table holds the same values as the graph, also when skolemized"""
+    graph = make_report()
+    table = ResultTable.from_graph(graph)
+    assert len(table) == len(set(graph.subjects(RDF.type, SH.ValidationResult))) > 0
+    assert table.conforms == graph.value(table.report, SH.conforms)
+    skolemized = graph.skolemize(basepath=BASEPATH)
+    for table_, graph_ in ((table, graph), (table.skolemize(BASEPATH), skolemized)):
+        assert (table_.report, RDF.type, SH.ValidationReport) in graph_
+        for result in table_:
+            for predicate in RESULT_FIELDS:
+                assert result.get(predicate) == graph_.value(result.node, predicate)
+
+
+def test_enrich_graph() -> None:
+    """Test labels, shui:conforms flags and provenance are added from the table"""
+    plugin = ShaclValidation(
+        "https://example.org/data",
+        "https://example.org/shapes",
+        add_shui_conforms=True,
+    )
+    graph = make_report()
+    output = Graph()
+    table = ResultTable.from_graph(graph)
+    plugin.enrich_graph(output, table, Graph(), Graph(), "2025-01-01T00:00:00Z")
+    assert len(set(output.subjects(RDFS.label))) == len(table) + 1
+    focus_nodes = {result.focus_node for result in table}
+    assert set(output.subjects(predicate=RDFS.label)) - {table.report} == {
+        result.node for result in table
+    }
+    assert len(set(output.subjects(predicate=PROV.wasDerivedFrom))) == 1
+    shui = {s for s, p, _ in output if str(p).endswith("conforms")}
+    assert shui == focus_nodes
@@ -0,0 +1,118 @@
+"""Validation service tests."""
+
+import os
+from collections.abc import Iterator
+from functools import partial
+from pathlib import Path
+from threading import Event, Thread
+from unittest import mock
+
+import pytest
+
+from cmem_plugin_pyshacl import plugin_pyshacl
+from cmem_plugin_pyshacl.cache import GraphCache
+from cmem_plugin_pyshacl.client import SERVICE_KEY
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+from cmem_plugin_pyshacl.service import Credentials, JobLogger, ValidationService
+
+from .benchmark import (
+    DATA_GRAPH_URI,
+    SHACL_GRAPH_URI,
+    LocalExecutionContext,
+    LocalGraphStore,
+    make_data,
+    make_shapes,
+)
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> Iterator[ValidationService]:
+    """Run a validation service on a free local port"""
+    monkeypatch.setenv(SERVICE_KEY, "secret")
+    service = ValidationService("127.0.0.1:0", jobs=2)
+    ready = Event()
+    thread = Thread(target=service.serve, args=(ready,), daemon=True)
+    thread.start()
+    ready.wait(10)
+    yield service
+    service.stop()
+    thread.join(10)
+
+
+def run_plugin(tmp_path: Path, store: LocalGraphStore, service_address: str) -> tuple[list, list]:
+    """Run plugin on the local graph store, return the entities and log messages"""
+    plugin = ShaclValidation(
+        data_graph_uri=DATA_GRAPH_URI,
+        shacl_graph_uri=SHACL_GRAPH_URI,
+        output_entities=True,
+        service_address=service_address,
+    )
+    plugin.log = JobLogger()
+    with (
+        store.patch(),
+        mock.patch.object(plugin_pyshacl, "GraphCache", partial(GraphCache, tmp_path)),
+    ):
+        entities = plugin.execute(inputs=(), context=LocalExecutionContext())
+        assert entities is not None
+        return list(entities.entities), [message for _, message in plugin.log.messages]
+
+
+def result_values(entities: list) -> list:
+    """Get the sorted entity values without the generation time of the runs"""
+    return sorted(entity.values[:-1] for entity in entities)
+
+
+def test_service(tmp_path: Path, service: ValidationService) -> None:
+    """Test runs in the service keep the SHACL graph in memory and match local runs"""
+    store = LocalGraphStore()
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    store.graphs[DATA_GRAPH_URI] = make_data(300)
+    address = f"{service.address[0]}:{service.address[1]}"
+    local, _ = run_plugin(tmp_path / "local", store, "")
+    first, first_log = run_plugin(tmp_path / "service", store, address)
+    second, second_log = run_plugin(tmp_path / "service", store, address)
+    assert result_values(first) == result_values(local)
+    assert result_values(second) == result_values(local)
+    assert any(message.startswith("Validation service finished") for message in first_log)
+    assert f"Using graph <{SHACL_GRAPH_URI}> from memory" not in first_log
+    assert f"Using graph <{SHACL_GRAPH_URI}> from memory" in second_log
+    service.max_memory = 1
+    service.evict()
+    assert not service.memory_cache.graphs
+
+
+def test_service_unavailable(
+    tmp_path: Path, service: ValidationService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the plugin validates in its own process if the service is not reachable"""
+    store = LocalGraphStore()
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    store.graphs[DATA_GRAPH_URI] = make_data(300)
+    monkeypatch.setenv(SERVICE_KEY, "other")
+    entities, log = run_plugin(tmp_path, store, f"{service.address[0]}:{service.address[1]}")
+    assert entities
+    assert any(message.startswith("Validation service at") for message in log)
+    monkeypatch.delenv(SERVICE_KEY)
+    entities, log = run_plugin(tmp_path, store, f"{service.address[0]}:{service.address[1]}")
+    assert entities
+    assert any(SERVICE_KEY in message for message in log)
+
+
+def test_credentials(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test jobs run with their environment and only other jobs of that environment"""
+    monkeypatch.setenv("CMEM_BASE_URI", "https://one.example.org")
+    monkeypatch.setenv("OAUTH_CLIENT_SECRET", "one")
+    credentials = Credentials()
+    environment = {"CMEM_BASE_URI": "https://two.example.org"}
+    with credentials.use(environment):
+        assert os.environ["CMEM_BASE_URI"] == "https://two.example.org"
+        assert "OAUTH_CLIENT_SECRET" not in os.environ
+        with credentials.use(dict(environment)):
+            assert credentials.running == 2  # noqa: PLR2004
+        waiting = Thread(target=lambda: credentials.use({}).__enter__())
+        waiting.start()
+        waiting.join(0.2)
+        assert waiting.is_alive()
+    waiting.join(10)
+    assert credentials.environment == {}
+    assert "CMEM_BASE_URI" not in os.environ
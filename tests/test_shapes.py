@@ -0,0 +1,93 @@
+"""Shapes analysis tests."""
+
+from pyshacl import validate
+from rdflib import SH, Graph, URIRef
+
+from cmem_plugin_pyshacl.shapes import analyze_shapes, extract_neighbourhood
+
+PREFIXES = """
+@prefix ex: <https://example.org/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+"""
+
+SHAPES = (
+    PREFIXES
+    + """
+ex:PersonShape a sh:NodeShape ;
+    sh:targetClass ex:Person ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] ;
+    sh:property [ sh:path ex:employer ; sh:node ex:CompanyShape ] .
+
+ex:CompanyShape a sh:NodeShape ;
+    sh:property [ sh:path ( ex:address ex:city ) ; sh:class ex:City ] .
+
+ex:ParentShape a sh:NodeShape ;
+    sh:targetObjectsOf ex:parent ;
+    sh:property [ sh:path [ sh:inversePath ex:parent ] ; sh:maxCount 2 ] .
+"""
+)
+
+DATA = (
+    PREFIXES
+    + """
+ex:Employee rdfs:subClassOf ex:Person .
+ex:alice a ex:Employee ; ex:name "Alice" ; ex:employer ex:acme ; ex:parent ex:bob .
+ex:carol a ex:Person ; ex:employer ex:acme ; ex:parent ex:bob .
+ex:dave ex:parent ex:bob .
+ex:acme ex:address [ ex:city ex:Berlin ] , [ ex:city ex:Paris ] .
+ex:Berlin a ex:City ; ex:country ex:Germany .
+ex:Paris a ex:Town .
+ex:Germany ex:capital ex:Berlin ; ex:neighbour ex:France .
+ex:France ex:capital ex:Paris .
+"""
+)
+
+
+def result_keys(graph: Graph) -> set:
+    """Get comparable keys of validation results"""
+    return {
+        (graph.value(result, SH.focusNode), graph.value(result, SH.sourceConstraintComponent))
+        for result in graph.subjects(SH.resultSeverity, SH.Violation)
+    }
+
+
+def test_analyze_shapes() -> None:
+    """Test targets and path depth"""
+    profile = analyze_shapes(Graph().parse(data=SHAPES, format="turtle"))
+    assert profile.bounded
+    assert profile.depth == 3  # noqa: PLR2004
+    assert profile.inverse
+    assert profile.target_classes == {URIRef("https://example.org/Person")}
+    assert profile.target_objects_of == {URIRef("https://example.org/parent")}
+
+
+def test_analyze_unbounded_shapes() -> None:
+    """Test unbounded shapes are detected"""
+    shapes = (
+        PREFIXES
+        + """
+ex:Shape sh:targetClass ex:Person ;
+    sh:property [ sh:path [ sh:zeroOrMorePath ex:knows ] ; sh:class ex:Person ] .
+"""
+    )
+    profile = analyze_shapes(Graph().parse(data=shapes, format="turtle"))
+    assert not profile.bounded
+    recursive = PREFIXES + "ex:Shape sh:targetClass ex:Person ; sh:property ex:P .\n"
+    recursive += "ex:P sh:path ex:knows ; sh:node ex:Shape ."
+    assert not analyze_shapes(Graph().parse(data=recursive, format="turtle")).bounded
+
+
+def test_extract_neighbourhood() -> None:
+    """Test validation of the neighbourhood gives the same results"""
+    data_graph = Graph().parse(data=DATA, format="turtle")
+    shacl_graph = Graph().parse(data=SHAPES, format="turtle")
+    neighbourhood, focus_count = extract_neighbourhood(data_graph, analyze_shapes(shacl_graph))
+    assert focus_count == 3  # noqa: PLR2004
+    assert len(neighbourhood) < len(data_graph)
+    assert (None, URIRef("https://example.org/neighbour"), None) not in neighbourhood
+    _, expected, _ = validate(data_graph, shacl_graph=shacl_graph)
+    conforms, report, _ = validate(neighbourhood, shacl_graph=shacl_graph)
+    assert not conforms
+    assert result_keys(report) == result_keys(expected)
+    assert len(result_keys(report)) == 5  # noqa: PLR2004
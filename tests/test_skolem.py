@@ -0,0 +1,147 @@
+"""Skolemization tests."""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from pyshacl import validate
+from rdflib import RDF, SH, BNode, Graph, URIRef
+
+from cmem_plugin_pyshacl import plugin_pyshacl
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+from cmem_plugin_pyshacl.skolem import ContentSkolemizer, Skolemizer
+
+from .benchmark import (
+    DATA_GRAPH_URI,
+    SHACL_GRAPH_URI,
+    VALIDATION_GRAPH_URI,
+    LocalExecutionContext,
+    LocalGraphStore,
+    make_data,
+    make_shapes,
+)
+
+BASEPATH = "https://example.org/validation/"
+
+
+def make_report(data_graph: Graph) -> Graph:
+    """Validate data graph against the benchmark shapes"""
+    report: Graph
+    _, report, _ = validate(data_graph, shacl_graph=make_shapes())
+    return report
+
+
+def test_skolemizer() -> None:
+    """Test triples are skolemized like Graph.skolemize"""
+    report = make_report(make_data(100, violations=0.2))
+    assert set(Skolemizer(BASEPATH).triples(report)) == set(report.skolemize(basepath=BASEPATH))
+
+
+def test_content_skolemizer() -> None:
+    """Test equal results get equal IRIs in different runs"""
+    data_graph = make_data(300, violations=0.2)
+    first = ContentSkolemizer(make_report(data_graph), BASEPATH, DATA_GRAPH_URI)
+    second = ContentSkolemizer(make_report(data_graph), BASEPATH, DATA_GRAPH_URI)
+    first_graph, second_graph = first.graph(first.source), second.graph(second.source)
+    assert not any(isinstance(node, BNode) for triple in first_graph for node in triple)
+    assert set(first_graph) == set(second_graph)
+    results = set(first_graph.subjects(RDF.type, SH.ValidationResult))
+    assert len(results) == len(set(first.source.subjects(RDF.type, SH.ValidationResult)))
+    focus_node = next(iter(first_graph.objects(None, SH.focusNode)))
+    data_graph.remove((focus_node, None, None))  # type: ignore[arg-type]
+    changed = ContentSkolemizer(make_report(data_graph), BASEPATH, DATA_GRAPH_URI)
+    changed_results = set(changed.graph(changed.source).subjects(RDF.type, SH.ValidationResult))
+    # results of other focus nodes keep their IRIs
+    removed = {
+        result for result in results if first_graph.value(result, SH.focusNode) == focus_node
+    }
+    assert removed
+    assert results - changed_results == removed
+
+
+def test_content_skolemizer_constraints() -> None:
+    """Test results of several constraints of one component on one shape get distinct IRIs"""
+    shapes = Graph().parse(
+        format="turtle",
+        data="""
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <https://example.org/> .
+ex:PersonShape a sh:NodeShape ;
+    sh:targetClass ex:Thing ;
+    sh:property [ sh:path ex:knows ; sh:class ex:Person, ex:Agent ] ;
+    sh:property [ sh:path ex:name ; sh:pattern "^A", "B$" ] .
+""",
+    )
+    data_graph = Graph().parse(
+        format="turtle",
+        data="""
+@prefix ex: <https://example.org/> .
+ex:a a ex:Thing ; ex:knows ex:b ; ex:name "xyz" .
+""",
+    )
+    report: Graph
+    _, report, _ = validate(data_graph, shacl_graph=shapes)
+    skolemizer = ContentSkolemizer(report, BASEPATH, DATA_GRAPH_URI)
+    graph = skolemizer.graph(report)
+    results = set(report.subjects(RDF.type, SH.ValidationResult))
+    assert len(results) == 4  # noqa: PLR2004
+    assert len(set(graph.subjects(RDF.type, SH.ValidationResult))) == len(results)
+    assert all(
+        len(list(graph.objects(node, SH.resultMessage))) == 1
+        for node in graph.subjects(RDF.type, SH.ValidationResult)
+    )
+
+
+def test_diff_upload() -> None:
+    """Test an unchanged report is patched with the provenance data only"""
+    store = LocalGraphStore()
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    store.graphs[DATA_GRAPH_URI] = make_data(300, violations=0.2)
+    queries: list[str] = []
+    for _ in range(2):
+        plugin = ShaclValidation(
+            data_graph_uri=DATA_GRAPH_URI,
+            shacl_graph_uri=SHACL_GRAPH_URI,
+            validation_graph_uri=VALIDATION_GRAPH_URI,
+            generate_graph=True,
+            cache_graphs=False,
+            content_skolem_iris=True,
+            diff_upload=True,
+        )
+        with (
+            store.patch(),
+            mock.patch.object(plugin_pyshacl, "update", SimpleNamespace(post=queries.append)),
+        ):
+            plugin.execute(inputs=(), context=LocalExecutionContext())
+    graph = store.graphs[VALIDATION_GRAPH_URI]
+    assert len(set(graph.subjects(RDF.type, SH.ValidationResult))) > 0
+    upload = next(span for span in plugin.profiler.spans if span.name == "upload")
+    assert upload.count is not None
+    assert upload.count <= 2  # noqa: PLR2004
+    # only the generation time may have changed
+    assert all("generatedAtTime" in query for query in queries)
+    assert all(str(node).startswith(VALIDATION_GRAPH_URI) for node in graph.subjects())
+    assert (URIRef(DATA_GRAPH_URI), None, None) not in graph
+
+
+def test_diff_upload_parameters() -> None:
+    """Test uploading differences needs content-based IRIs and a cleared validation graph"""
+    store = LocalGraphStore()
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    store.graphs[DATA_GRAPH_URI] = make_data(100)
+    parameters = {
+        "data_graph_uri": DATA_GRAPH_URI,
+        "shacl_graph_uri": SHACL_GRAPH_URI,
+        "validation_graph_uri": VALIDATION_GRAPH_URI,
+        "generate_graph": True,
+        "diff_upload": True,
+    }
+    with store.patch():
+        with pytest.raises(ValueError, match="requires content-based skolem IRIs"):
+            ShaclValidation(**parameters).check_parameters()  # type: ignore[arg-type]
+        with pytest.raises(ValueError, match="requires the Clear validation graph option"):
+            ShaclValidation(
+                **parameters,  # type: ignore[arg-type]
+                content_skolem_iris=True,
+                clear_validation_graph=False,
+            ).check_parameters()
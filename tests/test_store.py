@@ -0,0 +1,47 @@
+"""On-disk store tests."""
+
+from pathlib import Path
+
+import pytest
+
+from cmem_plugin_pyshacl.plugin_pyshacl import ShaclValidation
+from cmem_plugin_pyshacl.store import DiskGraph, has_bsddb
+
+from .benchmark import (
+    DATA_GRAPH_URI,
+    SHACL_GRAPH_URI,
+    LocalExecutionContext,
+    LocalGraphStore,
+    make_data,
+    make_shapes,
+)
+from .test_shapes import DATA
+
+
+@pytest.mark.skipif(not has_bsddb, reason="berkeleydb is not installed")
+def test_disk_graph(tmp_path: Path) -> None:
+    """Test on-disk graph is removed when closed"""
+    graph = DiskGraph(str(tmp_path))
+    graph.parse(data=DATA, format="turtle")
+    assert len(graph) > 0
+    assert Path(graph.path).parent == tmp_path
+    graph.close()
+    assert not Path(graph.path).exists()
+
+
+@pytest.mark.skipif(has_bsddb, reason="berkeleydb is installed")
+def test_disk_store_requires_berkeleydb() -> None:
+    """Test the on-disk store is rejected without berkeleydb"""
+    with pytest.raises(ImportError, match="berkeleydb"):
+        DiskGraph()
+    store = LocalGraphStore()
+    store.graphs[DATA_GRAPH_URI] = make_data(100)
+    store.graphs[SHACL_GRAPH_URI] = make_shapes()
+    plugin = ShaclValidation(
+        data_graph_uri=DATA_GRAPH_URI,
+        shacl_graph_uri=SHACL_GRAPH_URI,
+        output_entities=True,
+        disk_store_threshold=1,
+    )
+    with store.patch(), pytest.raises(ValueError, match="berkeleydb"):
+        plugin.execute(inputs=(), context=LocalExecutionContext())